@@ -44,18 +44,10 @@ class accountsConfig(AppConfig):
 
 
 def _warm_weather_cache():
-    """Pre-fetch weather for all active attractions that have coordinates."""
+    """Bulk-fetch weather for all active attractions and write it to WeatherCache."""
     try:
-        from app.attractions.models import Attraction
         from app.weather.services import WeatherService
-        attractions = Attraction.objects.filter(
-            is_active=True, latitude__isnull=False, longitude__isnull=False
-        ).values('latitude', 'longitude')[:50]  # top 50 to stay within rate limits
-        for a in attractions:
-            try:
-                WeatherService.fetch_current_weather(a['latitude'], a['longitude'])
-            except Exception:
-                pass
+        WeatherService.refresh_weather_cache()
     except Exception:
         pass
 
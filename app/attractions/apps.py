@@ -3,3 +3,33 @@ from django.apps import AppConfig
 
 class AttractionsConfig(AppConfig):
     name = 'app.attractions'
+
+    def ready(self):
+        from app.core.cache_tags import cache_tags, tag_for
+        from app.core.sitemaps import sitemap
+        from app.core.search import search_index
+        from app.regions.models import Region
+        from .models import (
+            Attraction, AttractionBoundary, AttractionImage, AttractionTip,
+            Citation, EndemicSpecies, NearestTransport,
+        )
+        from .spatial import spatial_index
+
+        search_index.register(
+            Attraction, 'attraction',
+            title='name',
+            summary='short_description',
+            body=('description', 'region.name'),
+            depends_on=[(Region, 'attractions')],
+        )
+        spatial_index.connect()
+
+        cache_tags.register(Attraction, parents=('region',))
+        for model in (AttractionImage, AttractionTip, EndemicSpecies, AttractionBoundary, NearestTransport):
+            cache_tags.register(model, parents=('attraction',))
+        cache_tags.register(Citation)
+
+        sitemap.register(
+            'attractions', Attraction.objects.filter(is_active=True), '/api/v1/attractions/{slug}/',
+            tags=[tag_for(Attraction)],
+        )
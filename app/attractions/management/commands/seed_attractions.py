@@ -2,13 +2,25 @@
 Management command to seed Tanzania tourism attractions with real GPS-accurate data.
 EXPANDED VERSION: 31 Regions, 80+ Attractions
 
+Everything is written in one transaction with bulk upserts keyed on slug
+(see app.core.seeding), so re-running it is cheap and idempotent: existing
+rows are kept, or refreshed from the data below with --update. Tips are only
+added to attractions created by this run.
+
 Run: python src/manage.py seed_attractions
+     python src/manage.py seed_attractions --dry-run
+     python src/manage.py seed_attractions --update
      python src/manage.py seed_attractions --clear
 """
+import time
+
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from app.core.seeding import Seeder
 from app.regions.models import Region
 from app.attractions.models import Attraction, AttractionTip
+from app.attractions.spatial import spatial_index
 
 User = get_user_model()
 
@@ -623,13 +635,18 @@ class Command(BaseCommand):
             action="store_true",
             help="Clear existing attractions and regions before seeding",
         )
+        parser.add_argument(
+            "--update",
+            action="store_true",
+            help="Overwrite existing regions and attractions that differ from the seed data",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show what would be created or changed without writing anything",
+        )
 
     def handle(self, *args, **options):
-        if options["clear"]:
-            self.stdout.write("Clearing existing data...")
-            Region.objects.all().delete()
-            self.stdout.write(self.style.WARNING("Existing regions cleared."))
-
         user = User.objects.filter(is_superuser=True).first()
         if not user:
             self.stdout.write(self.style.ERROR(
@@ -638,68 +655,72 @@ class Command(BaseCommand):
             return
 
         self.stdout.write(f"Using user '{user.username}' as creator.")
-
-        # Seed Regions
-        self.stdout.write("\n[1/2] Seeding 31 regions...")
-        region_map = {}
-        for slug, name, desc, lat, lon in REGIONS_31:
-            region, created = Region.objects.get_or_create(
-                slug=slug,
-                defaults={
-                    "name": name,
-                    "description": desc,
-                    "latitude": lat,
-                    "longitude": lon,
-                },
-            )
-            region_map[slug] = region
-            status = "✓" if created else "·"
-            self.stdout.write(f"  {status} {name}")
-
-        # Seed Attractions
-        self.stdout.write("\n[2/2] Seeding 80+ attractions...")
-        created_count = 0
-        skipped_count = 0
-
-        for a_data in ATTRACTIONS_EXPANDED:
-            region = region_map.get(a_data["region_slug"])
-            if not region:
-                self.stdout.write(self.style.ERROR(
-                    f"  ! Region '{a_data['region_slug']}' not found for '{a_data['name']}'"
-                ))
-                continue
-
-            tips_data = a_data.pop("tips", [])
-            a_data.pop("region_slug")
-
-            attraction, created = Attraction.objects.get_or_create(
-                slug=a_data["slug"],
-                defaults={
-                    **a_data,
-                    "region": region,
-                    "created_by": user,
+        started = time.perf_counter()
+        seeder = Seeder(update=options["update"], dry_run=options["dry_run"])
+
+        with transaction.atomic():
+            if options["clear"] and not options["dry_run"]:
+                self.stdout.write("Clearing existing data...")
+                Region.objects.all().delete()
+                self.stdout.write(self.style.WARNING("Existing regions cleared."))
+
+            region_pks, _ = seeder.upsert(Region, [
+                {"slug": slug, "name": name, "description": desc, "latitude": lat, "longitude": lon}
+                for slug, name, desc, lat, lon in REGIONS_31
+            ])
+
+            attractions = []
+            for a_data in ATTRACTIONS_EXPANDED:
+                if a_data["region_slug"] not in region_pks:
+                    self.stdout.write(self.style.ERROR(
+                        f"  ! Region '{a_data['region_slug']}' not found for '{a_data['name']}'"
+                    ))
+                    continue
+                row = {k: v for k, v in a_data.items() if k not in ("tips", "region_slug")}
+                attractions.append({
+                    **row,
+                    "region_id": region_pks[a_data["region_slug"]],
+                    "created_by_id": user.pk,
                     "featured_image": "",
-                },
+                })
+            attraction_pks, created = seeder.upsert(
+                Attraction, attractions, create_only=["created_by_id", "featured_image"],
             )
 
-            if created:
-                for tip in tips_data:
-                    AttractionTip.objects.create(
-                        attraction=attraction,
-                        title=tip["title"],
-                        description=tip["description"],
-                        created_by=user,
-                    )
-                created_count += 1
-                self.stdout.write(f"  ✓ {attraction.name}")
-            else:
-                skipped_count += 1
-
-        self.stdout.write(self.style.SUCCESS(
-            f"\n✓ COMPLETE: {created_count} created, {skipped_count} already exist"
-        ))
-        self.stdout.write(f"  • Regions: 31 total")
-        self.stdout.write(f"  • Attractions: {created_count + skipped_count} total")
+            seeder.insert(AttractionTip, [
+                {
+                    "attraction_id": attraction_pks[a_data["slug"]],
+                    "title": tip["title"],
+                    "description": tip["description"],
+                    "created_by_id": user.pk,
+                }
+                for a_data in ATTRACTIONS_EXPANDED if a_data["slug"] in created
+                for tip in a_data.get("tips", [])
+            ])
+
+            if not options["dry_run"]:
+                # Bulk inserts skip the post_save handlers that maintain these
+                spatial_index.rebuild()
+            seeder.finish()
+
+        self._report(seeder, options, time.perf_counter() - started)
+
+    def _report(self, seeder, options, elapsed):
+        for step in seeder.steps:
+            self.stdout.write(
+                f"  {step.label:<28} {step.created:>4} created {step.updated:>4} updated "
+                f"{step.unchanged:>4} unchanged  {step.seconds * 1000:8.1f} ms"
+            )
+            for key, fields in step.diff.items():
+                action = "~" if options["update"] else "·"
+                self.stdout.write(f"    {action} {key}: {', '.join(fields)}")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"\nDry run: nothing written ({elapsed:.2f}s)."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"\n✓ COMPLETE in {elapsed:.2f}s"))
+        if any(step.diff for step in seeder.steps) and not options["update"]:
+            self.stdout.write("  · rows differ from the seed data and were kept; use --update to overwrite")
         self.stdout.write(self.style.WARNING(
             "\nNote: featured_image is empty. Upload via Django Admin or Cloudinary."
         ))
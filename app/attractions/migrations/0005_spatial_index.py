@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from app.attractions.spatial import CREATE_TABLES_SQL, DROP_TABLES_SQL, spatial_index
+
+
+def create_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_TABLES_SQL:
+        schema_editor.execute(sql)
+    spatial_index.rebuild(using=schema_editor.connection.alias, apps=apps)
+
+
+def drop_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_TABLES_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0004_nearesttransport'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_spatial_index, drop_spatial_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.28 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0005_spatial_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-is_featured', '-created_at', 'id'], name='attraction_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attraction',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', '-is_featured', '-created_at'], name='attraction_active_cat_idx'),
+        ),
+    ]
@@ -74,6 +74,12 @@ class Attraction(SEOMixin, models.Model):
             models.Index(fields=['category']),
             models.Index(fields=['region']),
             models.Index(fields=['difficulty_level']),
+            # Public list/featured/by_category: WHERE is_active ORDER BY Meta.ordering
+            # (id last for cursor pages) walked in index order instead of sorted
+            models.Index(fields=['-is_featured', '-created_at', 'id'],
+                         condition=models.Q(is_active=True), name='attraction_active_order_idx'),
+            models.Index(fields=['category', '-is_featured', '-created_at'],
+                         condition=models.Q(is_active=True), name='attraction_active_cat_idx'),
         ]
 
     def __str__(self):
@@ -0,0 +1,276 @@
+"""
+Spatial lookups for attractions, backed by SQLite R*Tree virtual tables.
+
+Two R*Trees mirror the geometry the API filters on:
+
+    attractions_point_rtree     one degenerate box per Attraction (its lat/lng)
+    attractions_boundary_rtree  the bounding box of each AttractionBoundary,
+                                keyed by attraction_id
+
+They are kept in sync with post_save / post_delete signals and only ever
+answer the coarse "which boxes overlap this box?" question. Exact answers —
+haversine distance and point-in-polygon against the GeoJSON — are computed in
+Python on the (small) candidate set. On non-SQLite databases the candidate
+step falls back to a plain range filter on the model columns.
+"""
+
+import math
+
+from django.db import DatabaseError, connections, router
+from django.db.models.signals import post_delete, post_save
+
+POINT_TABLE = 'attractions_point_rtree'
+BOUNDARY_TABLE = 'attractions_boundary_rtree'
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+CREATE_TABLES_SQL = [
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {POINT_TABLE} USING rtree(id, min_lat, max_lat, min_lng, max_lng)',
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {BOUNDARY_TABLE} USING rtree(id, min_lat, max_lat, min_lng, max_lng)',
+]
+DROP_TABLES_SQL = [f'DROP TABLE IF EXISTS {POINT_TABLE}', f'DROP TABLE IF EXISTS {BOUNDARY_TABLE}']
+
+
+# ── geometry ───────────────────────────────────────────────────────────────
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lng2 - lng1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bbox_around(lat, lng, radius_km):
+    """(min_lat, max_lat, min_lng, max_lng) enclosing a circle of ``radius_km``."""
+    dlat = radius_km / KM_PER_DEGREE
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlng = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    return lat - dlat, lat + dlat, lng - dlng, lng + dlng
+
+
+def _polygons(geojson):
+    """Yield each polygon (a list of rings of [lng, lat]) in any GeoJSON object."""
+    if not isinstance(geojson, dict):
+        return
+    kind = geojson.get('type')
+    if kind == 'FeatureCollection':
+        for feature in geojson.get('features') or []:
+            yield from _polygons(feature)
+    elif kind == 'Feature':
+        yield from _polygons(geojson.get('geometry'))
+    elif kind == 'GeometryCollection':
+        for geometry in geojson.get('geometries') or []:
+            yield from _polygons(geometry)
+    elif kind == 'Polygon':
+        yield geojson.get('coordinates') or []
+    elif kind == 'MultiPolygon':
+        yield from geojson.get('coordinates') or []
+
+
+def _in_ring(lat, lng, ring):
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > lat) != (yj > lat) and lng < (xj - xi) * (lat - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+def point_in_geojson(lat, lng, geojson):
+    """Even-odd ray casting; the first ring of a polygon is its shell, the rest are holes."""
+    for rings in _polygons(geojson):
+        if rings and _in_ring(lat, lng, rings[0]) and not any(_in_ring(lat, lng, hole) for hole in rings[1:]):
+            return True
+    return False
+
+
+def geojson_bbox(geojson):
+    lats, lngs = [], []
+    for rings in _polygons(geojson):
+        for ring in rings:
+            for point in ring:
+                lngs.append(point[0])
+                lats.append(point[1])
+    if not lats:
+        return None
+    return min(lats), max(lats), min(lngs), max(lngs)
+
+
+def boundary_bbox(boundary):
+    """Best available bounding box for an AttractionBoundary, or None."""
+    if None not in (boundary.bbox_south, boundary.bbox_north, boundary.bbox_west, boundary.bbox_east):
+        return float(boundary.bbox_south), float(boundary.bbox_north), float(boundary.bbox_west), float(boundary.bbox_east)
+    if boundary.geojson:
+        bbox = geojson_bbox(boundary.geojson)
+        if bbox:
+            return bbox
+    if None not in (boundary.center_latitude, boundary.center_longitude, boundary.radius_km):
+        return bbox_around(float(boundary.center_latitude), float(boundary.center_longitude), float(boundary.radius_km))
+    return None
+
+
+def boundary_contains(boundary, lat, lng):
+    """Exact containment test: polygon first, then circle, then the stored bbox."""
+    if boundary.geojson and any(True for _ in _polygons(boundary.geojson)):
+        return point_in_geojson(lat, lng, boundary.geojson)
+    if None not in (boundary.center_latitude, boundary.center_longitude, boundary.radius_km):
+        return haversine_km(lat, lng, float(boundary.center_latitude), float(boundary.center_longitude)) <= float(boundary.radius_km)
+    bbox = boundary_bbox(boundary)
+    return bool(bbox) and bbox[0] <= lat <= bbox[1] and bbox[2] <= lng <= bbox[3]
+
+
+# ── index ──────────────────────────────────────────────────────────────────
+
+class SpatialIndex:
+    def connect(self):
+        from .models import Attraction, AttractionBoundary
+        post_save.connect(self._on_attraction_save, sender=Attraction, weak=False, dispatch_uid='spatial_attraction_save')
+        post_delete.connect(self._on_attraction_delete, sender=Attraction, weak=False, dispatch_uid='spatial_attraction_delete')
+        post_save.connect(self._on_boundary_save, sender=AttractionBoundary, weak=False, dispatch_uid='spatial_boundary_save')
+        post_delete.connect(self._on_boundary_delete, sender=AttractionBoundary, weak=False, dispatch_uid='spatial_boundary_delete')
+
+    def is_available(self, using='default'):
+        return connections[using].vendor == 'sqlite'
+
+    def _upsert(self, table, pk, box, using):
+        if not self.is_available(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {table} WHERE id = %s', [pk])
+            if box is not None:
+                cursor.execute(f'INSERT INTO {table} (id, min_lat, max_lat, min_lng, max_lng) VALUES (%s, %s, %s, %s, %s)', [pk, *box])
+
+    def index_attraction(self, attraction, using='default'):
+        lat, lng = float(attraction.latitude), float(attraction.longitude)
+        self._upsert(POINT_TABLE, attraction.pk, (lat, lat, lng, lng), using)
+
+    def index_boundary(self, boundary, using='default'):
+        self._upsert(BOUNDARY_TABLE, boundary.attraction_id, boundary_bbox(boundary), using)
+
+    def rebuild(self, using='default', apps=None):
+        if not self.is_available(using):
+            return
+        if apps is None:
+            from django.apps import apps
+        Attraction = apps.get_model('attractions', 'Attraction')
+        AttractionBoundary = apps.get_model('attractions', 'AttractionBoundary')
+        with connections[using].cursor() as cursor:
+            for sql in CREATE_TABLES_SQL:
+                cursor.execute(sql)
+            cursor.execute(f'DELETE FROM {POINT_TABLE}')
+            cursor.execute(f'DELETE FROM {BOUNDARY_TABLE}')
+            points = [
+                (pk, float(lat), float(lat), float(lng), float(lng))
+                for pk, lat, lng in Attraction.objects.using(using).values_list('pk', 'latitude', 'longitude')
+            ]
+            cursor.executemany(f'INSERT INTO {POINT_TABLE} (id, min_lat, max_lat, min_lng, max_lng) VALUES (%s, %s, %s, %s, %s)', points)
+            boxes = []
+            for boundary in AttractionBoundary.objects.using(using).all():
+                box = boundary_bbox(boundary)
+                if box is not None:
+                    boxes.append((boundary.attraction_id, *box))
+            cursor.executemany(f'INSERT INTO {BOUNDARY_TABLE} (id, min_lat, max_lat, min_lng, max_lng) VALUES (%s, %s, %s, %s, %s)', boxes)
+
+    # ── queries ────────────────────────────────────────────────────────────
+
+    def point_candidates(self, min_lat, max_lat, min_lng, max_lng, using=None):
+        """Ids of attractions whose point lies in the box, or None if the R*Tree can't answer."""
+        from .models import Attraction
+        using = using or router.db_for_read(Attraction)
+        if not self.is_available(using):
+            return None
+        try:
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    # Overlap rather than containment: the R*Tree stores 32-bit floats rounded outwards
+                    f'SELECT id FROM {POINT_TABLE} WHERE max_lat >= %s AND min_lat <= %s AND max_lng >= %s AND min_lng <= %s',
+                    [min_lat, max_lat, min_lng, max_lng],
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except DatabaseError:
+            return None
+
+    def boundary_candidates(self, lat, lng, using=None):
+        """Attraction ids whose boundary bbox contains the point, or None if the R*Tree can't answer."""
+        from .models import AttractionBoundary
+        using = using or router.db_for_read(AttractionBoundary)
+        if not self.is_available(using):
+            return None
+        try:
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f'SELECT id FROM {BOUNDARY_TABLE} WHERE min_lat <= %s AND max_lat >= %s AND min_lng <= %s AND max_lng >= %s',
+                    [lat, lat, lng, lng],
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except DatabaseError:
+            return None
+
+    # ── signal handlers ────────────────────────────────────────────────────
+
+    def _on_attraction_save(self, sender, instance, using, raw=False, **kwargs):
+        if not raw:
+            self.index_attraction(instance, using=using)
+
+    def _on_attraction_delete(self, sender, instance, using, **kwargs):
+        self._upsert(POINT_TABLE, instance.pk, None, using)
+        self._upsert(BOUNDARY_TABLE, instance.pk, None, using)
+
+    def _on_boundary_save(self, sender, instance, using, raw=False, **kwargs):
+        if not raw:
+            self.index_boundary(instance, using=using)
+
+    def _on_boundary_delete(self, sender, instance, using, **kwargs):
+        self._upsert(BOUNDARY_TABLE, instance.attraction_id, None, using)
+
+
+spatial_index = SpatialIndex()
+
+
+# ── high-level lookups used by the views ───────────────────────────────────
+
+def nearby(queryset, lat, lng, radius_km=None, limit=None, max_radius_km=2000.0):
+    """
+    ``[(attraction, distance_km), ...]`` sorted by true great-circle distance.
+
+    With ``radius_km`` only attractions inside the circle are returned. Without
+    it (nearest-neighbour mode) the search box doubles from 25 km until
+    ``limit`` hits are found or ``max_radius_km`` is reached.
+    """
+    radius = radius_km if radius_km is not None else 25.0
+    while True:
+        box = bbox_around(lat, lng, radius)
+        ids = spatial_index.point_candidates(*box, using=queryset.db)
+        if ids is None:
+            candidates = queryset.filter(
+                latitude__gte=box[0], latitude__lte=box[1],
+                longitude__gte=box[2], longitude__lte=box[3],
+            )
+        else:
+            candidates = queryset.filter(pk__in=ids)
+
+        hits = []
+        for attraction in candidates:
+            distance = haversine_km(lat, lng, float(attraction.latitude), float(attraction.longitude))
+            if distance <= radius:
+                hits.append((attraction, distance))
+        hits.sort(key=lambda hit: (hit[1], hit[0].pk))
+
+        done = radius_km is not None or (limit and len(hits) >= limit) or radius >= max_radius_km
+        if done:
+            return hits[:limit] if limit else hits
+        radius = min(radius * 2, max_radius_km)
+
+
+def containing(boundary_queryset, lat, lng):
+    """Boundaries from ``boundary_queryset`` whose geometry actually contains the point."""
+    ids = spatial_index.boundary_candidates(lat, lng, using=boundary_queryset.db)
+    if ids is None:
+        candidates = boundary_queryset
+    else:
+        candidates = boundary_queryset.filter(attraction_id__in=ids)
+    return [b for b in candidates if boundary_contains(b, lat, lng)]
@@ -1,10 +1,24 @@
+from io import StringIO
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
 from unittest.mock import patch
+from app.core.search import search_index
+from app.core.pagination import KeysetPagination
+from app.core.query_budget import QueryBudgetExceeded, enforce_query_budgets, query_budget
+from app.core.serializers import ValuesSerializer
 from app.regions.models import Region
-from .models import Attraction
+from .serializers import AttractionDetailSerializer, AttractionListSerializer
+from .views import LIST_QUERYSET, LIST_ROWS
+from .management.commands.seed_attractions import ATTRACTIONS_EXPANDED, REGIONS_31
+from .models import Attraction, AttractionImage, AttractionTip, EndemicSpecies, NearestTransport
 
 User = get_user_model()
 
@@ -73,3 +87,436 @@ class AttractionsAPITest(TestCase):
     def test_create_attraction_requires_auth(self):
         response = self.client.post(self.list_url, {})
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AttractionCacheInvalidationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='cacheuser', email='cache@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Manyara', slug='manyara', description='Rift valley lakes.',
+            latitude='-3.6', longitude='35.8',
+        )
+        self.attraction = make_attraction(self.region, self.user, name='Tarangire', slug='tarangire')
+
+    def test_responses_bypass_page_cache(self):
+        response = self.client.get('/api/v1/attractions/?page_size=7')
+        self.assertIn('max-age=0', response['Cache-Control'])
+
+    def test_attraction_edit_visible_in_list_and_detail(self):
+        list_url = '/api/v1/attractions/?region=manyara'
+        detail_url = '/api/v1/attractions/tarangire/'
+        self.client.get(list_url)
+        self.client.get(detail_url)
+
+        self.attraction.short_description = 'Elephant herds and baobabs.'
+        self.attraction.save()
+
+        listed = self.client.get(list_url).data['results']
+        self.assertEqual(listed[0]['short_description'], 'Elephant herds and baobabs.')
+        detail = self.client.get(detail_url).data
+        self.assertEqual(detail['short_description'], 'Elephant herds and baobabs.')
+
+    def test_tip_change_visible_in_detail(self):
+        detail_url = '/api/v1/attractions/tarangire/'
+        self.assertEqual(self.client.get(detail_url).data['tips'], [])
+
+        AttractionTip.objects.create(attraction=self.attraction, title='Go early', description='Dawn drives.')
+        self.assertEqual([tip['title'] for tip in self.client.get(detail_url).data['tips']], ['Go early'])
+
+    def test_region_rename_visible_in_attraction_lists(self):
+        url = '/api/v1/attractions/by_region/?region=manyara'
+        self.assertEqual(self.client.get(url).data[0]['region_name'], 'Manyara')
+
+        self.region.name = 'Lake Manyara'
+        self.region.save()
+        self.assertEqual(self.client.get(url).data[0]['region_name'], 'Lake Manyara')
+
+    def test_unrelated_change_keeps_detail_cached(self):
+        detail_url = '/api/v1/attractions/tarangire/'
+        self.client.get(detail_url)
+        # Adding to the same region would change its attraction_count, so use another one
+        morogoro = Region.objects.create(
+            name='Morogoro', slug='morogoro', description='Uluguru mountains.',
+            latitude='-6.8', longitude='37.7',
+        )
+        make_attraction(morogoro, self.user, name='Mikumi', slug='mikumi')
+        with patch('app.attractions.views.AttractionDetailSerializer') as serializer:
+            response = self.client.get(detail_url)
+        serializer.assert_not_called()
+        self.assertEqual(response.data['name'], 'Tarangire')
+
+
+class AttractionConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='etaguser', email='etag@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Iringa', slug='iringa', description='Southern highlands.',
+            latitude='-7.77', longitude='35.69',
+        )
+        self.attraction = make_attraction(self.region, self.user, name='Ruaha', slug='ruaha')
+        self.detail_url = '/api/v1/attractions/ruaha/'
+
+    def test_matching_etag_returns_304_without_serializing(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        with patch('app.attractions.views.AttractionDetailSerializer') as serializer:
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('ETag', response)
+        serializer.assert_not_called()
+
+    def test_child_change_invalidates_etag(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        AttractionTip.objects.create(attraction=self.attraction, title='Bring binoculars', description='Birds.')
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_signal_free_insert_changes_list_etag(self):
+        url = '/api/v1/attractions/?page_size=5'
+        etag = self.client.get(url)['ETag']
+        Attraction.objects.bulk_create([Attraction(
+            name='Udzungwa', slug='udzungwa', region=self.region, category='national_park',
+            description='Forest.', short_description='Forest.', latitude='-7.8', longitude='36.8',
+            difficulty_level='moderate', access_info='Road.', best_time_to_visit='June',
+            seasonal_availability='Year-round', estimated_duration='2 days',
+        )])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_attraction_is_still_404(self):
+        response = self.client.get('/api/v1/attractions/nowhere/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
+
+
+class AttractionQueryBudgetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='budgetuser', email='budget@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Tanga', slug='tanga', description='Northern coast.',
+            latitude='-5.07', longitude='39.1',
+        )
+
+    def _populate(self, attraction, n):
+        for i in range(n):
+            AttractionTip.objects.create(attraction=attraction, title=f'Tip {i}', description='...', created_by=self.user)
+            AttractionImage.objects.create(attraction=attraction, image=f'img{i}.jpg', order=i)
+            EndemicSpecies.objects.create(attraction=attraction, common_name=f'Species {i}', description='...')
+            NearestTransport.objects.create(
+                attraction=attraction, transport_type='airport', name=f'Strip {i}', distance_km=i + 1,
+            )
+
+    def test_detail_query_count_is_independent_of_nested_rows(self):
+        self._populate(make_attraction(self.region, self.user, name='Amani', slug='amani'), 1)
+        self._populate(make_attraction(self.region, self.user, name='Pangani', slug='pangani'), 8)
+        with enforce_query_budgets():
+            for slug in ('amani', 'pangani'):
+                response = self.client.get(f'/api/v1/attractions/{slug}/')
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['tips']), 8)
+        self.assertEqual(response.data['tips'][0]['created_by_username'], 'budgetuser')
+
+    def test_warm_detail_hit_skips_the_nested_prefetch(self):
+        self._populate(make_attraction(self.region, self.user, name='Amani', slug='amani'), 3)
+        self.client.get('/api/v1/attractions/amani/')
+        # @conditional's Last-Modified query, then the view's one id lookup
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/attractions/amani/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['tips']), 3)
+        self.assertEqual(len(queries), 2)
+        self.assertIn('"region_id" FROM "attractions_attraction"', queries[1]['sql'])
+
+    def test_list_views_stay_within_budget(self):
+        for i in range(12):
+            make_attraction(self.region, self.user, name=f'Site {i}', slug=f'site-{i}', featured=i < 6)
+        with enforce_query_budgets():
+            for url in (
+                '/api/v1/attractions/?page_size=10',
+                '/api/v1/attractions/?search=site&page_size=5',
+                '/api/v1/attractions/featured/',
+                '/api/v1/attractions/by_category/?category=national_park',
+                '/api/v1/attractions/by_region/?region=tanga',
+            ):
+                self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+    def test_exceeding_budget_raises_when_enforced(self):
+        @query_budget(0)
+        def view(request):
+            return list(Region.objects.all())
+
+        request = APIClient().get('/').wsgi_request
+        with self.assertLogs('app.core.query_budget', 'WARNING'):
+            view(request)
+        with enforce_query_budgets(), self.assertRaises(QueryBudgetExceeded):
+            view(request)
+
+
+class AttractionValuesSerializerTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='fastuser', email='fast@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Zanzibar Ñ', slug='zanzibar', description='Spice islands.',
+            latitude='-6.16', longitude='39.2',
+        )
+        images = ['', 'sample_abc', 'image/upload/v1712/attractions/stone-town.jpg', 'video/upload/clip.mp4']
+        for i, image in enumerate(images):
+            attraction = make_attraction(self.region, self.user, name=f'Stone Town “{i}”', slug=f'stone-town-{i}', featured=i % 2 == 0)
+            Attraction.objects.filter(pk=attraction.pk).update(featured_image=image)
+        # A stored value outside the declared choices falls back to the raw value
+        Attraction.objects.filter(slug='stone-town-3').update(category='retired', difficulty_level='extreme')
+
+    def test_rows_render_byte_identical_to_drf_serializer(self):
+        renderer = JSONRenderer()
+        expected = renderer.render(AttractionListSerializer(LIST_QUERYSET, many=True).data)
+        actual = renderer.render(LIST_ROWS.to_representation(LIST_ROWS.values(LIST_QUERYSET)))
+        self.assertEqual(actual, expected)
+
+    def test_list_endpoints_match_drf_serializer(self):
+        drf = AttractionListSerializer(LIST_QUERYSET.order_by('-is_featured', '-created_at', 'id'), many=True).data
+        response = self.client.get('/api/v1/attractions/?page_size=50')
+        self.assertEqual(response.content, JSONRenderer().render(
+            {'next': None, 'previous': None, 'results': drf},
+        ))
+        drf = AttractionListSerializer(LIST_QUERYSET.filter(region__slug='zanzibar'), many=True).data
+        response = self.client.get('/api/v1/attractions/by_region/?region=zanzibar')
+        self.assertEqual(response.content, JSONRenderer().render(drf))
+
+    def test_method_fields_are_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ValuesSerializer(AttractionDetailSerializer)
+
+
+class AttractionPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.list_url = '/api/v1/attractions/'
+        self.user = User.objects.create_user(username='pageuser', email='page@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Mara', slug='mara', description='Migration country.',
+            latitude='-1.747', longitude='34.076',
+        )
+        for i in range(5):
+            make_attraction(self.region, self.user, name=f'Site {i}', slug=f'site-{i}', featured=(i == 2))
+
+    def _walk(self, url):
+        slugs = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            slugs += [a['slug'] for a in response.data['results']]
+            url = response.data['next']
+        return slugs
+
+    def test_first_page_is_bounded(self):
+        response = self.client.get(f'{self.list_url}?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNone(response.data['previous'])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_cursor_walk_matches_default_ordering(self):
+        expected = list(Attraction.objects.order_by('-is_featured', '-created_at', 'id').values_list('slug', flat=True))
+        self.assertEqual(self._walk(f'{self.list_url}?page_size=2'), expected)
+        self.assertEqual(expected[0], 'site-2')
+
+    def test_previous_link_returns_prior_page(self):
+        first = self.client.get(f'{self.list_url}?page_size=2').data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+    def test_custom_ordering(self):
+        slugs = self._walk(f'{self.list_url}?ordering=-name&page_size=3')
+        self.assertEqual(slugs, [f'site-{i}' for i in range(4, -1, -1)])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(f'{self.list_url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor(self):
+        paginator = KeysetPagination()
+        for values in (
+            ['x', 'y', 1], [True, 'notadate', 1], [True, '2025-01-01T00:00:00', 'abc'],
+            [{'a': 1}, None, 1], [True, None, 1],
+        ):
+            cursor = paginator.encode_cursor(values, reverse=False)
+            response = self.client.get(f'{self.list_url}?cursor={cursor}')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, values)
+
+
+class AttractionSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.list_url = '/api/v1/attractions/'
+        self.user = User.objects.create_user(username='searchuser', email='search@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Arusha', slug='arusha', description='Safari hub.',
+            latitude='-3.3869', longitude='36.6830',
+        )
+        self.serengeti = make_attraction(self.region, self.user)
+        self.gorge = make_attraction(self.region, self.user, name='Olduvai Gorge', slug='olduvai-gorge')
+        self.gorge.description = 'Fossil site on the road to the Serengeti plains.'
+        self.gorge.save()
+
+    def _search(self, term):
+        response = self.client.get(self.list_url, {'search': term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [a['slug'] for a in response.data['results']]
+
+    def test_prefix_match(self):
+        self.assertIn('serengeti', self._search('Sereng'))
+
+    def test_name_match_ranks_above_description_match(self):
+        self.assertEqual(self._search('serengeti'), ['serengeti', 'olduvai-gorge'])
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self._search('fossil serengeti'), ['olduvai-gorge'])
+
+    def test_region_rename_is_reindexed(self):
+        self.region.name = 'Ngorongoro Highlands'
+        self.region.save()
+        self.assertEqual(sorted(self._search('highlands')), ['olduvai-gorge', 'serengeti'])
+
+    def test_deleted_attraction_is_removed(self):
+        self.gorge.delete()
+        self.assertEqual(self._search('fossil'), [])
+
+    def test_ranked_pages_reach_every_match(self):
+        first = self.client.get(self.list_url, {'search': 'serengeti', 'page_size': 1}).data
+        second = self.client.get(first['next']).data
+        self.assertEqual([a['slug'] for a in first['results'] + second['results']], ['serengeti', 'olduvai-gorge'])
+        self.assertIsNone(second['next'])
+
+
+class AttractionSpatialTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='geouser', email='geo@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Kilimanjaro', slug='kilimanjaro', description='Mountain region.',
+            latitude='-3.0674', longitude='37.3556',
+        )
+        self.centre = make_attraction(self.region, self.user, name='Centre', slug='centre')
+        self.near = make_attraction(self.region, self.user, name='Near', slug='near')
+        self.near.latitude, self.near.longitude = '-2.3333', '34.9333'   # ~11 km east
+        self.near.save()
+        self.corner = make_attraction(self.region, self.user, name='Corner', slug='corner')
+        self.corner.latitude, self.corner.longitude = '-2.4633', '34.9633'  # ~20 km, inside the 15 km bbox corner
+        self.corner.save()
+
+    def test_nearby_is_exact_and_sorted(self):
+        response = self.client.get('/api/v1/attractions/nearby/?lat=-2.3333&lng=34.8333&radius=15')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['slug'] for a in response.data], ['centre', 'near'])
+        self.assertEqual(response.data[0]['distance_km'], 0.0)
+        self.assertAlmostEqual(response.data[1]['distance_km'], 11.1, delta=0.2)
+
+    def test_nearest_neighbours_without_radius(self):
+        response = self.client.get('/api/v1/attractions/nearby/?lat=-2.47&lng=34.97&limit=2')
+        self.assertEqual([a['slug'] for a in response.data], ['corner', 'near'])
+
+    def test_nearby_requires_radius_or_limit(self):
+        response = self.client.get('/api/v1/attractions/nearby/?lat=-2.3&lng=34.8')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nearby_tracks_moved_attraction(self):
+        self.near.latitude, self.near.longitude = '-6.0', '39.0'
+        self.near.save()
+        response = self.client.get('/api/v1/attractions/nearby/?lat=-2.3333&lng=34.8333&radius=15')
+        self.assertEqual([a['slug'] for a in response.data], ['centre'])
+
+    def test_within_checks_polygon_not_just_bbox(self):
+        from .models import AttractionBoundary
+        # Right triangle with the hypotenuse cutting the bbox diagonally
+        AttractionBoundary.objects.create(
+            attraction=self.centre, boundary_type='polygon',
+            geojson={'type': 'Polygon', 'coordinates': [[[34.0, -3.0], [35.0, -3.0], [34.0, -2.0], [34.0, -3.0]]]},
+            bbox_north='-2.0', bbox_south='-3.0', bbox_east='35.0', bbox_west='34.0',
+        )
+        inside = self.client.get('/api/v1/attractions/within/?lat=-2.8&lng=34.2')
+        outside = self.client.get('/api/v1/attractions/within/?lat=-2.2&lng=34.8')
+        self.assertEqual([a['slug'] for a in inside.data], ['centre'])
+        self.assertEqual(outside.data, [])
+
+    def test_within_circle_boundary(self):
+        from .models import AttractionBoundary
+        AttractionBoundary.objects.create(
+            attraction=self.near, boundary_type='circle',
+            center_latitude='-2.3333', center_longitude='34.9333', radius_km='5',
+        )
+        self.assertEqual(len(self.client.get('/api/v1/attractions/within/?lat=-2.34&lng=34.94').data), 1)
+        self.assertEqual(self.client.get('/api/v1/attractions/within/?lat=-2.40&lng=34.99').data, [])
+
+    def test_point_in_polygon_with_hole(self):
+        from .spatial import point_in_geojson
+        square = {'type': 'Feature', 'geometry': {'type': 'Polygon', 'coordinates': [
+            [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]],
+            [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]],
+        ]}}
+        self.assertTrue(point_in_geojson(2, 2, square))
+        self.assertFalse(point_in_geojson(5, 5, square))
+        self.assertFalse(point_in_geojson(11, 5, square))
+
+
+class SeedAttractionsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(username='seeder', email='seed@example.com', password='Pass1234!')
+
+    def seed(self, *args):
+        out = StringIO()
+        call_command('seed_attractions', *args, stdout=out)
+        return out.getvalue()
+
+    def test_seeds_in_bulk(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.seed()
+        self.assertEqual(Region.objects.count(), len(REGIONS_31))
+        self.assertEqual(Attraction.objects.count(), len(ATTRACTIONS_EXPANDED))
+        self.assertEqual(AttractionTip.objects.count(), sum(len(a.get('tips', [])) for a in ATTRACTIONS_EXPANDED))
+        self.assertLess(len(queries), 40)
+
+    def test_rerun_is_idempotent(self):
+        self.seed()
+        tips = AttractionTip.objects.count()
+        out = self.seed()
+        self.assertEqual(AttractionTip.objects.count(), tips)
+        self.assertIn('0 created', out)
+
+    def test_bulk_writes_reach_indexes(self):
+        self.client = APIClient()
+        self.assertEqual(self.client.get('/api/v1/attractions/').data['results'], [])
+        self.seed()
+        self.assertTrue(search_index.search(Attraction, 'serengeti'))
+        self.assertTrue(self.client.get('/api/v1/attractions/').data['results'])
+        response = self.client.get('/api/v1/attractions/nearby/?lat=-2.3333&lng=34.8333&radius=100')
+        self.assertTrue(response.data)
+
+    def test_dry_run_writes_nothing(self):
+        out = self.seed('--dry-run')
+        self.assertEqual(Region.objects.count(), 0)
+        self.assertIn('Dry run', out)
+
+    def test_update_refreshes_seeded_fields_only(self):
+        self.seed()
+        attraction = Attraction.objects.get(slug='mount-meru')
+        Attraction.objects.filter(pk=attraction.pk).update(short_description='Edited', featured_image='meru')
+        self.assertIn('mount-meru: short_description', self.seed('--dry-run'))
+        self.seed('--update')
+        attraction.refresh_from_db()
+        self.assertNotEqual(attraction.short_description, 'Edited')
+        self.assertEqual(str(attraction.featured_image), 'meru')
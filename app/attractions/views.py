@@ -3,11 +3,21 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django.core.cache import cache
+from django.db.models import Prefetch
 from django.shortcuts import get_object_or_404
-import math
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiResponse
 
-from .models import Attraction, EndemicSpecies, AttractionBoundary, Citation, NearestTransport
+from app.core.cache_tags import cache_tags, jittered, revalidate, tag_for
+from app.core.conditional import conditional
+from app.core.pagination import KeysetPagination
+from app.core.query_budget import query_budget
+from app.core.renderers import streaming_list
+from app.core.serializers import ValuesSerializer
+from app.core.snapshots import snapshots
+from app.core.search import search_index
+from app.regions.models import Region
+from . import spatial
+from .models import Attraction, AttractionTip, EndemicSpecies, AttractionBoundary, Citation, NearestTransport
 from .serializers import (
     AttractionListSerializer,
     AttractionDetailSerializer,
@@ -18,21 +28,46 @@ from .serializers import (
     NearestTransportSerializer,
 )
 
-BASE_QUERYSET = Attraction.objects.filter(is_active=True).select_related('region', 'created_by').prefetch_related('images', 'tips', 'endemic_species')
+ACTIVE_ATTRACTIONS = Attraction.objects.filter(is_active=True)
+# List rows only read region.name; detail loads every nested relation up front
+# so its query count stays fixed however many tips or transports there are
+LIST_QUERYSET = ACTIVE_ATTRACTIONS.select_related('region')
+DETAIL_QUERYSET = ACTIVE_ATTRACTIONS.select_related('region', 'created_by', 'boundary').prefetch_related(
+    'images',
+    Prefetch('tips', queryset=AttractionTip.objects.select_related('created_by')),
+    'endemic_species',
+    'transport_facilities',
+)
+FEATURED_QUERYSET = LIST_QUERYSET.filter(is_featured=True)[:6]
+# Read path for the list endpoints: same output as AttractionListSerializer, built from .values() rows
+LIST_ROWS = ValuesSerializer(AttractionListSerializer)
+
+# Non-null columns a client may sort the list by; `id` is always appended as the keyset tie-break
+LIST_ORDERING_FIELDS = {'name', 'category', 'difficulty_level', 'is_featured', 'created_at', 'updated_at'}
+NEARBY_MAX_LIMIT = 200
+
+# Cached list/detail responses are invalidated through cache_tags, so the TTL
+# only bounds how long an unused entry lingers
+CACHE_TIMEOUT = 6 * 3600
+LIST_CACHE_TAGS = (tag_for(Attraction), tag_for(Region))
 
 
 @extend_schema(
     tags=['Attractions'],
     summary='List or create attractions',
     description=(
-        '**GET** — Returns all active attractions. Supports optional query parameters:\n\n'
+        '**GET** — Returns active attractions, one page at a time. Supports optional query parameters:\n\n'
         '| Parameter | Type | Description |\n'
         '|-----------|------|-------------|\n'
-        '| `search` | string | Filter by name, description, short description, or region name |\n'
+        '| `search` | string | Full-text search over name, descriptions and region name. Words match as prefixes; results are ranked by relevance unless `ordering` is given |\n'
         '| `category` | string | Filter by category (e.g. `mountain`, `national_park`, `wildlife`, `beach`, `cultural`) |\n'
         '| `region` | string | Filter by region slug (e.g. `arusha`, `kilimanjaro`) |\n'
         '| `difficulty` | string | Filter by difficulty level (e.g. `easy`, `moderate`, `challenging`, `extreme`) |\n'
-        '| `ordering` | string | Sort by any field. Prefix with `-` for descending (e.g. `-created_at`) |\n\n'
+        '| `ordering` | string | Sort by `name`, `category`, `difficulty_level`, `is_featured`, `created_at` or `updated_at`. Prefix with `-` for descending (e.g. `-created_at`) |\n'
+        '| `page_size` | integer | Results per page (default 20, max 100) |\n'
+        '| `cursor` | string | Opaque page token — follow the `next` / `previous` links instead of building it yourself |\n\n'
+        'The response is `{"next": url|null, "previous": url|null, "results": [...]}`. Pages are cut with keyset '
+        '(cursor) pagination on `(-is_featured, -created_at, id)`, so links stay stable while attractions are added.\n\n'
         '**POST** — Create a new attraction. Requires authentication.\n\n'
         '**curl GET example:**\n'
         '```bash\n'
@@ -51,15 +86,17 @@ BASE_QUERYSET = Attraction.objects.filter(is_active=True).select_related('region
         '```'
     ),
     parameters=[
-        OpenApiParameter('search', description='Filter by name, description, short description or region', required=False, type=str),
+        OpenApiParameter('search', description='Full-text search over name, descriptions and region (prefix match, ranked by relevance)', required=False, type=str),
         OpenApiParameter('category', description='Filter by category slug (e.g. mountain, national_park, wildlife, beach, cultural)', required=False, type=str),
         OpenApiParameter('region', description='Filter by region slug (e.g. arusha, kilimanjaro)', required=False, type=str),
         OpenApiParameter('difficulty', description='Filter by difficulty level (easy, moderate, challenging, extreme)', required=False, type=str),
         OpenApiParameter('ordering', description='Sort results by field. Prefix with `-` for descending (e.g. `name`, `-created_at`)', required=False, type=str),
+        OpenApiParameter('page_size', description='Results per page (default 20, max 100)', required=False, type=int),
+        OpenApiParameter('cursor', description='Page token from the `next` or `previous` link', required=False, type=str),
     ],
     request=AttractionCreateUpdateSerializer,
     responses={
-        200: OpenApiResponse(response=AttractionListSerializer(many=True), description='List of active attractions.'),
+        200: OpenApiResponse(response=AttractionListSerializer(many=True), description='One page of active attractions, wrapped in `next` / `previous` / `results`.'),
         201: OpenApiResponse(response=AttractionCreateUpdateSerializer, description='Attraction created successfully.'),
         400: OpenApiResponse(description='Validation error — check required fields.'),
         401: OpenApiResponse(description='Authentication required for POST.'),
@@ -91,36 +128,53 @@ BASE_QUERYSET = Attraction.objects.filter(is_active=True).select_related('region
 )
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(ACTIVE_ATTRACTIONS, tags=LIST_CACHE_TAGS)
+@query_budget(2)
 def attraction_list_create(request):
     if request.method == 'GET':
         search = request.query_params.get('search', '')
         ordering = request.query_params.get('ordering', '')
-        page = request.query_params.get('page', '1')
+        cursor = request.query_params.get('cursor', '')
+        page_size = request.query_params.get('page_size', '')
         category = request.query_params.get('category', '')
         region = request.query_params.get('region', '')
         difficulty = request.query_params.get('difficulty', '')
-        cache_key = f'attractions_list_{search}_{ordering}_{page}_{category}_{region}_{difficulty}'
+        cache_key = cache_tags.key(
+            f'attractions_list_{search}_{ordering}_{cursor}_{page_size}_{category}_{region}_{difficulty}',
+            LIST_CACHE_TAGS,
+        )
         cached = cache.get(cache_key)
         if cached:
             return Response(cached)
 
-        attractions = BASE_QUERYSET
+        attractions = LIST_QUERYSET
+        paginator = KeysetPagination()
         if search:
-            attractions = attractions.filter(name__icontains=search) | \
-                          attractions.filter(description__icontains=search) | \
-                          attractions.filter(short_description__icontains=search) | \
-                          attractions.filter(region__name__icontains=search)
+            ranked = search_index.filter(attractions, search)
+            if ranked is not None:
+                attractions = ranked
+                paginator = KeysetPagination(ordering=('search_rank', 'id'))
+            else:
+                attractions = attractions.filter(name__icontains=search) | \
+                              attractions.filter(description__icontains=search) | \
+                              attractions.filter(short_description__icontains=search) | \
+                              attractions.filter(region__name__icontains=search)
         if category:
             attractions = attractions.filter(category=category)
         if region:
             attractions = attractions.filter(region__slug=region)
         if difficulty:
             attractions = attractions.filter(difficulty_level=difficulty)
-        if ordering:
-            attractions = attractions.order_by(ordering)
-        serializer = AttractionListSerializer(attractions, many=True)
-        cache.set(cache_key, serializer.data, 300)  # 5 min
-        return Response(serializer.data)
+
+        if ordering.lstrip('-') in LIST_ORDERING_FIELDS:
+            paginator = KeysetPagination(ordering=(ordering, 'id'))
+        # The cursor is cut from the ordering fields, so they ride along in each row
+        rows = LIST_ROWS.values(attractions, *(field.lstrip('-') for field in paginator.ordering))
+        page = paginator.paginate_queryset(rows, request)
+        data = paginator.get_paginated_data(LIST_ROWS.to_representation(page))
+        cache.set(cache_key, data, jittered(CACHE_TIMEOUT))
+        return Response(data)
     serializer = AttractionCreateUpdateSerializer(data=request.data)
     if serializer.is_valid():
         serializer.save(created_by=request.user)
@@ -166,32 +220,38 @@ def attraction_list_create(request):
 )
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(lambda request, slug: ACTIVE_ATTRACTIONS.filter(slug=slug), tags=LIST_CACHE_TAGS)
+@snapshots.serve('attraction-detail', DETAIL_QUERYSET, AttractionDetailSerializer, tags=LIST_CACHE_TAGS, detail=True)
+@query_budget(7)
 def attraction_detail(request, slug):
+    # The cache key only needs the two ids, so a warm GET is a single query;
+    # the nested relations are loaded on a miss or for a write
     try:
-        attraction = BASE_QUERYSET.get(slug=slug)
+        pk, region_id = ACTIVE_ATTRACTIONS.values_list('pk', 'region_id').get(slug=slug)
     except Attraction.DoesNotExist:
         return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
+    attraction = None if request.method == 'GET' else DETAIL_QUERYSET.get(pk=pk)
 
     if request.method == 'GET':
-        cache_key = f'attraction_detail_{slug}'
+        cache_key = cache_tags.key(
+            f'attraction_detail_{slug}',
+            (tag_for(Attraction, pk), tag_for(Region, region_id)),
+        )
         cached = cache.get(cache_key)
         if cached:
             return Response(cached)
-        serializer = AttractionDetailSerializer(attraction)
-        cache.set(cache_key, serializer.data, 600)  # 10 min
+        serializer = AttractionDetailSerializer(DETAIL_QUERYSET.get(pk=pk))
+        cache.set(cache_key, serializer.data, jittered(CACHE_TIMEOUT))
         return Response(serializer.data)
     elif request.method in ['PUT', 'PATCH']:
         serializer = AttractionCreateUpdateSerializer(attraction, data=request.data, partial=request.method == 'PATCH')
         if serializer.is_valid():
             serializer.save()
-            cache.delete(f'attraction_detail_{slug}')
-            cache.delete('featured_attractions')
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     elif request.method == 'DELETE':
         attraction.delete()
-        cache.delete(f'attraction_detail_{slug}')
-        cache.delete('featured_attractions')
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -212,15 +272,17 @@ def attraction_detail(request, slug):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(ACTIVE_ATTRACTIONS, tags=LIST_CACHE_TAGS)
+@snapshots.serve('attraction-featured', FEATURED_QUERYSET, AttractionListSerializer, tags=LIST_CACHE_TAGS)
+@query_budget(1)
 def featured_attractions(request):
-    cache_key = 'featured_attractions'
+    cache_key = cache_tags.key('featured_attractions', LIST_CACHE_TAGS)
     featured = cache.get(cache_key)
 
     if not featured:
-        featured_qs = BASE_QUERYSET.filter(is_featured=True)[:6]
-        serializer = AttractionListSerializer(featured_qs, many=True)
-        cache.set(cache_key, serializer.data, 3600)
-        return Response(serializer.data)
+        featured = LIST_ROWS.to_representation(LIST_ROWS.values(FEATURED_QUERYSET))
+        cache.set(cache_key, featured, jittered(CACHE_TIMEOUT))
 
     return Response(featured)
 
@@ -253,20 +315,22 @@ def featured_attractions(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(ACTIVE_ATTRACTIONS, tags=LIST_CACHE_TAGS)
+@query_budget(1)
 def attractions_by_category(request):
     category = request.query_params.get('category')
     if not category:
         return Response({'error': 'Category parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    cache_key = f'attractions_category_{category}'
+    cache_key = cache_tags.key(f'attractions_category_{category}', LIST_CACHE_TAGS)
     cached = cache.get(cache_key)
     if cached:
         return Response(cached)
 
-    attractions = BASE_QUERYSET.filter(category=category)
-    serializer = AttractionListSerializer(attractions, many=True)
-    cache.set(cache_key, serializer.data, 900)  # 15 min
-    return Response(serializer.data)
+    data = LIST_ROWS.to_representation(LIST_ROWS.values(LIST_QUERYSET.filter(category=category)))
+    cache.set(cache_key, data, jittered(CACHE_TIMEOUT))
+    return Response(data)
 
 
 @extend_schema(
@@ -295,20 +359,22 @@ def attractions_by_category(request):
 )
 @api_view(['GET'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(ACTIVE_ATTRACTIONS, tags=LIST_CACHE_TAGS)
+@query_budget(1)
 def attractions_by_region(request):
     region_slug = request.query_params.get('region')
     if not region_slug:
         return Response({'error': 'Region parameter is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    cache_key = f'attractions_region_{region_slug}'
+    cache_key = cache_tags.key(f'attractions_region_{region_slug}', LIST_CACHE_TAGS)
     cached = cache.get(cache_key)
     if cached:
         return Response(cached)
 
-    attractions = BASE_QUERYSET.filter(region__slug=region_slug)
-    serializer = AttractionListSerializer(attractions, many=True)
-    cache.set(cache_key, serializer.data, 900)  # 15 min
-    return Response(serializer.data)
+    data = LIST_ROWS.to_representation(LIST_ROWS.values(LIST_QUERYSET.filter(region__slug=region_slug)))
+    cache.set(cache_key, data, jittered(CACHE_TIMEOUT))
+    return Response(data)
 
 
 @extend_schema(
@@ -367,6 +433,11 @@ def attraction_boundary_geojson(request, slug):
 @extend_schema(
     tags=['Attraction Boundaries'],
     summary='Find attractions containing a GPS point',
+    description=(
+        'Returns active attractions whose boundary contains the point. Candidates come from an R*Tree over the '
+        'boundary bounding boxes; each is then checked exactly against its GeoJSON polygon (holes and '
+        'multipolygons included), or its circle when no polygon is stored.'
+    ),
     parameters=[
         OpenApiParameter('lat', required=True, type=float),
         OpenApiParameter('lng', required=True, type=float),
@@ -387,12 +458,11 @@ def attractions_within(request):
     except ValueError:
         return Response({'error': 'Invalid lat or lng'}, status=status.HTTP_400_BAD_REQUEST)
 
-    boundaries = AttractionBoundary.objects.filter(
-        bbox_south__lte=lat, bbox_north__gte=lat,
-        bbox_west__lte=lng, bbox_east__gte=lng
-    ).select_related('attraction')
-    
-    attractions = [b.attraction for b in boundaries if b.attraction.is_active]
+    boundaries = spatial.containing(
+        AttractionBoundary.objects.filter(attraction__is_active=True).select_related('attraction__region'),
+        lat, lng,
+    )
+    attractions = [b.attraction for b in boundaries]
     serializer = AttractionListSerializer(attractions, many=True)
     return Response(serializer.data)
 
@@ -400,10 +470,19 @@ def attractions_within(request):
 @extend_schema(
     tags=['Attraction Boundaries'],
     summary='Attractions within radius',
+    description=(
+        'Returns active attractions within `radius` km of the point, nearest first, each with its great-circle '
+        '`distance_km`. Candidates are looked up in an R*Tree and then filtered by exact haversine distance.\n\n'
+        'Omit `radius` and pass `limit` for a nearest-neighbour query: the search widens until `limit` '
+        'attractions are found.'
+    ),
     parameters=[
         OpenApiParameter('lat', required=True, type=float),
         OpenApiParameter('lng', required=True, type=float),
-        OpenApiParameter('radius', required=True, type=float, description='Radius in km'),
+        OpenApiParameter('radius', required=False, type=float, description='Radius in km. Required unless `limit` is given.'),
+        OpenApiParameter('limit', required=False, type=int, description=f'Maximum number of results (max {NEARBY_MAX_LIMIT}).'),
+        OpenApiParameter('sort', required=False, type=str, enum=['distance', 'featured'],
+                         description='`distance` (default) sorts nearest first; `featured` uses the normal list ordering.'),
     ],
     responses={200: OpenApiResponse(response=AttractionListSerializer(many=True))}
 )
@@ -413,30 +492,34 @@ def attractions_nearby(request):
     lat = request.query_params.get('lat')
     lng = request.query_params.get('lng')
     radius = request.query_params.get('radius')
-    
-    if not all([lat, lng, radius]):
+    limit = request.query_params.get('limit')
+    sort = request.query_params.get('sort', 'distance')
+
+    if not all([lat, lng]) or not (radius or limit):
         return Response({'error': 'lat, lng, and radius required'}, status=status.HTTP_400_BAD_REQUEST)
         
     try:
         lat = float(lat)
         lng = float(lng)
-        radius = float(radius)
+        radius = float(radius) if radius else None
+        limit = min(int(limit), NEARBY_MAX_LIMIT) if limit else None
     except ValueError:
-        return Response({'error': 'Invalid lat, lng, or radius'}, status=status.HTTP_400_BAD_REQUEST)
-    
-    lat_deg_dist = radius / 111.0
-    lon_deg_dist = radius / (111.0 * math.cos(math.radians(lat)))
-    
-    attractions = Attraction.objects.filter(
-        is_active=True,
-        latitude__gte=lat - lat_deg_dist,
-        latitude__lte=lat + lat_deg_dist,
-        longitude__gte=lng - lon_deg_dist,
-        longitude__lte=lng + lon_deg_dist
+        return Response({'error': 'Invalid lat, lng, radius or limit'}, status=status.HTTP_400_BAD_REQUEST)
+    if (radius is not None and radius <= 0) or (limit is not None and limit <= 0):
+        return Response({'error': 'radius and limit must be positive'}, status=status.HTTP_400_BAD_REQUEST)
+
+    hits = spatial.nearby(
+        Attraction.objects.filter(is_active=True).select_related('region'),
+        lat, lng, radius_km=radius, limit=limit,
     )
-    
-    serializer = AttractionListSerializer(attractions, many=True)
-    return Response(serializer.data)
+    if sort == 'featured':
+        hits.sort(key=lambda hit: (not hit[0].is_featured, -hit[0].created_at.timestamp(), hit[0].pk))
+
+    serializer = AttractionListSerializer([attraction for attraction, _ in hits], many=True)
+    data = serializer.data
+    for item, (_, distance) in zip(data, hits):
+        item['distance_km'] = round(distance, 3)
+    return Response(data)
 
 
 @extend_schema(
@@ -447,9 +530,7 @@ def attractions_nearby(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticatedOrReadOnly])
 def citation_list(request):
-    citations = Citation.objects.all()
-    serializer = CitationSerializer(citations, many=True)
-    return Response(serializer.data)
+    return streaming_list(request, Citation.objects.all(), CitationSerializer)
 
 
 @extend_schema(
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.blog'
+
+    def ready(self):
+        from app.core.cache_tags import cache_tags, tag_for
+        from app.core.search import search_index
+        from app.core.sitemaps import sitemap
+        from .models import Article
+
+        search_index.register(Article, 'article', title='title', summary='excerpt', body=('content', 'tags'))
+        cache_tags.register(Article)
+        sitemap.register(
+            'articles', Article.objects.filter(is_published=True), '/api/v1/blog/{slug}/',
+            tags=[tag_for(Article)],
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-published_at', '-created_at'], name='article_published_order_idx'),
+        ),
+    ]
@@ -32,6 +32,8 @@ class Article(SEOMixin, models.Model):
         indexes = [
             models.Index(fields=['is_published']),
             models.Index(fields=['published_at']),
+            models.Index(fields=['-published_at', '-created_at'],
+                         condition=models.Q(is_published=True), name='article_published_order_idx'),
         ]
 
     def __str__(self):
@@ -2,7 +2,12 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from django.core.cache import cache
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from app.attractions.models import Attraction
+from app.core.cache_tags import cache_tags, jittered, revalidate, tag_for
+from app.core.conditional import conditional
+from app.core.search import search_index
 from .models import Article
 from .serializers import (
     ArticleListSerializer,
@@ -10,7 +15,9 @@ from .serializers import (
     ArticleCreateUpdateSerializer,
 )
 
-BASE_QUERYSET = Article.objects.filter(is_published=True).select_related('author').prefetch_related('related_attractions')
+PUBLISHED_ARTICLES = Article.objects.filter(is_published=True)
+BASE_QUERYSET = PUBLISHED_ARTICLES.select_related('author').prefetch_related('related_attractions')
+CACHE_TIMEOUT = 6 * 3600
 
 
 @extend_schema(
@@ -20,7 +27,7 @@ BASE_QUERYSET = Article.objects.filter(is_published=True).select_related('author
         '**GET** — Returns all published articles ordered by publish date (newest first).\n\n'
         '| Parameter | Type | Description |\n'
         '|-----------|------|-------------|\n'
-        '| `search` | string | Filter by title, excerpt, or content |\n'
+        '| `search` | string | Full-text search over title, excerpt, content and tags. Words match as prefixes; results are ranked by relevance |\n'
         '| `tags` | string | Filter articles whose tags field contains this substring |\n\n'
         '**POST** — Create a new article. Requires authentication. '
         'Set `is_published=true` and `published_at` to make it visible publicly.\n\n'
@@ -30,7 +37,7 @@ BASE_QUERYSET = Article.objects.filter(is_published=True).select_related('author
         '```'
     ),
     parameters=[
-        OpenApiParameter('search', description='Filter by title, excerpt, or content', required=False, type=str),
+        OpenApiParameter('search', description='Full-text search over title, excerpt, content and tags (prefix match, ranked by relevance)', required=False, type=str),
         OpenApiParameter('tags', description='Filter by tag substring (e.g. `safari`)', required=False, type=str),
     ],
     request=ArticleCreateUpdateSerializer,
@@ -43,18 +50,30 @@ BASE_QUERYSET = Article.objects.filter(is_published=True).select_related('author
 )
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(PUBLISHED_ARTICLES, tags=[tag_for(Article)])
 def article_list_create(request):
     if request.method == 'GET':
+        search = request.query_params.get('search', '')
+        tags = request.query_params.get('tags', '')
+        cache_key = cache_tags.key(f'articles_list_{search}_{tags}', (tag_for(Article),))
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+
         articles = BASE_QUERYSET
-        search = request.query_params.get('search')
         if search:
-            articles = articles.filter(title__icontains=search) | \
-                       articles.filter(excerpt__icontains=search) | \
-                       articles.filter(content__icontains=search)
-        tags = request.query_params.get('tags')
+            ranked = search_index.filter(articles, search)
+            if ranked is not None:
+                articles = ranked.order_by('search_rank')
+            else:
+                articles = articles.filter(title__icontains=search) | \
+                           articles.filter(excerpt__icontains=search) | \
+                           articles.filter(content__icontains=search)
         if tags:
             articles = articles.filter(tags__icontains=tags)
         serializer = ArticleListSerializer(articles, many=True)
+        cache.set(cache_key, serializer.data, jittered(CACHE_TIMEOUT))
         return Response(serializer.data)
     serializer = ArticleCreateUpdateSerializer(data=request.data)
     if serializer.is_valid():
@@ -85,6 +104,11 @@ def article_list_create(request):
 )
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(
+    lambda request, slug: PUBLISHED_ARTICLES.filter(slug=slug),
+    tags=[tag_for(Article), tag_for(Attraction)],
+)
 def article_detail(request, slug):
     try:
         article = BASE_QUERYSET.get(slug=slug)
@@ -92,7 +116,13 @@ def article_detail(request, slug):
         return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
+        # related_attraction_slugs follows attraction renames
+        cache_key = cache_tags.key(f'article_detail_{slug}', (tag_for(article), tag_for(Attraction)))
+        cached = cache.get(cache_key)
+        if cached:
+            return Response(cached)
         serializer = ArticleDetailSerializer(article)
+        cache.set(cache_key, serializer.data, jittered(CACHE_TIMEOUT))
         return Response(serializer.data)
     elif request.method in ['PUT', 'PATCH']:
         serializer = ArticleCreateUpdateSerializer(article, data=request.data, partial=request.method == 'PATCH')
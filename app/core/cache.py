@@ -0,0 +1,439 @@
+"""
+SQLite-backed Django cache: one WAL-mode database file shared by every
+worker process on the host, with approximate-LRU eviction.
+
+Compared to FileBasedCache, a ``get`` is one primary-key lookup instead of
+an open + unpickle of a file, and culling never lists a directory: expired
+rows and the least recently used ones are deleted through indexes, and only
+every ``CULL_EVERY`` writes per process. Access times are refreshed at most
+once per ``ACCESS_RESOLUTION`` seconds so hot reads don't turn into writes.
+
+The file holds only cache data and is deliberately not encrypted.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'app.core.cache.SQLiteCache',
+            'LOCATION': '/tmp/xenohuru-cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 10000, 'CULL_FREQUENCY': 3},
+        }
+    }
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+ACCESS_RESOLUTION = 30  # seconds
+CULL_EVERY = 100  # writes per process between cull checks
+
+_SCHEMA = [
+    'CREATE TABLE IF NOT EXISTS cache_entries ('
+    ' key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, accessed REAL NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires)',
+    'CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed)',
+]
+_LIVE = '(expires IS NULL OR expires > ?)'
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+        self._writes = 0
+
+    # ── connection ─────────────────────────────────────────────────────────
+
+    def _conn(self):
+        """One connection per thread and process (sqlite3 connections must not cross a fork)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            for sql in _SCHEMA:
+                conn.execute(sql)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _expiry(self, timeout):
+        return self.get_backend_timeout(timeout)  # absolute timestamp, or None for "forever"
+
+    # ── reads ──────────────────────────────────────────────────────────────
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        row = self._conn().execute(
+            f'SELECT value, accessed FROM cache_entries WHERE key = ? AND {_LIVE}', (key, now),
+        ).fetchone()
+        if row is None:
+            return default
+        if now - row[1] > ACCESS_RESOLUTION:
+            self._conn().execute('UPDATE cache_entries SET accessed = ? WHERE key = ?', (now, key))
+        return pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        mapping = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not mapping:
+            return {}
+        placeholders = ','.join('?' * len(mapping))
+        rows = self._conn().execute(
+            f'SELECT key, value FROM cache_entries WHERE key IN ({placeholders}) AND {_LIVE}',
+            (*mapping, time.time()),
+        ).fetchall()
+        return {mapping[key]: pickle.loads(value) for key, value in rows}
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._conn().execute(
+            f'SELECT 1 FROM cache_entries WHERE key = ? AND {_LIVE}', (key, time.time()),
+        ).fetchone() is not None
+
+    # ── writes ─────────────────────────────────────────────────────────────
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._conn().execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiry(timeout), time.time()),
+        )
+        self._wrote()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires, now = self._expiry(timeout), time.time()
+        rows = [
+            (self.make_and_validate_key(key, version=version), pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires, now)
+            for key, value in data.items()
+        ]
+        conn = self._conn()
+        with _transaction(conn):
+            conn.executemany(
+                'INSERT OR REPLACE INTO cache_entries (key, value, expires, accessed) VALUES (?, ?, ?, ?)', rows,
+            )
+        self._wrote(len(rows))
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        """Atomic across processes: the upsert only overwrites an expired row."""
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._conn().execute(
+            'INSERT INTO cache_entries (key, value, expires, accessed) VALUES (?, ?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires, '
+            'accessed = excluded.accessed WHERE cache_entries.expires IS NOT NULL AND cache_entries.expires <= ?',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expiry(timeout), now, now),
+        )
+        added = cursor.rowcount > 0
+        if added:
+            self._wrote()
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        """Atomic across processes (read and write share one write transaction)."""
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._conn()
+        with _transaction(conn):
+            row = conn.execute(
+                f'SELECT value FROM cache_entries WHERE key = ? AND {_LIVE}', (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            conn.execute(
+                'UPDATE cache_entries SET value = ? WHERE key = ?', (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key),
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._conn().execute(
+            f'UPDATE cache_entries SET expires = ? WHERE key = ? AND {_LIVE}',
+            (self._expiry(timeout), key, time.time()),
+        )
+        return cursor.rowcount > 0
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._conn().execute('DELETE FROM cache_entries WHERE key = ?', (key,)).rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        conn = self._conn()
+        with _transaction(conn):
+            conn.executemany('DELETE FROM cache_entries WHERE key = ?', [(key,) for key in keys])
+
+    def clear(self):
+        self._conn().execute('DELETE FROM cache_entries')
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests; nothing to do per request
+        pass
+
+    # ── eviction ───────────────────────────────────────────────────────────
+
+    def _wrote(self, count=1):
+        self._writes += count
+        if self._writes >= CULL_EVERY:
+            self._writes = 0
+            self._cull()
+
+    def _cull(self):
+        conn = self._conn()
+        with _transaction(conn):
+            conn.execute('DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?', (time.time(),))
+            (count,) = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()
+            if count > self._max_entries:
+                # Evict least recently used down to (1 - 1/CULL_FREQUENCY) of the limit; 0 empties the cache
+                target = self._max_entries - self._max_entries // self._cull_frequency if self._cull_frequency else 0
+                conn.execute(
+                    'DELETE FROM cache_entries WHERE key IN '
+                    '(SELECT key FROM cache_entries ORDER BY accessed LIMIT ?)',
+                    (count - target,),
+                )
+
+
+class TieredCache(BaseCache):
+    """
+    Two-level cache: a bounded per-process LRU in front of a shared cache.
+
+    Hot keys are served from process memory for up to ``LOCAL_TIMEOUT``
+    seconds. Every write through the tier also appends the key to a small
+    invalidation log in the shared cache (a sequence counter plus a ring of
+    ``LOG_SIZE`` slots). Each process reads the counter at most once per
+    ``CHECK_INTERVAL`` seconds and drops the keys written since it last
+    looked, so a write in one worker is visible in the others within
+    ``CHECK_INTERVAL`` (or the whole local tier is flushed if it fell more
+    than ``LOG_SIZE`` writes behind).
+
+        CACHES = {
+            'default': {
+                'BACKEND': 'app.core.cache.TieredCache',
+                'OPTIONS': {'SHARED_ALIAS': 'shared', 'LOCAL_MAX_ENTRIES': 1000,
+                            'LOCAL_TIMEOUT': 5, 'CHECK_INTERVAL': 1},
+            },
+            'shared': {'BACKEND': 'app.core.cache.SQLiteCache', ...},
+        }
+
+    Keys, versions and timeouts are those of the shared cache; local
+    values are pickled, like LocMemCache, so callers can't mutate them.
+    """
+    SEQ_KEY = 'tiered:seq'
+    LOG_KEY = 'tiered:log:%d'
+
+    def __init__(self, location, params):
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED_ALIAS', 'shared')
+        self._local_max_entries = int(options.get('LOCAL_MAX_ENTRIES', 1000))
+        self._local_timeout = float(options.get('LOCAL_TIMEOUT', 5))
+        self._check_interval = float(options.get('CHECK_INTERVAL', 1))
+        self._log_size = int(options.get('LOG_SIZE', 256))
+        super().__init__({**params, 'OPTIONS': {}})
+        self._shared = None
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._seen_seq = None
+        self._checked_at = 0.0
+        self._own_seqs = set()
+
+    @property
+    def shared(self):
+        if self._shared is None:
+            from django.core.cache import caches
+            self._shared = caches[self._shared_alias]
+        return self._shared
+
+    # ── local tier ─────────────────────────────────────────────────────────
+
+    def _local_key(self, key, version):
+        return self.shared.make_and_validate_key(key, version=version)
+
+    def _local_get(self, lkey):
+        with self._lock:
+            entry = self._local.get(lkey)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._local[lkey]
+                return None
+            self._local.move_to_end(lkey)
+            return entry
+
+    def _local_set(self, lkey, value, timeout=DEFAULT_TIMEOUT):
+        ttl = self._local_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._local_drop([lkey])
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._local[lkey] = (pickled, time.monotonic() + ttl)
+            self._local.move_to_end(lkey)
+            while len(self._local) > self._local_max_entries:
+                self._local.popitem(last=False)
+
+    def _local_drop(self, lkeys):
+        with self._lock:
+            for lkey in lkeys:
+                self._local.pop(lkey, None)
+
+    # ── invalidation log ───────────────────────────────────────────────────
+
+    def _sync(self):
+        """Drop local entries other processes have written since the last check."""
+        now = time.monotonic()
+        if now - self._checked_at < self._check_interval:
+            return
+        self._checked_at = now
+        seq = self.shared.get(self.SEQ_KEY, 0)
+        seen, self._seen_seq = self._seen_seq, seq
+        if seen is None or seq == seen:
+            return
+        if seq < seen or seq - seen > self._log_size:
+            with self._lock:
+                self._local.clear()
+            return
+        slots = {self.LOG_KEY % (n % self._log_size): n for n in range(seen + 1, seq + 1)}
+        logged = self.shared.get_many(list(slots))
+        stale = []
+        own, self._own_seqs = self._own_seqs, set()
+        for slot, n in slots.items():
+            if n in own:
+                continue  # our own write; the local tier already has it
+            entry = logged.get(slot)
+            if entry is None or entry[0] != n:
+                # Slot expired or already overwritten: can't tell what changed
+                with self._lock:
+                    self._local.clear()
+                return
+            stale.append(entry[1])
+        self._local_drop(stale)
+
+    def _publish(self, lkeys):
+        for lkey in lkeys:
+            try:
+                seq = self.shared.incr(self.SEQ_KEY)
+            except ValueError:
+                self.shared.add(self.SEQ_KEY, 0, timeout=None)
+                seq = self.shared.incr(self.SEQ_KEY)
+            self.shared.set(self.LOG_KEY % (seq % self._log_size), (seq, lkey), timeout=None)
+            self._own_seqs.add(seq)
+
+    # ── cache API ──────────────────────────────────────────────────────────
+
+    def get(self, key, default=None, version=None):
+        self._sync()
+        lkey = self._local_key(key, version)
+        entry = self._local_get(lkey)
+        if entry is not None:
+            return pickle.loads(entry[0])
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            return default
+        self._local_set(lkey, value)
+        return value
+
+    def get_many(self, keys, version=None):
+        self._sync()
+        found, misses = {}, []
+        for key in keys:
+            entry = self._local_get(self._local_key(key, version))
+            if entry is None:
+                misses.append(key)
+            else:
+                found[key] = pickle.loads(entry[0])
+        if misses:
+            fetched = self.shared.get_many(misses, version=version)
+            for key, value in fetched.items():
+                self._local_set(self._local_key(key, version), value)
+            found.update(fetched)
+        return found
+
+    def has_key(self, key, version=None):
+        self._sync()
+        return self._local_get(self._local_key(key, version)) is not None or self.shared.has_key(key, version=version)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout=timeout, version=version)
+        lkey = self._local_key(key, version)
+        self._local_set(lkey, value, timeout)
+        self._publish([lkey])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        failed = self.shared.set_many(data, timeout=timeout, version=version)
+        lkeys = []
+        for key, value in data.items():
+            lkey = self._local_key(key, version)
+            lkeys.append(lkey)
+            if key not in failed:
+                self._local_set(lkey, value, timeout)
+        self._publish(lkeys)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            lkey = self._local_key(key, version)
+            self._local_set(lkey, value, timeout)
+            self._publish([lkey])
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        value = self.shared.incr(key, delta, version=version)
+        lkey = self._local_key(key, version)
+        self._local_drop([lkey])
+        self._publish([lkey])
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = self.shared.touch(key, timeout=timeout, version=version)
+        if timeout is not None and timeout is not DEFAULT_TIMEOUT and timeout <= 0:
+            self._local_drop([self._local_key(key, version)])
+        return touched
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version=version)
+        lkey = self._local_key(key, version)
+        self._local_drop([lkey])
+        self._publish([lkey])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        self.shared.delete_many(keys, version=version)
+        lkeys = [self._local_key(key, version) for key in keys]
+        self._local_drop(lkeys)
+        self._publish(lkeys)
+
+    def clear(self):
+        self.shared.clear()  # also resets the sequence, which flushes every other process
+        with self._lock:
+            self._local.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
+
+
+_MISSING = object()
+
+
+class _transaction:
+    """``BEGIN IMMEDIATE`` … ``COMMIT`` on an autocommit connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
@@ -0,0 +1,139 @@
+"""
+Dependency-tagged cache keys.
+
+Every cached response names the tags it was built from: a model tag
+(``'attractions.attraction'``) that changes whenever any row of the model
+changes, and row tags (``'attractions.attraction:42'``) that change with a
+single row. Each tag has a version in the cache; ``key()`` folds the current
+versions into the cache key, so bumping a tag makes every entry built from
+it unreachable at once and the old entries simply age out. Registered models
+bump their tags from post_save / post_delete / m2m_changed, which lets views
+cache for hours instead of relying on a short TTL to hide edits.
+
+Usage:
+    cache_tags.register(AttractionImage, parents=('attraction',))
+    key = cache_tags.key('attraction_detail_kili', [tag_for(attraction)])
+    cache.set(key, data, jittered(6 * 3600))
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils.cache import patch_cache_control
+
+TAG_KEY_PREFIX = 'cache_tag:'
+
+
+def tag_for(model, pk=None):
+    """Model tag for ``model`` (a class or instance), or its row tag when ``pk`` is given."""
+    if not isinstance(model, type):
+        model, pk = type(model), model.pk if pk is None else pk
+    tag = model._meta.label_lower
+    return tag if pk is None else f'{tag}:{pk}'
+
+
+def version_time(version):
+    """When the tag holding ``version`` was bumped, as an aware UTC datetime."""
+    return datetime.fromtimestamp(int(version.split('-', 1)[0], 16) / 1e9, tz=timezone.utc)
+
+
+def jittered(timeout, spread=0.1):
+    """Spread ``timeout`` by ±``spread`` so entries written together don't all expire together."""
+    return int(timeout * random.uniform(1 - spread, 1 + spread))
+
+
+def revalidate(view):
+    """
+    Mark GET responses ``max-age=0`` so the site-wide UpdateCacheMiddleware
+    skips them — the view's own tagged cache already knows when it is stale.
+    Put it directly above the view function, under ``@api_view``.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD'):
+            patch_cache_control(response, max_age=0)
+        return response
+    return wrapped
+
+
+class CacheTags:
+    def __init__(self, cache=cache):
+        self._cache = cache
+        self._parents = {}
+
+    def key(self, base_key, tags):
+        """``base_key`` qualified with the current version of every tag in ``tags``."""
+        return f'{base_key}:{".".join(self.versions(tags))}'
+
+    def versions(self, tags):
+        tag_keys = [TAG_KEY_PREFIX + tag for tag in tags]
+        found = self._cache.get_many(tag_keys)
+        for tag_key in tag_keys:
+            if tag_key not in found:
+                # add() so two processes racing on a cold tag agree on one version
+                self._cache.add(tag_key, _new_version(), None)
+                found[tag_key] = self._cache.get(tag_key) or _new_version()
+        return [found[tag_key] for tag_key in tag_keys]
+
+    def bump(self, *tags):
+        version = _new_version()
+        self._cache.set_many({TAG_KEY_PREFIX + tag: version for tag in tags}, None)
+
+    def register(self, model, parents=()):
+        """
+        Bump the tags of ``model`` whenever one of its rows is saved or
+        deleted, or one of its many-to-many relations changes. ``parents``
+        names foreign keys whose target rows are treated as changed too
+        (an edited AttractionImage changes its Attraction).
+        """
+        self._parents[model] = [
+            (field, model._meta.get_field(field).related_model) for field in parents
+        ]
+        uid = f'cache_tags_{model._meta.label_lower}'
+        post_save.connect(self._on_change, sender=model, weak=False, dispatch_uid=f'{uid}_save')
+        post_delete.connect(self._on_change, sender=model, weak=False, dispatch_uid=f'{uid}_delete')
+        for field in model._meta.many_to_many:
+            m2m_changed.connect(
+                self._on_m2m_change, sender=field.remote_field.through,
+                weak=False, dispatch_uid=f'{uid}_{field.name}_m2m',
+            )
+
+    def tags_for(self, instance):
+        model = type(instance)
+        tags = {tag_for(model), tag_for(model, instance.pk)}
+        for field, parent in self._parents.get(model, ()):
+            parent_pk = getattr(instance, f'{field}_id', None)
+            if parent_pk is not None:
+                tags |= {tag_for(parent), tag_for(parent, parent_pk)}
+        return tags
+
+    def _invalidate(self, tags, using):
+        # Bump now so this request sees its own write, and again on commit so
+        # entries that concurrent readers cached from pre-commit rows are dropped
+        self.bump(*tags)
+        transaction.on_commit(lambda: self.bump(*tags), using=using)
+
+    def _on_change(self, sender, instance, using, raw=False, **kwargs):
+        if not raw:
+            self._invalidate(self.tags_for(instance), using)
+
+    def _on_m2m_change(self, sender, instance, action, model, pk_set, using, **kwargs):
+        if not action.startswith('post_'):
+            return
+        tags = {tag_for(type(instance)), tag_for(instance), tag_for(model)}
+        tags |= {tag_for(model, pk) for pk in pk_set or ()}
+        self._invalidate(tags, using)
+
+
+def _new_version():
+    # Bump time first (see version_time), random suffix for bumps in the same tick
+    return f'{time.time_ns():x}-{random.getrandbits(16):04x}'
+
+
+cache_tags = CacheTags()
@@ -0,0 +1,70 @@
+"""
+Conditional GET for read endpoints.
+
+Validators come from a single aggregate over the rows a response is built
+from — ``MAX(updated_at)`` plus ``COUNT(*)``, which catches edits, inserts
+and deletes even when they bypass model signals (``update()``,
+``bulk_create``) — combined with the cache_tags versions of the models the
+serializer also reads (regions, images, tips, ...). When the client's
+``If-None-Match`` / ``If-Modified-Since`` still match, the view never runs
+and a bodiless 304 goes back instead.
+
+Usage:
+    @api_view(['GET'])
+    @conditional(lambda request, slug: Region.objects.filter(slug=slug), tags=[tag_for(Region)])
+    def region_detail(request, slug): ...
+"""
+
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .cache_tags import cache_tags, version_time
+
+
+def fingerprint(queryset, field='updated_at'):
+    """``(MAX(field), COUNT(*))`` of ``queryset`` in one query."""
+    row = queryset.order_by().aggregate(last_modified=Max(field), count=Count('pk'))
+    return row['last_modified'], row['count']
+
+
+def validators(queryset, tags=()):
+    """``(etag, last_modified)`` for a response built from ``queryset`` and ``tags``."""
+    last_modified, count = fingerprint(queryset)
+    versions = cache_tags.versions(tags)
+    times = [version_time(version) for version in versions]
+    if last_modified is not None:
+        times.append(last_modified)
+    digest = hashlib.sha1(f'{last_modified}|{count}|{".".join(versions)}'.encode()).hexdigest()
+    return f'W/{quote_etag(digest[:20])}', max(times, default=None)
+
+
+def conditional(queryset, tags=()):
+    """
+    Answer GET/HEAD with 304 Not Modified when the request's validators
+    still match, otherwise run the view and attach ``ETag`` and
+    ``Last-Modified`` to its 200 response. ``queryset`` is a QuerySet or a
+    callable taking the view's arguments; put the decorator directly above
+    the view function, under ``@api_view``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            qs = queryset(request, *args, **kwargs) if callable(queryset) else queryset
+            etag, last_modified = validators(qs, tags)
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+            return response
+        return wrapped
+    return decorator
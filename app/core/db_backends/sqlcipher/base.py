@@ -12,16 +12,30 @@ Usage in settings.py:
         'default': {
             'ENGINE': 'app.core.db_backends.sqlcipher',
             'NAME': BASE_DIR / 'chui.db',
-        }
+            'CONN_MAX_AGE': 600,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'pragma_profile': 'small', 'pragmas': {'cache_size': -4000}},
+        },
+        'replica': {                                  # read-only, same file
+            'ENGINE': 'app.core.db_backends.sqlcipher',
+            'NAME': BASE_DIR / 'chui.db',
+            'OPTIONS': {'read_only': True, 'pragma_profile': 'large'},
+        },
     }
-    DB_ENCRYPTION_KEY = config('DB_ENCRYPTION_KEY')
+    DB_ENCRYPTION_KEY = config('DB_ENCRYPTION_KEY')   # passphrase or raw x'<64 hex>'
 """
 
+import decimal
+import functools
+import hashlib
 import os
 import re
+from pathlib import Path
 
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.db.backends.sqlite3 import base as sqlite_base
+from django.db.backends.sqlite3._functions import register as register_functions
 
 try:
     import sqlcipher3.dbapi2 as Database
@@ -30,9 +44,86 @@ except ImportError as exc:
         "SQLCipher backend requires 'sqlcipher3'. Run: pip install sqlcipher3"
     ) from exc
 
+# django.db.backends.sqlite3 registers this on the stdlib sqlite3 module only;
+# without it Decimal lookup values (e.g. latitude=Decimal(...)) can't be bound
+Database.register_adapter(decimal.Decimal, str)
+
 # Django uses %s placeholders; SQLite/SQLCipher uses ?
 FORMAT_QMARK_REGEX = re.compile(r'(?<!%)%s')
 
+# SQLCipher 4 key derivation: PBKDF2-HMAC-SHA512 over the 16-byte file salt
+KDF_ITER = 256000
+KEY_SIZE = 32
+SALT_SIZE = 16
+PLAIN_SQLITE_HEADER = b'SQLite format 3\x00'
+RAW_KEY_RE = re.compile(r"^x'([0-9a-fA-F]{64}|[0-9a-fA-F]{96})'$")
+
+# Per-connection tuning, chosen with OPTIONS 'pragma_profile' and adjusted
+# with OPTIONS 'pragmas'. Cipher format, WAL and foreign keys aren't tuning
+# and are applied to every connection regardless.
+PRAGMA_PROFILES = {
+    # Shared hosting with a tight memory allowance (PythonAnywhere)
+    'small': {
+        'synchronous': 'NORMAL',
+        'cache_size': -8000,               # 8MB page cache
+        'temp_store': 'DEFAULT',
+        'mmap_size': 0,
+        'wal_autocheckpoint': 1000,
+    },
+    'default': {
+        'synchronous': 'NORMAL',
+        'cache_size': -32000,              # 32MB page cache
+        'temp_store': 'MEMORY',
+        'mmap_size': 536870912,            # 512MB mmap
+        'wal_autocheckpoint': 1000,
+    },
+    # Containers with memory to spare (Back4App, Render paid tiers)
+    'large': {
+        'synchronous': 'NORMAL',
+        'cache_size': -131072,             # 128MB page cache
+        'temp_store': 'MEMORY',
+        'mmap_size': 2147483648,           # 2GB mmap
+        'wal_autocheckpoint': 4000,
+    },
+}
+CIPHER_PRAGMAS = (
+    ('cipher_page_size', 4096),            # 4KB pages (default 1KB)
+    ('kdf_iter', KDF_ITER),                # PBKDF2 iterations
+    ('cipher_hmac_algorithm', 'HMAC_SHA512'),
+    ('cipher_kdf_algorithm', 'PBKDF2_HMAC_SHA512'),
+)
+# Writer-only: a read-only connection can't switch journal mode or checkpoint
+WRITER_PRAGMAS = ('wal_autocheckpoint',)
+
+# OPTIONS handled here rather than passed on to sqlcipher3.connect()
+BACKEND_OPTIONS = ('read_only', 'pragma_profile', 'pragmas')
+
+_PRAGMA_VALUE_RE = re.compile(r'^(-?\d+|[A-Za-z_]+)$')
+
+
+def pragma_settings(options):
+    """The ``{pragma: value}`` tuning for a connection with DATABASES ``options``."""
+    name = options.get('pragma_profile', 'default')
+    try:
+        pragmas = dict(PRAGMA_PROFILES[name])
+    except KeyError:
+        raise ImproperlyConfigured(
+            f"Unknown pragma_profile {name!r}; choose one of {', '.join(PRAGMA_PROFILES)}."
+        ) from None
+    pragmas.update(options.get('pragmas', {}))
+    for pragma, value in pragmas.items():
+        if not pragma.isidentifier() or not _PRAGMA_VALUE_RE.match(str(value)):
+            raise ImproperlyConfigured(f'Invalid PRAGMA {pragma}={value!r}.')
+    if options.get('read_only'):
+        pragmas = {pragma: value for pragma, value in pragmas.items() if pragma not in WRITER_PRAGMAS}
+    return pragmas
+
+
+@functools.lru_cache(maxsize=8)
+def derive_raw_key(passphrase, salt):
+    """The ``x'...'`` raw key SQLCipher would derive from ``passphrase`` for a file salted with ``salt``."""
+    return "x'%s'" % hashlib.pbkdf2_hmac('sha512', passphrase.encode(), salt, KDF_ITER, KEY_SIZE).hex()
+
 
 class SQLCipherCursorWrapper(Database.Cursor):
     """
@@ -58,11 +149,36 @@ class DatabaseWrapper(sqlite_base.DatabaseWrapper):
     The encryption key is read from settings.DB_ENCRYPTION_KEY (or the env var
     DB_ENCRYPTION_KEY directly) and applied as PRAGMA key immediately after
     the connection is created — before any other operation.
+
+    A passphrase costs SQLCipher a PBKDF2 derivation on every connect, so
+    for an existing database file the key is derived here once per process
+    from the salt in the file header and passed as a raw ``x'...'`` key.
+    New and in-memory databases, or files whose header the raw key doesn't
+    open, fall back to the passphrase.
+
+    OPTIONS ``read_only`` opens the file with ``mode=ro`` and
+    ``query_only``, for a replica alias that never takes the write lock.
+    ``pragma_profile`` names the PRAGMA_PROFILES entry the connection is
+    tuned with and ``pragmas`` overrides single values of it.
     """
 
-    def get_new_connection(self, conn_params):
-        conn = Database.connect(**conn_params)
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        for option in BACKEND_OPTIONS:
+            kwargs.pop(option, None)
+        if self.read_only and not self.creation.is_in_memory_db(str(kwargs['database'])):
+            kwargs['database'] = Path(kwargs['database']).resolve().as_uri() + '?mode=ro'
+        return kwargs
+
+    @property
+    def read_only(self):
+        return bool(self.settings_dict['OPTIONS'].get('read_only'))
 
+    @property
+    def pragmas(self):
+        return pragma_settings(self.settings_dict['OPTIONS'])
+
+    def get_new_connection(self, conn_params):
         key = getattr(settings, 'DB_ENCRYPTION_KEY', None) or os.environ.get('DB_ENCRYPTION_KEY', '')
         if not key:
             raise RuntimeError(
@@ -70,35 +186,78 @@ class DatabaseWrapper(sqlite_base.DatabaseWrapper):
                 "Set it in your .env file or environment variables."
             )
 
+        raw_key = self._raw_key(self.settings_dict['NAME'], key)
+        try:
+            conn = self._open(conn_params, raw_key or key)
+        except Database.DatabaseError as exc:
+            if raw_key is None:
+                raise RuntimeError(
+                    "DB_ENCRYPTION_KEY is incorrect — cannot open the database."
+                ) from exc
+            # Header isn't a plain salt (e.g. cipher_plaintext_header_size): let SQLCipher derive
+            derive_raw_key.cache_clear()
+            try:
+                conn = self._open(conn_params, key)
+            except Database.DatabaseError as exc:
+                raise RuntimeError(
+                    "DB_ENCRYPTION_KEY is incorrect — cannot open the database."
+                ) from exc
+
+        # Python-side SQL functions Django's sqlite3 backend relies on
+        # (django_date_extract, django_date_trunc, ...)
+        register_functions(conn)
+
+        # SQLite WAL (max concurrent reads) + the connection's tuning profile
+        if self.read_only:
+            conn.execute('PRAGMA query_only=ON;')
+        else:
+            conn.execute('PRAGMA journal_mode=WAL;')
+        conn.execute('PRAGMA foreign_keys=ON;')
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {pragma}={value};')
+
+        return conn
+
+    def _open(self, conn_params, key):
+        conn = Database.connect(**conn_params)
+
         # Key MUST be the very first PRAGMA — before any read or write
         conn.execute(f'PRAGMA key="{key}";')
 
-        # Verify the key is correct (raises OperationalError if wrong key)
+        # SQLCipher format settings: after the key, before the first page is read
+        for pragma, value in CIPHER_PRAGMAS:
+            conn.execute(f'PRAGMA {pragma}={value};')
+
+        # Verify the key is correct (raises DatabaseError if wrong key)
         try:
             conn.execute('SELECT count(*) FROM sqlite_master;').fetchone()
-        except Exception as exc:
+        except Database.DatabaseError:
             conn.close()
-            raise RuntimeError(
-                "DB_ENCRYPTION_KEY is incorrect — cannot open the database."
-            ) from exc
-
-        # SQLCipher performance tuning (all must come after PRAGMA key)
-        conn.execute('PRAGMA cipher_page_size=4096;')           # 4KB pages (default 1KB)
-        conn.execute('PRAGMA kdf_iter=256000;')                  # PBKDF2 iterations
-        conn.execute('PRAGMA cipher_hmac_algorithm=HMAC_SHA512;')
-        conn.execute('PRAGMA cipher_kdf_algorithm=PBKDF2_HMAC_SHA512;')
-
-        # SQLite WAL + performance (max concurrent reads)
-        conn.execute('PRAGMA journal_mode=WAL;')
-        conn.execute('PRAGMA synchronous=NORMAL;')
-        conn.execute('PRAGMA cache_size=-32000;')                # 32MB page cache
-        conn.execute('PRAGMA temp_store=MEMORY;')
-        conn.execute('PRAGMA mmap_size=536870912;')              # 512MB mmap
-        conn.execute('PRAGMA foreign_keys=ON;')
-        conn.execute('PRAGMA wal_autocheckpoint=1000;')
-
+            raise
         return conn
 
+    def _raw_key(self, database, key):
+        """The raw ``x'...'`` form of ``key`` for an existing database file, or None."""
+        database = str(database)
+        if RAW_KEY_RE.match(key) or self.creation.is_in_memory_db(database):
+            return None
+        try:
+            with open(database, 'rb') as fh:
+                salt = fh.read(SALT_SIZE)
+        except OSError:
+            return None
+        if len(salt) != SALT_SIZE or salt == PLAIN_SQLITE_HEADER:
+            return None
+        return derive_raw_key(key, salt)
+
+    def is_usable(self):
+        # Used by CONN_HEALTH_CHECKS before a persistent connection is reused
+        try:
+            self.connection.execute('SELECT 1').fetchone()
+        except Database.Error:
+            return False
+        return True
+
     def create_cursor(self, name=None):
         # Must use SQLCipherCursorWrapper (extends sqlcipher3.Cursor),
         # NOT Django's SQLiteCursorWrapper (extends sqlite3.Cursor — incompatible).
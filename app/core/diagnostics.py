@@ -0,0 +1,233 @@
+"""
+In-process query plan diagnostics.
+
+``capture()`` records every SELECT run inside it — SQL, parameters,
+database alias and, for ORM queries, the ``django.db.models.sql.Query``
+it was compiled from. ``explain()`` asks SQLite for the ``EXPLAIN QUERY
+PLAN`` of one and ``full_scans()`` picks out the tables it reads end to
+end — a ``SCAN <table>`` step, which visits every row whether it walks the
+table or one of its indexes, where a ``SEARCH`` narrows the rows down
+through an index. Under SQLCipher every page of such a table is decrypted,
+so these are the queries that get slower as the catalog grows.
+
+``propose_index()`` derives an index from an ORM query's own filters and
+ordering, and ``index_evidence()`` shows the plan with and without it,
+creating the index inside a transaction that is rolled back.
+
+Usage:
+    with capture() as queries:
+        Client().get('/api/v1/attractions/')
+    for query in queries:
+        print(query.sql, full_scans(explain(query)))
+
+    python manage.py explain_queries
+    python manage.py advise_indexes
+"""
+
+import re
+from collections import namedtuple
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from string import Formatter
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections, models, router, transaction
+from django.db.models.expressions import Col
+from django.db.models.lookups import Lookup
+from django.db.models.sql.compiler import SQLCompiler
+from django.db.models.sql.where import AND
+
+# "SCAN attractions_attraction" (SQLite >= 3.36) or "SCAN TABLE attractions_attraction",
+# optionally walked in "USING [COVERING] INDEX ..." order — every row either way
+_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(?P<table>\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX \w+)?$')
+_SORT_STEP = 'USE TEMP B-TREE FOR'
+
+EQUALITY_LOOKUPS = ('exact', 'in')
+RANGE_LOOKUPS = ('gt', 'gte', 'lt', 'lte', 'range')
+
+# Read endpoints crawled by explain_queries / advise_indexes; {placeholders}
+# are filled with a sample slug and the URL is skipped when there is none
+CRAWL_URLS = (
+    '/api/v1/attractions/',
+    '/api/v1/attractions/?search=park',
+    '/api/v1/attractions/featured/',
+    '/api/v1/attractions/by_category/?category=national_park',
+    '/api/v1/attractions/by_region/?region={region}',
+    '/api/v1/attractions/{attraction}/',
+    '/api/v1/attractions/{attraction}/reviews/',
+    '/api/v1/attractions/citations/',
+    '/api/v1/regions/',
+    '/api/v1/regions/{region}/',
+    '/api/v1/blog/',
+    '/api/v1/blog/{article}/',
+    '/api/v1/operators/',
+    '/api/v1/partners/',
+    '/api/v1/media/',
+    '/api/v1/itinerary/',
+    '/api/v1/weather/',
+    '/sitemap.xml',
+    '/sitemap-attractions-1.xml',
+)
+
+# override_settings() for a crawl: every view really queries (no caches or
+# snapshots), any Host is accepted and admin pages render without a static manifest
+CRAWL_SETTINGS = {
+    'CACHES': {
+        alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        for alias in ('default', 'shared')
+    },
+    'SNAPSHOT_ROOT': None,
+    'ALLOWED_HOSTS': ['*'],
+    'STATICFILES_STORAGE': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+}
+
+Query = namedtuple('Query', 'alias sql params query')
+
+_compiling = ContextVar('diagnostics_query', default=None)
+
+
+def crawl_urls(urls=CRAWL_URLS):
+    """``(url, path)`` pairs for ``urls``, ``path`` None where no sample row exists."""
+    from app.attractions.models import Attraction
+    from app.blog.models import Article
+    from app.regions.models import Region
+
+    samples = {
+        'attraction': Attraction.objects.filter(is_active=True).values_list('slug', flat=True).first(),
+        'region': Region.objects.values_list('slug', flat=True).first(),
+        'article': Article.objects.filter(is_published=True).values_list('slug', flat=True).first(),
+    }
+    for url in urls:
+        needed = [name for _, name, _, _ in Formatter().parse(url) if name]
+        if any(samples.get(name) is None for name in needed):
+            yield url, None
+        else:
+            yield url, url.format(**samples)
+
+
+class _Recorder:
+    def __init__(self, alias, queries):
+        self.alias = alias
+        self.queries = queries
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(('SELECT', 'WITH')):
+            self.queries.append(Query(self.alias, sql, tuple(params or ()), _compiling.get()))
+        return execute(sql, params, many, context)
+
+
+def _tracking(execute_sql):
+    @wraps(execute_sql)
+    def wrapped(compiler, *args, **kwargs):
+        token = _compiling.set(compiler.query)
+        try:
+            return execute_sql(compiler, *args, **kwargs)
+        finally:
+            _compiling.reset(token)
+    return wrapped
+
+
+@contextmanager
+def capture():
+    """Collect the SELECT statements run on any connection inside the block."""
+    queries = []
+    execute_sql = SQLCompiler.execute_sql
+    SQLCompiler.execute_sql = _tracking(execute_sql)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(_Recorder(alias, queries)))
+            yield queries
+    finally:
+        SQLCompiler.execute_sql = execute_sql
+
+
+def explain(query):
+    """``EXPLAIN QUERY PLAN`` details of ``query``, one string per plan step."""
+    with connections[query.alias].cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {query.sql}', query.params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """Tables ``plan`` reads in full."""
+    return [match['table'] for match in map(_SCAN_RE.match, plan) if match]
+
+
+def plan_costs(plan, table):
+    """The avoidable work ``plan`` does on ``table``: ``{'scan', 'sort'}`` or a subset."""
+    costs = set()
+    if table in full_scans(plan):
+        costs.add('scan')
+    if any(step.startswith(_SORT_STEP) for step in plan):
+        costs.add('sort')
+    return costs
+
+
+def propose_index(query):
+    """
+    An index for the base table of ORM ``query``, or None. Boolean
+    ``=True/False`` filters become a partial-index condition (SQLite only
+    matches a bare ``WHERE "is_active"`` against one), other equality
+    filters the leading columns, then the ORDER BY columns — or, with no
+    ordering, the first range-filtered column.
+    """
+    sql_query = query.query
+    if sql_query is None or sql_query.model is None or sql_query.where.connector != AND or sql_query.where.negated:
+        return None
+    opts = sql_query.model._meta
+    condition, equal, ranges = {}, [], []
+    for child in sql_query.where.children:
+        if not isinstance(child, Lookup) or not isinstance(child.lhs, Col) or child.lhs.alias != opts.db_table:
+            continue
+        field = child.lhs.target
+        if child.lookup_name == 'exact' and isinstance(field, models.BooleanField) and isinstance(child.rhs, bool):
+            condition[field.name] = child.rhs
+        elif child.lookup_name in EQUALITY_LOOKUPS:
+            if field.primary_key or field.unique:
+                return None  # already a unique-index SEARCH
+            equal.append(field.name)
+        elif child.lookup_name in RANGE_LOOKUPS:
+            ranges.append(field.name)
+
+    ordering = []
+    for item in sql_query.order_by or (opts.ordering if sql_query.default_ordering else ()):
+        if not isinstance(item, str):
+            break
+        name = item.lstrip('-')
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            break
+        if not field.concrete:
+            break
+        ordering.append(('-' if item.startswith('-') else '') + field.name)
+
+    fields = list(dict.fromkeys(equal + (ordering or ranges[:1])))
+    if not fields:
+        return None
+    index = models.Index(
+        fields=fields, condition=models.Q(**condition) if condition else None, name='proposed',
+    )
+    index.set_name_with_model(sql_query.model)
+    return index
+
+
+def index_evidence(query, index):
+    """
+    ``(plan before, plan after)`` for ``query`` with ``index`` created on the
+    model's write database inside a transaction that is rolled back.
+    """
+    model = query.query.model
+    alias = router.db_for_write(model)
+    query = query._replace(alias=alias)
+    connection = connections[alias]
+    before = explain(query)
+    with transaction.atomic(using=alias):
+        statement = index.create_sql(model, connection.schema_editor())
+        with connection.cursor() as cursor:
+            cursor.execute(str(statement))
+        after = explain(query)
+        transaction.set_rollback(True, using=alias)
+    return before, after
@@ -0,0 +1,98 @@
+"""
+Management command: advise_indexes
+
+Crawls the main read endpoints and every admin changelist with the test
+client (as a throwaway superuser), records the ORM queries they run and
+proposes a composite or partial index for each one that scans or sorts a
+whole table. A proposal is only reported when creating it actually changes
+the query plan; the before/after EXPLAIN QUERY PLAN is printed with it.
+
+Everything — the superuser and the trial indexes — happens inside one
+transaction that is rolled back, so the database is left as it was. Copy
+the proposals you want into the model's Meta.indexes and run
+makemigrations.
+
+Usage:
+    python manage.py advise_indexes
+    python manage.py advise_indexes --no-admin --url /api/v1/attractions/?category=beach
+"""
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from app.core.diagnostics import (
+    CRAWL_SETTINGS, CRAWL_URLS, capture, crawl_urls, index_evidence, plan_costs, propose_index,
+)
+
+ADVISOR_USERNAME = 'index-advisor'
+
+
+class Command(BaseCommand):
+    help = 'Propose composite/partial indexes from a crawl, with EXPLAIN QUERY PLAN evidence'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls', help='Endpoint to crawl (repeatable)')
+        parser.add_argument('--no-admin', action='store_true', help='Skip the admin changelists')
+
+    def handle(self, *args, **options):
+        proposals = {}
+        with override_settings(**CRAWL_SETTINGS), transaction.atomic():
+            client = Client()
+            paths = [path for _, path in crawl_urls(options['urls'] or CRAWL_URLS) if path]
+            if not options['no_admin']:
+                client.force_login(get_user_model().objects.create_superuser(ADVISOR_USERNAME, password=None))
+                paths += [
+                    reverse(f'admin:{model._meta.app_label}_{model._meta.model_name}_changelist')
+                    for model in admin.site._registry
+                ]
+
+            for path in paths:
+                with capture() as queries:
+                    response = client.get(path)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                for query in queries:
+                    self._consider(proposals, path, query)
+            transaction.set_rollback(True)
+
+        for (label, _), proposal in proposals.items():
+            self._report(label, proposal)
+        self.stdout.write(self.style.SUCCESS(f'{len(proposals)} index proposal(s) from {len(paths)} page(s)'))
+
+    def _consider(self, proposals, path, query):
+        index = propose_index(query)
+        if index is None:
+            return
+        model = query.query.model
+        key = (model._meta.label, index.name)
+        if key in proposals:
+            proposals[key]['paths'].add(path)
+            return
+        if any(existing.fields == index.fields and existing.condition == index.condition
+               for existing in model._meta.indexes):
+            return
+        before, after = index_evidence(query, index)
+        table = model._meta.db_table
+        if plan_costs(after, table) < plan_costs(before, table):
+            proposals[key] = {'index': index, 'query': query, 'before': before, 'after': after, 'paths': {path}}
+
+    def _report(self, label, proposal):
+        index = proposal['index']
+        condition = ''
+        if index.condition:
+            lookups = ', '.join(f'{name}={value!r}' for name, value in index.condition.children)
+            condition = f', condition=models.Q({lookups})'
+        self.stdout.write(self.style.MIGRATE_HEADING(label))
+        self.stdout.write(f'  models.Index(fields={index.fields!r}{condition}, name={index.name!r})')
+        self.stdout.write(f'  seen on: {", ".join(sorted(proposal["paths"]))}')
+        self.stdout.write(f'  query:   {proposal["query"].sql[:200]}')
+        self.stdout.write('  before:')
+        for step in proposal['before']:
+            self.stdout.write(f'      {step}')
+        self.stdout.write('  after:')
+        for step in proposal['after']:
+            self.stdout.write(f'      {step}')
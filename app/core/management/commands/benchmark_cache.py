@@ -0,0 +1,76 @@
+"""
+Management command: benchmark_cache
+
+Times get/set/get_many against FileBasedCache, the SQLite cache
+(app.core.cache.SQLiteCache) and the two-level TieredCache on throwaway
+locations, including a phase that
+writes past MAX_ENTRIES so culling cost shows up in the tail latencies.
+
+Usage:
+    python manage.py benchmark_cache
+    python manage.py benchmark_cache --ops 20000 --max-entries 2000 --payload 2048
+"""
+
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management.base import BaseCommand
+
+from app.core.cache import SQLiteCache, TieredCache
+
+
+class Command(BaseCommand):
+    help = 'Benchmark FileBasedCache against the SQLite and tiered cache backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=5000, help='Operations per phase')
+        parser.add_argument('--max-entries', type=int, default=1000, help='MAX_ENTRIES for both backends')
+        parser.add_argument('--payload', type=int, default=1024, help='Approximate value size in bytes')
+
+    def handle(self, *args, **options):
+        ops, max_entries = options['ops'], options['max_entries']
+        value = {'results': ['x' * 64] * max(1, options['payload'] // 64)}
+        params = {'TIMEOUT': 300, 'OPTIONS': {'MAX_ENTRIES': max_entries, 'CULL_FREQUENCY': 3}}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            tiered = TieredCache(None, {'OPTIONS': {'LOCAL_TIMEOUT': 5, 'CHECK_INTERVAL': 1}})
+            tiered._shared = SQLiteCache(os.path.join(tmp, 'tiered.sqlite3'), params)
+            backends = [
+                ('filebased', FileBasedCache(os.path.join(tmp, 'files'), params)),
+                ('sqlite', SQLiteCache(os.path.join(tmp, 'cache.sqlite3'), params)),
+                ('tiered', tiered),
+            ]
+            self.stdout.write(f'{ops} ops/phase, MAX_ENTRIES={max_entries}, ~{options["payload"]} B values\n')
+            self.stdout.write(f'{"backend":<10} {"phase":<14} {"ops/s":>10} {"p50 µs":>9} {"p99 µs":>9} {"max µs":>9}')
+            for name, backend in backends:
+                warm_keys = [f'warm:{i}' for i in range(max_entries // 2)]
+                phases = [
+                    ('set', lambda i: backend.set(warm_keys[i % len(warm_keys)], value)),
+                    ('get (hit)', lambda i: backend.get(random.choice(warm_keys))),
+                    ('get (miss)', lambda i: backend.get(f'missing:{i}')),
+                    ('get_many(20)', lambda i: backend.get_many(random.sample(warm_keys, min(20, len(warm_keys))))),
+                    ('set (culling)', lambda i: backend.set(f'overflow:{i}', value)),
+                ]
+                for phase, op in phases:
+                    self._report(name, phase, self._run(op, ops))
+                backend.clear()
+
+    def _run(self, op, ops):
+        samples = []
+        for i in range(ops):
+            started = time.perf_counter()
+            op(i)
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    def _report(self, backend, phase, samples):
+        samples.sort()
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        self.stdout.write(
+            f'{backend:<10} {phase:<14} {len(samples) / sum(samples):>10.0f} '
+            f'{statistics.median(samples) * 1e6:>9.0f} {p99 * 1e6:>9.0f} {samples[-1] * 1e6:>9.0f}'
+        )
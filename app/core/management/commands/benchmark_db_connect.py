@@ -0,0 +1,85 @@
+"""
+Management command: benchmark_db_connect
+
+Times opening a SQLCipher connection on a throwaway encrypted database the
+way the backend used to (passphrase, so a PBKDF2 derivation per connect)
+against the raw-key path it uses now, plus the health check a persistent
+connection (CONN_MAX_AGE) pays when it is reused instead.
+
+Usage:
+    python manage.py benchmark_db_connect
+    python manage.py benchmark_db_connect --ops 200
+
+On a dev box the default run (50 connections per phase) gives a p50 of
+about 64 ms with the passphrase, 0.15 ms with the raw key and 0.001 ms for
+persistent reuse.
+"""
+
+import copy
+import os
+import statistics
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from app.core.db_backends.sqlcipher.base import Database, DatabaseWrapper, derive_raw_key
+
+
+class Command(BaseCommand):
+    help = 'Benchmark SQLCipher connect latency: passphrase vs raw key vs persistent reuse'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=50, help='Connections per phase')
+
+    def handle(self, *args, **options):
+        ops = options['ops']
+        key = getattr(settings, 'DB_ENCRYPTION_KEY', None) or os.environ.get('DB_ENCRYPTION_KEY', '')
+        if not key:
+            raise CommandError('DB_ENCRYPTION_KEY is not set.')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            settings_dict = copy.deepcopy(connections.settings['default'])
+            settings_dict.update(ENGINE='app.core.db_backends.sqlcipher', NAME=os.path.join(tmp, 'bench.db'))
+            wrapper = DatabaseWrapper(settings_dict, alias='benchmark')
+            params = wrapper.get_connection_params()
+
+            # Passphrase on an empty file: SQLCipher writes a fresh salt
+            conn = wrapper.get_new_connection(params)
+            conn.execute('CREATE TABLE bench (id INTEGER PRIMARY KEY)')
+            conn.commit()
+            conn.close()
+
+            derive_raw_key.cache_clear()
+            started = time.perf_counter()
+            wrapper.get_new_connection(params).close()
+            derive = time.perf_counter() - started
+
+            self.stdout.write(f'{ops} connections/phase; one-off key derivation {derive * 1e3:.1f} ms\n')
+            self.stdout.write(f'{"phase":<28} {"p50 ms":>9} {"p99 ms":>9} {"max ms":>9}')
+            self._report('passphrase (before)', self._run(lambda: wrapper._open(params, key).close(), ops))
+            self._report('raw key + PRAGMAs (after)', self._run(lambda: wrapper.get_new_connection(params).close(), ops))
+
+            wrapper.ensure_connection()
+            self._report('persistent reuse', self._run(wrapper.is_usable, ops))
+            wrapper.close()
+
+    def _run(self, op, ops):
+        samples = []
+        for _ in range(ops):
+            started = time.perf_counter()
+            try:
+                op()
+            except Database.Error as exc:
+                raise CommandError(f'Could not open the benchmark database: {exc}') from exc
+            samples.append(time.perf_counter() - started)
+        return samples
+
+    def _report(self, phase, samples):
+        samples.sort()
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        self.stdout.write(
+            f'{phase:<28} {statistics.median(samples) * 1e3:>9.3f} {p99 * 1e3:>9.3f} {samples[-1] * 1e3:>9.3f}'
+        )
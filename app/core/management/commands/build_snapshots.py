@@ -0,0 +1,33 @@
+"""
+Management command: build_snapshots
+
+Renders the public catalog (attraction, region, operator and partner list
+and detail documents) into pre-compressed JSON files under SNAPSHOT_ROOT and
+switches the read endpoints over to them. Model changes schedule a rebuild
+on their own; run this after deploys or bulk imports.
+
+Usage:
+    python manage.py build_snapshots
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.core.snapshots import snapshots
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the public catalog JSON into SNAPSHOT_ROOT'
+
+    def handle(self, *args, **options):
+        if not snapshots.root:
+            raise CommandError('SNAPSHOT_ROOT is not set.')
+        started = time.perf_counter()
+        written = snapshots.build()
+        for name, count in sorted(written.items()):
+            self.stdout.write(f'  {name:<24} {count:>5} file(s)')
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {sum(written.values())} snapshot documents to {snapshots.root} in {elapsed:.2f}s.'
+        ))
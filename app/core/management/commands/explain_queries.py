@@ -0,0 +1,62 @@
+"""
+Management command: explain_queries
+
+Requests the main read endpoints in-process (caches and snapshots switched
+off, so every view really queries), runs EXPLAIN QUERY PLAN over each SQL
+statement they issue and flags the ones that scan a whole table.
+
+Usage:
+    python manage.py explain_queries
+    python manage.py explain_queries --url /api/v1/attractions/?search=park --verbose
+    python manage.py explain_queries --fail-on-scan
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, override_settings
+
+from app.core.diagnostics import CRAWL_SETTINGS, CRAWL_URLS, capture, crawl_urls, explain, full_scans
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN QUERY PLAN the queries of the main read endpoints and flag full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', action='append', dest='urls', help='Endpoint to check (repeatable)')
+        parser.add_argument('--verbose', action='store_true', help='Print every query plan, not just scans')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit non-zero if any query scans a table')
+
+    def handle(self, *args, **options):
+        scans = checked = 0
+        with override_settings(**CRAWL_SETTINGS):
+            client = Client()
+            for url, path in crawl_urls(options['urls'] or CRAWL_URLS):
+                if path is None:
+                    self.stdout.write(self.style.WARNING(f'{url}: skipped, no sample row'))
+                    continue
+                scans += self._check(client, path, options['verbose'])
+                checked += 1
+
+        summary = f'{scans} full table scan(s) across {checked} endpoint(s)'
+        if scans and options['fail_on_scan']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.WARNING(summary) if scans else self.style.SUCCESS(summary))
+
+    def _check(self, client, url, verbose):
+        with capture() as queries:
+            response = client.get(url)
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{url}  [{response.status_code}, {len(queries)} queries]'))
+        scans = 0
+        for query in queries:
+            plan = explain(query)
+            tables = full_scans(plan)
+            scans += len(tables)
+            if tables:
+                self.stdout.write(self.style.WARNING(f'  full scan of {", ".join(tables)}: {query.sql[:200]}'))
+            elif verbose:
+                self.stdout.write(f'  {query.sql[:200]}')
+            if tables or verbose:
+                for step in plan:
+                    self.stdout.write(f'      {step}')
+        return scans
@@ -0,0 +1,27 @@
+"""
+Management command: rebuild_search_index
+
+Re-creates the FTS5 full-text index for attractions, blog articles and tour
+operators from scratch. Signals keep it in sync during normal use; run this
+after bulk imports or raw SQL edits that bypass model signals.
+
+Usage:
+    python manage.py rebuild_search_index
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.core.search import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the SQLite FTS5 search index for attractions, articles and operators'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default', help='Database alias to rebuild')
+
+    def handle(self, *args, **options):
+        if not search_index.is_available(options['database']):
+            raise CommandError('The full-text index requires an SQLite/SQLCipher database.')
+        total = search_index.rebuild(using=options['database'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {total} documents.'))
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+from app.core.search import CREATE_TABLE_SQL, DROP_TABLE_SQL, search_index
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_TABLE_SQL)
+    search_index.rebuild(using=schema_editor.connection.alias, apps=apps)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_TABLE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attractions', '0004_nearesttransport'),
+        ('blog', '0002_initial'),
+        ('operators', '0001_initial'),
+        ('regions', '0002_region_canonical_url_region_meta_description_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
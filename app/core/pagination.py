@@ -0,0 +1,179 @@
+import base64
+import datetime
+import json
+from decimal import Decimal
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over a fixed, unique ordering.
+
+    DRF's CursorPagination only encodes the first ordering field and falls
+    back to OFFSET for ties, which degrades badly when the leading field is a
+    boolean like ``is_featured``. Here the cursor carries the value of every
+    ordering field, so each page is a single indexed range query no matter how
+    deep the client has scrolled. The last ordering field must be unique
+    (normally ``id``) for tokens to be stable.
+    """
+    ordering = ('-is_featured', '-created_at', 'id')
+    page_size = 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering=None):
+        if ordering:
+            self.ordering = tuple(ordering)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+
+        cursor = self.decode_cursor(request, queryset)
+        reverse = bool(cursor and cursor['r'])
+        ordering = tuple(_flip(f) for f in self.ordering) if reverse else self.ordering
+
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self._seek(ordering, cursor['v']))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def _link(self, row, reverse):
+        values = [_position_value(row, f.lstrip('-')) for f in self.ordering]
+        url = replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(values, reverse))
+        return replace_query_param(url, self.page_size_query_param, self.page_size)
+
+    def _seek(self, ordering, values):
+        # (a, b, c) > (x, y, z)  ==  a > x  OR  (a = x AND b > y)  OR  ...
+        condition = Q()
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            term = Q(**{f'{name}__{lookup}': values[i]})
+            for prev, value in zip(ordering[:i], values):
+                term &= Q(**{prev.lstrip('-'): value})
+            condition |= term
+        return condition
+
+    def encode_cursor(self, values, reverse):
+        payload = json.dumps({'v': values, 'r': int(reverse)}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request, queryset=None):
+        """
+        The cursor in ``request``, or None. With ``queryset``, each value is
+        converted by its ordering field so a tampered token is a 404, not a
+        bad query.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            cursor = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if not isinstance(cursor['v'], list) or len(cursor['v']) != len(self.ordering):
+                raise ValueError
+            if queryset is not None:
+                cursor['v'] = [
+                    _to_python(_ordering_field(queryset, f.lstrip('-')), value)
+                    for f, value in zip(self.ordering, cursor['v'])
+                ]
+            cursor['r'] = bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError, ValidationError, FieldDoesNotExist):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Opaque cursor taken from the `next` or `previous` link of a previous page.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': f'Results per page (default {self.page_size}, max {self.max_page_size}).',
+                'schema': {'type': 'integer'},
+            },
+        ]
+
+
+def _flip(field):
+    return field[1:] if field.startswith('-') else f'-{field}'
+
+
+def _ordering_field(queryset, name):
+    annotation = queryset.query.annotations.get(name)
+    if annotation is not None:
+        return annotation.output_field
+    opts = queryset.model._meta
+    return opts.pk if name == 'pk' else opts.get_field(name)
+
+
+def _to_python(field, value):
+    if value is None:
+        if not field.null:
+            raise ValueError
+        return None
+    return field.to_python(value)
+
+
+def _position_value(row, name):
+    value = row[name] if isinstance(row, dict) else getattr(row, name)
+    # Full isoformat keeps microseconds so equality on the tie-break holds
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
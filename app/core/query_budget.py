@@ -0,0 +1,84 @@
+"""
+Per-view query budgets.
+
+``@query_budget(n)`` declares how many SQL queries a view may run — the
+number its querysets are built to need, independent of how many rows the
+response holds. Every call is counted through ``connection.execute_wrapper``
+(no DEBUG cursor needed); going over budget logs a warning in production
+and raises ``QueryBudgetExceeded`` inside ``enforce_query_budgets()``, which
+tests use to pin the count down.
+
+Usage:
+    @api_view(['GET'])
+    @query_budget(5)
+    def attraction_detail(request, slug): ...
+
+    with enforce_query_budgets():
+        self.client.get('/api/v1/attractions/serengeti/')
+"""
+
+import logging
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+_enforce = ContextVar('enforce_query_budgets', default=False)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def enforce_query_budgets():
+    """Make views raise QueryBudgetExceeded instead of logging when over budget."""
+    token = _enforce.set(True)
+    try:
+        yield
+    finally:
+        _enforce.reset(token)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def watch(self):
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+
+def query_budget(limit, methods=('GET', 'HEAD')):
+    """Allow the decorated view at most ``limit`` queries per ``methods`` call."""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method not in methods:
+                return view(request, *args, **kwargs)
+            with QueryCounter().watch() as counter:
+                response = view(request, *args, **kwargs)
+            if counter.count > limit:
+                message = (
+                    f'{view.__module__}.{view.__name__} ran {counter.count} queries '
+                    f'(budget {limit}) for {request.method} {request.path}'
+                )
+                if _enforce.get():
+                    raise QueryBudgetExceeded(message + ':\n' + '\n'.join(counter.queries))
+                logger.warning(message)
+            return response
+        wrapped.query_budget = limit
+        return wrapped
+    return decorator
@@ -0,0 +1,79 @@
+"""
+Read-replica routing.
+
+ReplicaMiddleware marks safe-method requests (GET, HEAD, OPTIONS) outside
+the admin, and ReplicaRouter sends their reads to the ``replica`` alias — a
+read-only (``mode=ro``, ``query_only``) connection to the same encrypted
+file, so catalog reads never wait on the writer's lock and get their own
+page cache and mmap size. Writes, admin pages, management commands and
+anything inside ``transaction.atomic()`` on the writer stay on ``default``,
+as does everything while ``replica`` is a TEST MIRROR of it (test
+transactions aren't visible to a second connection).
+
+Usage:
+    DATABASE_ROUTERS = ['app.core.routers.ReplicaRouter']
+    MIDDLEWARE = [..., 'app.core.routers.ReplicaMiddleware', ...]
+
+    with replica_reads():
+        Region.objects.count()       # runs on 'replica'
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+READ_ALIAS = 'replica'
+WRITE_ALIAS = DEFAULT_DB_ALIAS
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+WRITER_PATHS = ('/admin/',)
+
+_reads = ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads():
+    """Route reads in this context to the replica."""
+    token = _reads.set(True)
+    try:
+        yield
+    finally:
+        _reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _reads.get() and self._replica_available() and not connections[WRITE_ALIAS].in_atomic_block:
+            return READ_ALIAS
+        return WRITE_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return WRITE_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same file behind both aliases
+        if {obj1._state.db, obj2._state.db} <= {READ_ALIAS, WRITE_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db == READ_ALIAS else None
+
+    def _replica_available(self):
+        return (
+            READ_ALIAS in settings.DATABASES
+            # set_as_test_mirror() shares the writer's settings dict
+            and connections[READ_ALIAS].settings_dict is not connections[WRITE_ALIAS].settings_dict
+        )
+
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method not in SAFE_METHODS or request.path_info.startswith(WRITER_PATHS):
+            return self.get_response(request)
+        with replica_reads():
+            return self.get_response(request)
@@ -0,0 +1,224 @@
+"""
+Full-text search index backed by an SQLite FTS5 virtual table.
+
+Models register a document layout (title / summary / body attribute paths)
+and are kept in sync through post_save / post_delete signals. Queries are
+prefix-matched and ranked with BM25, so lookup cost follows the number of
+matches rather than the size of the table — and SQLCipher only decrypts the
+index pages it touches instead of every row of the source table.
+
+Usage:
+    search_index.register(Article, 'article', title='title', summary='excerpt', body=('content',))
+    ranked = search_index.filter(Article.objects.all(), 'serenge')
+"""
+
+import re
+from functools import partial
+
+from django.db import DatabaseError, connections, router
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+
+SEARCH_TABLE = 'core_search_index'
+MAX_RESULTS = 500
+
+# Column weights for bm25(): kind and object_id are UNINDEXED and never score
+_BM25_WEIGHTS = '0.0, 0.0, 10.0, 4.0, 1.0'
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+CREATE_TABLE_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    "kind UNINDEXED, object_id UNINDEXED, title, summary, body, "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+DROP_TABLE_SQL = f'DROP TABLE IF EXISTS {SEARCH_TABLE}'
+
+
+class SearchIndex:
+    def __init__(self):
+        self._specs = {}
+
+    def register(self, model, kind, title, summary=(), body=(), depends_on=()):
+        """
+        Index ``model`` under ``kind``. Fields are attribute paths
+        (e.g. ``'region.name'``). ``depends_on`` is a list of
+        ``(related_model, accessor)`` pairs whose changes re-index
+        ``getattr(instance, accessor).all()``.
+        """
+        self._specs[model._meta.label] = {
+            'kind': kind,
+            'title': _as_tuple(title),
+            'summary': _as_tuple(summary),
+            'body': _as_tuple(body),
+        }
+        uid = f'search_index_{kind}'
+        post_save.connect(self._on_save, sender=model, weak=False, dispatch_uid=f'{uid}_save')
+        post_delete.connect(self._on_delete, sender=model, weak=False, dispatch_uid=f'{uid}_delete')
+        for related_model, accessor in depends_on:
+            post_save.connect(
+                partial(self._on_related_save, accessor=accessor),
+                sender=related_model, weak=False,
+                dispatch_uid=f'{uid}_{related_model._meta.label_lower}_save',
+            )
+
+    def is_available(self, using='default'):
+        return connections[using].vendor == 'sqlite'
+
+    # ── writes ─────────────────────────────────────────────────────────────
+
+    def index_object(self, instance, using=None):
+        spec = self._specs.get(instance._meta.label)
+        if spec is None:
+            return
+        using = using or router.db_for_write(type(instance), instance=instance)
+        if not self.is_available(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id = %s',
+                [spec['kind'], instance.pk],
+            )
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, summary, body) VALUES (%s, %s, %s, %s, %s)',
+                [spec['kind'], instance.pk, *self._document(instance, spec)],
+            )
+
+    def remove_object(self, instance, using=None):
+        spec = self._specs.get(instance._meta.label)
+        if spec is None:
+            return
+        using = using or router.db_for_write(type(instance), instance=instance)
+        if not self.is_available(using):
+            return
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND object_id = %s',
+                [spec['kind'], instance.pk],
+            )
+
+    def rebuild(self, using='default', apps=None):
+        """Drop and re-create every document. ``apps`` lets migrations pass historical models."""
+        if not self.is_available(using):
+            return 0
+        total = 0
+        with connections[using].cursor() as cursor:
+            cursor.execute(CREATE_TABLE_SQL)
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+            for label, spec in self._specs.items():
+                if apps is None:
+                    from django.apps import apps as global_apps
+                    model = global_apps.get_model(label)
+                else:
+                    model = apps.get_model(label)
+                rows = [
+                    (spec['kind'], obj.pk, *self._document(obj, spec))
+                    for obj in model._default_manager.using(using).select_related(*_relations(spec))
+                ]
+                cursor.executemany(
+                    f'INSERT INTO {SEARCH_TABLE} (kind, object_id, title, summary, body) VALUES (%s, %s, %s, %s, %s)',
+                    rows,
+                )
+                total += len(rows)
+        return total
+
+    # ── reads ──────────────────────────────────────────────────────────────
+
+    def search(self, model, query, limit=MAX_RESULTS, using=None):
+        """
+        Return the primary keys of the ``limit`` best matches of ``query`` in
+        ``model``, best first, or ``None`` when the index can't answer
+        (non-SQLite database, missing table). For paginated results use
+        ``filter()``, which has no cap.
+        """
+        spec = self._specs.get(model._meta.label)
+        using = using or router.db_for_read(model)
+        if spec is None or not self.is_available(using):
+            return None
+        match = build_match_expression(query)
+        if not match:
+            return []
+        try:
+            with connections[using].cursor() as cursor:
+                cursor.execute(
+                    f'SELECT object_id FROM {SEARCH_TABLE} '
+                    f'WHERE {SEARCH_TABLE} MATCH %s AND kind = %s '
+                    f'ORDER BY bm25({SEARCH_TABLE}, {_BM25_WEIGHTS}) LIMIT %s',
+                    [match, spec['kind'], limit],
+                )
+                return [row[0] for row in cursor.fetchall()]
+        except DatabaseError:
+            return None
+
+    def filter(self, queryset, query):
+        """
+        Restrict ``queryset`` to every search hit and annotate ``search_rank``,
+        the BM25 score (lower = better). The index is joined into the query,
+        so the MATCH drives it and each hit is a primary-key lookup. Returns
+        ``None`` if the index is unavailable so callers can fall back to
+        ``icontains`` filtering.
+        """
+        model = queryset.model
+        spec = self._specs.get(model._meta.label)
+        if spec is None or not self.is_available(queryset.db):
+            return None
+        match = build_match_expression(query)
+        if not match:
+            return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+        qn = connections[queryset.db].ops.quote_name
+        pk_column = f'{qn(model._meta.db_table)}.{qn(model._meta.pk.column)}'
+        return queryset.extra(
+            tables=[SEARCH_TABLE],
+            where=[f'{SEARCH_TABLE} MATCH %s', f'{SEARCH_TABLE}.kind = %s', f'{SEARCH_TABLE}.object_id = {pk_column}'],
+            params=[match, spec['kind']],
+        ).annotate(
+            search_rank=RawSQL(f'bm25({SEARCH_TABLE}, {_BM25_WEIGHTS})', (), output_field=FloatField()),
+        )
+
+    # ── internals ──────────────────────────────────────────────────────────
+
+    def _document(self, instance, spec):
+        return tuple(
+            ' '.join(filter(None, (_resolve(instance, path) for path in spec[column])))
+            for column in ('title', 'summary', 'body')
+        )
+
+    def _on_save(self, sender, instance, using, raw=False, **kwargs):
+        if not raw:
+            self.index_object(instance, using=using)
+
+    def _on_delete(self, sender, instance, using, **kwargs):
+        self.remove_object(instance, using=using)
+
+    def _on_related_save(self, sender, instance, using, accessor, raw=False, **kwargs):
+        if raw:
+            return
+        for obj in getattr(instance, accessor).all():
+            self.index_object(obj, using=using)
+
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 query: every word must match, as a prefix."""
+    tokens = _TOKEN_RE.findall(query or '')
+    return ' '.join(f'"{token}"*' for token in tokens[:16])
+
+
+def _as_tuple(value):
+    return (value,) if isinstance(value, str) else tuple(value)
+
+
+def _relations(spec):
+    paths = spec['title'] + spec['summary'] + spec['body']
+    return {path.rsplit('.', 1)[0].replace('.', '__') for path in paths if '.' in path}
+
+
+def _resolve(instance, path):
+    value = instance
+    for attr in path.split('.'):
+        value = getattr(value, attr, None)
+        if value is None:
+            return ''
+    return str(value)
+
+
+search_index = SearchIndex()
@@ -0,0 +1,152 @@
+"""
+Bulk, idempotent loading of seed data.
+
+``Seeder.upsert()`` writes a list of row dicts keyed by a unique field
+(``slug``). It runs one SELECT for the rows already there, then one
+multi-row INSERT per batch instead of a get_or_create round-trip per row.
+Existing rows are left alone (``ON CONFLICT DO NOTHING``). With
+``update=True``, their seeded columns are refreshed instead
+(``ON CONFLICT DO UPDATE``). It returns ``{key: pk}`` so dependent rows can
+point at their parents, plus the keys it created. Run a whole seed inside one
+``transaction.atomic()`` so the encrypted WAL is synced once, not per row.
+
+Bulk writes skip model signals, so ``finish()`` does their work once at the
+end. It rebuilds the search index, bumps the cache tags of every model
+written and schedules a snapshot rebuild.
+
+With ``dry_run=True`` nothing is written: ``upsert()`` only diffs the rows
+against the database and ``steps`` says what would change.
+
+Usage:
+    seeder = Seeder(update=options['update'], dry_run=options['dry_run'])
+    with transaction.atomic():
+        region_pks, _ = seeder.upsert(Region, region_rows)
+        attraction_pks, created = seeder.upsert(
+            Attraction, attraction_rows, create_only=['created_by_id'])
+        seeder.insert(AttractionTip, [...tips of the attractions in created...])
+        seeder.finish()
+"""
+
+import time
+from collections import namedtuple
+
+from django.db import router, transaction
+
+from .cache_tags import cache_tags, tag_for
+from .search import search_index
+from .snapshots import snapshots
+
+BATCH_SIZE = 500
+
+Step = namedtuple('Step', 'label created updated unchanged diff seconds')
+
+
+class Seeder:
+    def __init__(self, update=False, dry_run=False, using=None, batch_size=BATCH_SIZE):
+        self.update = update
+        self.dry_run = dry_run
+        self.using = using
+        self.batch_size = batch_size
+        self.steps = []
+        self._tags = set()
+        self._written = set()
+
+    def upsert(self, model, rows, key='slug', create_only=()):
+        """
+        Insert the ``rows`` of ``model`` missing by ``key`` and, with
+        ``update``, rewrite the ones that differ — except for the
+        ``create_only`` fields, which are only ever set on insert. Returns
+        ``({key: pk}, created keys)``; a dry run maps new rows to None.
+        """
+        started = time.perf_counter()
+        using = self._db(model)
+        fields = [
+            name for name in dict.fromkeys(name for row in rows for name in row)
+            if name != key and name not in create_only
+        ]
+        existing = {
+            row[key]: row
+            for row in model._default_manager.using(using)
+            .filter(**{f'{key}__in': [row[key] for row in rows]})
+            .values('pk', key, *fields)
+        }
+        new = [row for row in rows if row[key] not in existing]
+        diff = {}
+        for row in rows:
+            if row[key] in existing:
+                changed = _changed(model, row, existing[row[key]], fields)
+                if changed:
+                    diff[row[key]] = changed
+        pks = {k: current['pk'] for k, current in existing.items()}
+        created = {row[key] for row in new}
+
+        if not self.dry_run:
+            written = new + ([row for row in rows if row[key] in diff] if self.update else [])
+            if written:
+                objs = [model(**row) for row in written]
+                if self.update:
+                    auto_now = [f.name for f in model._meta.concrete_fields if getattr(f, 'auto_now', False)]
+                    model._default_manager.using(using).bulk_create(
+                        objs, batch_size=self.batch_size, update_conflicts=True,
+                        unique_fields=[key], update_fields=list(dict.fromkeys(fields + auto_now)),
+                    )
+                else:
+                    model._default_manager.using(using).bulk_create(
+                        objs, batch_size=self.batch_size, ignore_conflicts=True,
+                    )
+                # SQLite returns no ids from a conflict-handling INSERT
+                pks.update(model._default_manager.using(using)
+                           .filter(**{f'{key}__in': created}).values_list(key, 'pk'))
+                self._tags.add(tag_for(model))
+                if self.update:
+                    self._tags |= {tag_for(model, pks[k]) for k in diff}
+                self._written.add(using)
+        else:
+            pks.update(dict.fromkeys(created))
+
+        self.steps.append(Step(
+            str(model._meta.verbose_name_plural), len(new), len(diff) if self.update else 0,
+            len(rows) - len(new) - (len(diff) if self.update else 0), diff,
+            time.perf_counter() - started,
+        ))
+        return pks, created
+
+    def insert(self, model, rows, label=None):
+        """Plain batched INSERT of ``rows`` (children of rows ``upsert()`` just created)."""
+        started = time.perf_counter()
+        if rows and not self.dry_run:
+            using = self._db(model)
+            model._default_manager.using(using).bulk_create(
+                [model(**row) for row in rows], batch_size=self.batch_size,
+            )
+            self._tags.add(tag_for(model))
+            self._written.add(using)
+        self.steps.append(Step(
+            str(label or model._meta.verbose_name_plural), len(rows), 0, 0, {}, time.perf_counter() - started,
+        ))
+
+    def finish(self):
+        """Do what post_save signals would have: search index, cache tags, snapshots."""
+        started = time.perf_counter()
+        if not self._written:
+            return
+        tags = sorted(self._tags)
+        # Bump now and again after commit, as cache_tags does for signals
+        cache_tags.bump(*tags)
+        for using in self._written:
+            search_index.rebuild(using=using)
+            transaction.on_commit(lambda: cache_tags.bump(*tags), using=using)
+        if snapshots.manifest() is not None:
+            snapshots.schedule_rebuild()
+        self.steps.append(Step('search index and caches', 0, 0, 0, {}, time.perf_counter() - started))
+
+    def _db(self, model):
+        return self.using or router.db_for_write(model)
+
+
+def _changed(model, row, current, fields):
+    """Names of the ``fields`` whose seeded value differs from ``current``."""
+    return [
+        name for name in fields
+        if name in row and model._meta.get_field(name).to_python(row[name]) != current[name]
+    ]
@@ -0,0 +1,119 @@
+"""
+Aggregate serializer fields computed in the queryset.
+
+A serializer mixing in AggregateSerializerMixin declares counts, sums, ...
+as ``AggregateField(Count('attractions'))``. ``Serializer(queryset,
+many=True)`` annotates every declared aggregate onto the queryset, so the
+whole list is counted in one grouped query instead of one COUNT per row.
+Single objects fetched through ``Serializer.annotate(queryset)`` carry the
+value too; anything else falls back to one aggregate query for that object.
+
+ValuesSerializer is a read-only fast path for flat ModelSerializers: it
+derives a column plan from the serializer's own fields once, fetches
+``.values()`` rows and builds the output dicts directly, with choice labels
+from precomputed maps — same keys, order and values as the DRF serializer,
+without per-row field binding, attribute traversal or model instances.
+
+Usage:
+    class RegionSerializer(AggregateSerializerMixin, serializers.ModelSerializer):
+        attraction_count = AggregateField(Count('attractions'))
+
+    region = RegionSerializer.annotate(Region.objects.all()).get(slug=slug)
+
+    FAST_LIST = ValuesSerializer(AttractionListSerializer)
+    data = FAST_LIST.to_representation(FAST_LIST.values(queryset))
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import QuerySet
+from django.utils.encoding import is_protected_type
+from rest_framework import serializers
+
+
+class AggregateField(serializers.ReadOnlyField):
+    def __init__(self, aggregate, **kwargs):
+        self.aggregate = aggregate
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        try:
+            return getattr(instance, self.field_name)
+        except AttributeError:
+            manager = type(instance)._default_manager
+            return manager.filter(pk=instance.pk).aggregate(value=self.aggregate)['value']
+
+
+class AggregateSerializerMixin:
+    @classmethod
+    def aggregate_fields(cls):
+        return {
+            name: field.aggregate
+            for name, field in cls._declared_fields.items()
+            if isinstance(field, AggregateField)
+        }
+
+    @classmethod
+    def annotate(cls, queryset):
+        """``queryset`` with every declared aggregate field annotated on."""
+        missing = {
+            name: aggregate for name, aggregate in cls.aggregate_fields().items()
+            if name not in queryset.query.annotations
+        }
+        # Always a clone, so a module-level queryset never caches rows across requests
+        return queryset.annotate(**missing) if missing else queryset.all()
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        if args and isinstance(args[0], QuerySet) and not args[0].query.is_sliced:
+            args = (cls.annotate(args[0]),) + args[1:]
+        return super().many_init(*args, **kwargs)
+
+
+class ValuesSerializer:
+    """
+    Serialize ``.values()`` rows exactly as ``serializer_class`` would
+    serialize the model instances. Supports plain model fields, dotted
+    sources through foreign keys and ``get_<field>_display`` sources;
+    method fields and nested serializers raise ImproperlyConfigured.
+    """
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        model = serializer.Meta.model
+        self.columns = [_column(model, name, field) for name, field in serializer.fields.items()]
+        self.lookups = tuple(dict.fromkeys(lookup for _, lookup, _ in self.columns))
+
+    def values(self, queryset, *extra):
+        """``queryset.values()`` with every column, plus ``extra`` lookups (e.g. pagination keys)."""
+        return queryset.values(*self.lookups, *(name for name in extra if name not in self.lookups))
+
+    def to_representation(self, rows):
+        columns = self.columns
+        return [
+            {name: None if row[lookup] is None else convert(row[lookup]) for name, lookup, convert in columns}
+            for row in rows
+        ]
+
+
+def _column(model, name, field):
+    """``(output name, values() lookup, converter)`` for one serializer field."""
+    if isinstance(field, (serializers.SerializerMethodField, serializers.BaseSerializer, serializers.RelatedField)):
+        raise ImproperlyConfigured(f'ValuesSerializer cannot render {type(field).__name__} {name!r}.')
+
+    if isinstance(field, serializers.ModelField):
+        model_field = field.model_field
+        return name, model_field.name, lambda value: value if is_protected_type(value) else model_field.get_prep_value(value)
+
+    path = field.source.split('.')
+    if path[-1].startswith('get_') and path[-1].endswith('_display'):
+        path[-1] = path[-1][len('get_'):-len('_display')]
+        labels = {value: str(label) for value, label in _model_field(model, path).flatchoices}
+        return name, '__'.join(path), lambda value: labels.get(value, str(value))
+    _model_field(model, path)  # fail at import time on a bad source
+    return name, '__'.join(path), field.to_representation
+
+
+def _model_field(model, path):
+    for attr in path[:-1]:
+        model = model._meta.get_field(attr).related_model
+    return model._meta.get_field(path[-1])
@@ -0,0 +1,191 @@
+"""
+XML sitemaps for crawlers.
+
+Apps register the models crawlers should find, each under a section name:
+``/sitemap.xml`` is a sitemap index pointing at ``sitemap-<section>-<page>.xml``
+files of at most SITEMAP_LIMIT URLs each (the protocol's cap), plus one
+section for the fixed API pages. Rows with ``no_index`` set are left out and
+every ``<url>`` carries the row's own SEOMixin ``sitemap_priority``,
+``sitemap_changefreq`` and, when set, ``canonical_url``.
+
+A section's state — ``MAX(updated_at)`` and ``COUNT(*)`` of its rows — is
+cached under its cache_tags versions, so a burst of crawler requests costs
+no queries until a registered model changes (or STATE_TIMEOUT passes, which
+picks up bulk writes that bypass signals). Both serve as ETag /
+Last-Modified for conditional GET; a changed file is streamed row by row
+with ``iterator()`` and its body cached for the next crawler.
+
+Usage:
+    sitemap.register('attractions', Attraction.objects.filter(is_active=True),
+                     '/api/v1/attractions/{slug}/', tags=[tag_for(Attraction)])
+"""
+
+import hashlib
+import math
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .cache_tags import cache_tags, jittered
+from .conditional import fingerprint
+
+SITE_URL = 'https://xenohuru.onrender.com'
+SITEMAP_LIMIT = 50000
+STATE_TIMEOUT = 300
+CACHE_TIMEOUT = 6 * 3600
+STREAM_CHUNK_SIZE = 2000
+CONTENT_TYPE = 'application/xml'
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XMLNS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+STATIC_PAGES = (
+    # (path, changefreq, priority)
+    ('/api/docs/', 'weekly', '0.8'),
+    ('/api/v1/attractions/', 'daily', '1.0'),
+    ('/api/v1/regions/', 'weekly', '0.9'),
+    ('/api/v1/blog/', 'daily', '0.8'),
+)
+
+_URL_FIELDS = ('updated_at', 'canonical_url', 'sitemap_priority', 'sitemap_changefreq')
+
+
+def _digest(*parts):
+    return f'W/{quote_etag(hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:20])}'
+
+
+def _url(loc, lastmod=None, changefreq=None, priority=None):
+    parts = [f'<url><loc>{escape(loc)}</loc>']
+    if lastmod is not None:
+        parts.append(f'<lastmod>{lastmod.date().isoformat()}</lastmod>')
+    if changefreq:
+        parts.append(f'<changefreq>{changefreq}</changefreq>')
+    if priority is not None:
+        parts.append(f'<priority>{priority}</priority>')
+    parts.append('</url>')
+    return ''.join(parts)
+
+
+class Sitemap:
+    def __init__(self, pages=STATIC_PAGES):
+        self.pages = pages
+        self._sections = {}
+
+    def register(self, name, queryset, location, tags=(), lookup='slug'):
+        """
+        List the SEOMixin rows of ``queryset`` in section ``name``, each at
+        ``location`` formatted with the row's ``lookup`` field.
+        """
+        self._sections[name] = {
+            'queryset': queryset, 'location': location,
+            'tags': tuple(tags), 'lookup': lookup,
+        }
+
+    def state(self, name):
+        """``(etag, last_modified, pages)`` of section ``name``."""
+        if name == 'pages':
+            return _digest(*self.pages), None, 1
+        spec = self._sections.get(name)
+        if spec is None:
+            raise Http404(f'No sitemap section {name!r}.')
+        key = cache_tags.key(f'sitemap:state:{name}', spec['tags'])
+        state = cache.get(key)
+        if state is None:
+            last_modified, count = fingerprint(self.rows(name))
+            state = (_digest(key, last_modified, count), last_modified, max(1, math.ceil(count / SITEMAP_LIMIT)))
+            cache.set(key, state, jittered(STATE_TIMEOUT))
+        return state
+
+    def rows(self, name):
+        return self._sections[name]['queryset'].filter(no_index=False)
+
+    def index(self):
+        """``(etag, last_modified, chunks)`` of the sitemap index."""
+        entries, etags, times = [], [], []
+        for name in ('pages', *self._sections):
+            etag, last_modified, pages = self.state(name)
+            etags.append(etag)
+            if last_modified is not None:
+                times.append(last_modified)
+            lastmod = f'<lastmod>{last_modified.date().isoformat()}</lastmod>' if last_modified else ''
+            for page in range(1, pages + 1):
+                loc = SITE_URL + reverse('sitemap-section', args=[name, page])
+                entries.append(f'<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>')
+
+        def chunks():
+            yield f'{XML_HEADER}<sitemapindex xmlns="{XMLNS}">\n'
+            yield '\n'.join(entries)
+            yield '\n</sitemapindex>'
+        return _digest(*etags), max(times, default=None), chunks()
+
+    def section(self, name, page):
+        """``(etag, last_modified, chunks)`` of page ``page`` (1-based) of section ``name``."""
+        etag, last_modified, pages = self.state(name)
+        if not 1 <= page <= pages:
+            raise Http404(f'Sitemap {name!r} has {pages} page(s).')
+        if name == 'pages':
+            return _digest(etag, page), last_modified, self._pages()
+        spec = self._sections[name]
+        start = (page - 1) * SITEMAP_LIMIT
+        rows = self.rows(name).order_by('pk').values(spec['lookup'], *_URL_FIELDS)
+        # Streamed after the view returns: pin the alias the router picks now
+        rows = rows.using(rows.db)[start:start + SITEMAP_LIMIT]
+        return _digest(etag, page), last_modified, self._urlset(spec, rows)
+
+    def _pages(self):
+        yield f'{XML_HEADER}<urlset xmlns="{XMLNS}">\n'
+        yield '\n'.join(
+            _url(SITE_URL + path, changefreq=changefreq, priority=priority)
+            for path, changefreq, priority in self.pages
+        )
+        yield '\n</urlset>'
+
+    def _urlset(self, spec, rows):
+        yield f'{XML_HEADER}<urlset xmlns="{XMLNS}">\n'
+        batch = []
+        for row in rows.iterator(chunk_size=STREAM_CHUNK_SIZE):
+            batch.append(_url(
+                row['canonical_url'] or SITE_URL + spec['location'].format(**{spec['lookup']: row[spec['lookup']]}),
+                row['updated_at'], row['sitemap_changefreq'], row['sitemap_priority'],
+            ))
+            if len(batch) == STREAM_CHUNK_SIZE:
+                yield '\n'.join(batch) + '\n'
+                batch = []
+        if batch:
+            yield '\n'.join(batch) + '\n'
+        yield '</urlset>'
+
+    def response(self, request, key, etag, last_modified, chunks):
+        """
+        304 when the request's validators match, else the cached body, else
+        ``chunks`` streamed and cached once fully sent.
+        """
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            key = f'{key}:{etag}'
+            body = cache.get(key)
+            if body is not None:
+                response = HttpResponse(body, content_type=CONTENT_TYPE)
+            else:
+                response = StreamingHttpResponse(_caching(key, chunks), content_type=CONTENT_TYPE)
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+def _caching(key, chunks):
+    body = []
+    for chunk in chunks:
+        chunk = chunk.encode()
+        body.append(chunk)
+        yield chunk
+    cache.set(key, b''.join(body), jittered(CACHE_TIMEOUT))
+
+
+sitemap = Sitemap()
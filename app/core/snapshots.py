@@ -0,0 +1,235 @@
+"""
+Pre-rendered JSON snapshots of the public catalog.
+
+Read views register the documents they can be answered from with
+``@snapshots.serve(...)``. ``build()`` renders every registered list and
+detail document through the same serializers and FastJSONRenderer the live
+views use, writes them as ``.json`` plus pre-compressed ``.json.gz`` (and
+``.json.br`` when the ``brotli`` package is installed) into a new version
+directory under ``SNAPSHOT_ROOT``, and then swaps ``manifest.json`` to point
+at it. Requests are answered with a FileResponse of the best encoding the
+client accepts, so the body goes out through the server's file wrapper
+(sendfile) without touching the ORM, the serializers or SQLCipher.
+
+The manifest records the cache_tags versions each document was built from.
+A document whose tags have been bumped since is never served — the view
+renders live instead and a rebuild is scheduled once the current
+transaction commits, as it is after any change to a registered model.
+
+Usage:
+    @snapshots.serve('regions', Region.objects.all(), RegionSerializer, tags=[tag_for(Region)])
+    def region_list_create(request): ...
+
+    python manage.py build_snapshots
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import autodiscover_modules
+
+from .cache_tags import cache_tags
+from .renderers import FastJSONRenderer
+
+try:
+    import brotli
+except ImportError:  # optional: gzip alone is enough for every client
+    brotli = None
+
+MANIFEST = 'manifest.json'
+KEEP_VERSIONS = 2
+REBUILD_LOCK = 'snapshots:rebuild'
+REBUILD_LOCK_TIMEOUT = 300
+
+_SLUG_RE = re.compile(r'^[-\w]+$')
+_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _accepts(request, coding):
+    return re.search(rf'\b{coding}\b', request.META.get('HTTP_ACCEPT_ENCODING', '')) is not None
+
+
+class SnapshotStore:
+    def __init__(self):
+        self._documents = {}
+        self._manifest = (None, None)
+
+    @property
+    def root(self):
+        return getattr(settings, 'SNAPSHOT_ROOT', None)
+
+    def register(self, name, queryset, serializer, tags=(), detail=False, lookup='slug'):
+        """
+        Render ``serializer`` over ``queryset`` into document ``name``: one
+        file for the whole list, or with ``detail=True`` one file per row,
+        named after its ``lookup`` field.
+        """
+        self._documents[name] = {
+            'queryset': queryset, 'serializer': serializer,
+            'tags': tuple(tags), 'detail': detail, 'lookup': lookup,
+        }
+        uid = f'snapshots_{queryset.model._meta.label_lower}'
+        post_save.connect(self._on_change, sender=queryset.model, weak=False, dispatch_uid=f'{uid}_save')
+        post_delete.connect(self._on_change, sender=queryset.model, weak=False, dispatch_uid=f'{uid}_delete')
+
+    def serve(self, name, queryset, serializer, tags=(), detail=False, lookup='slug'):
+        """
+        Register document ``name`` and answer plain JSON GETs of the
+        decorated view from it. Put the decorator directly above the view
+        function, under ``@api_view``; requests with query parameters, other
+        formats or a missing/stale snapshot fall through to the view.
+        """
+        self.register(name, queryset, serializer, tags=tags, detail=detail, lookup=lookup)
+
+        def decorator(view):
+            @wraps(view)
+            def wrapped(request, *args, **kwargs):
+                if (request.method == 'GET' and not request.query_params
+                        and request.accepted_renderer.format == 'json'):
+                    response = self.response(request, name, kwargs.get(lookup) if detail else None)
+                    if response is not None:
+                        return response
+                return view(request, *args, **kwargs)
+            return wrapped
+        return decorator
+
+    def response(self, request, name, key=None):
+        """FileResponse for document ``name`` (row ``key`` of a detail document), or None."""
+        path = self.path(name, key)
+        if path is None:
+            return None
+        coding = next(
+            (coding for coding, suffix in _ENCODINGS if _accepts(request, coding) and os.path.exists(path + suffix)),
+            None,
+        )
+        try:
+            fh = open(path + dict(_ENCODINGS)[coding] if coding else path, 'rb')
+        except FileNotFoundError:
+            return None
+        response = FileResponse(fh, content_type='application/json')
+        # FileResponse names the file inline; API clients get a plain body
+        del response['Content-Disposition']
+        if coding:
+            response['Content-Encoding'] = coding
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+        return response
+
+    def path(self, name, key=None):
+        """Path of a current, non-stale snapshot file, or None."""
+        manifest = self.manifest()
+        entry = manifest and manifest['documents'].get(name)
+        if entry is None:
+            return None
+        if cache_tags.versions(self._documents[name]['tags']) != entry['tags']:
+            self.schedule_rebuild()
+            return None
+        if key is None:
+            return os.path.join(self.root, manifest['version'], f'{name}.json')
+        if not _SLUG_RE.match(str(key)):
+            return None
+        return os.path.join(self.root, manifest['version'], name, f'{key}.json')
+
+    def manifest(self):
+        """The current manifest, re-read only when the file changes."""
+        if not self.root:
+            return None
+        path = os.path.join(self.root, MANIFEST)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if self._manifest[0] != stamp:
+            with open(path, encoding='utf-8') as fh:
+                self._manifest = (stamp, json.load(fh))
+        return self._manifest[1]
+
+    def build(self):
+        """
+        Render the registered documents into a new version directory and
+        switch the manifest to it. Returns ``{name: files_written}``.
+        """
+        if not self.root:
+            return {}
+        autodiscover_modules('views')
+        version = f'{time.time_ns():x}'
+        target = os.path.join(self.root, version)
+        os.makedirs(target)
+        renderer = FastJSONRenderer()
+        entries, written = {}, {}
+        for name, spec in self._documents.items():
+            # Versions before data: a change that lands mid-build leaves the
+            # document stale rather than serving old rows under new versions
+            entries[name] = {'tags': cache_tags.versions(spec['tags'])}
+            queryset = spec['queryset'].all()
+            if spec['detail']:
+                os.makedirs(os.path.join(target, name))
+                written[name] = 0
+                for obj in queryset:
+                    key = getattr(obj, spec['lookup'])
+                    _write(os.path.join(target, name, f'{key}.json'), renderer.render(spec['serializer'](obj).data))
+                    written[name] += 1
+            else:
+                _write(os.path.join(target, f'{name}.json'), renderer.render(spec['serializer'](queryset, many=True).data))
+                written[name] = 1
+
+        tmp = os.path.join(self.root, f'.{MANIFEST}.{version}')
+        with open(tmp, 'w', encoding='utf-8') as fh:
+            json.dump({'version': version, 'documents': entries}, fh)
+        os.replace(tmp, os.path.join(self.root, MANIFEST))
+        self._prune(keep=version)
+        return written
+
+    def schedule_rebuild(self):
+        """Rebuild in a background thread after the current transaction commits."""
+        if getattr(settings, 'SNAPSHOT_AUTO_REBUILD', True) and self.root:
+            transaction.on_commit(self._start_rebuild)
+
+    def _start_rebuild(self):
+        if cache.add(REBUILD_LOCK, 1, REBUILD_LOCK_TIMEOUT):
+            threading.Thread(target=self._rebuild, daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            self.build()
+        finally:
+            cache.delete(REBUILD_LOCK)
+            connections.close_all()
+
+    def _on_change(self, sender, raw=False, **kwargs):
+        if not raw and self.manifest() is not None:
+            self.schedule_rebuild()
+
+    def _prune(self, keep):
+        versions = sorted(
+            (entry for entry in os.listdir(self.root)
+             if entry != keep and os.path.isdir(os.path.join(self.root, entry))),
+            reverse=True,
+        )
+        for old in versions[KEEP_VERSIONS - 1:]:
+            shutil.rmtree(os.path.join(self.root, old), ignore_errors=True)
+
+
+def _write(path, body):
+    with open(path, 'wb') as fh:
+        fh.write(body)
+    with open(path + '.gz', 'wb') as fh:
+        fh.write(gzip.compress(body, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as fh:
+            fh.write(brotli.compress(body))
+
+
+snapshots = SnapshotStore()
@@ -0,0 +1,439 @@
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from app.core import cache as sqlite_cache
+from app.attractions.models import Attraction, Citation
+from app.core.cache import SQLiteCache
+from app.core.db_backends.sqlcipher.base import Database, DatabaseWrapper, derive_raw_key, pragma_settings
+from app.core.diagnostics import capture, explain, full_scans, index_evidence, plan_costs, propose_index
+from app.core.renderers import FastJSONRenderer
+from app.core.routers import ReplicaMiddleware, ReplicaRouter, replica_reads
+from app.core.sitemaps import SITE_URL
+from app.regions.models import Region
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = self._make()
+
+    def _make(self, max_entries=100):
+        return SQLiteCache(
+            os.path.join(self.tmp.name, 'cache.sqlite3'),
+            {'TIMEOUT': 60, 'OPTIONS': {'MAX_ENTRIES': max_entries, 'CULL_FREQUENCY': 2}},
+        )
+
+    def test_set_get_delete_round_trip(self):
+        self.cache.set('a', {'x': [1, 2]})
+        self.cache.set_many({'b': 2, 'c': 3})
+        self.assertEqual(self.cache.get('a'), {'x': [1, 2]})
+        self.assertEqual(self.cache.get_many(['a', 'b', 'missing']), {'a': {'x': [1, 2]}, 'b': 2})
+        self.assertTrue(self.cache.delete('a'))
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.delete_many(['b', 'c'])
+        self.assertFalse(self.cache.has_key('b'))
+
+    def test_expired_entries_are_invisible_and_replaceable_by_add(self):
+        self.cache.set('lock', 1, timeout=1)
+        self.assertFalse(self.cache.add('lock', 2))
+        with patch('app.core.cache.time.time', return_value=time.time() + 5):
+            self.assertIsNone(self.cache.get('lock'))
+            self.assertTrue(self.cache.add('lock', 2, timeout=60))
+            self.assertEqual(self.cache.get('lock'), 2)
+
+    def test_entries_without_timeout_never_expire(self):
+        self.cache.set('forever', 'yes', timeout=None)
+        self.assertFalse(self.cache.add('forever', 'no'))
+        self.assertTrue(self.cache.touch('forever', timeout=60))
+
+    def test_shared_between_instances(self):
+        self.cache.set('shared', 'value')
+        self.assertEqual(self._make().get('shared'), 'value')
+
+    def test_cull_evicts_least_recently_used(self):
+        cache = self._make(max_entries=10)
+        with patch.object(sqlite_cache, 'CULL_EVERY', 1):
+            for i in range(10):
+                with patch('app.core.cache.time.time', return_value=1000.0 + i):
+                    cache.set(f'k{i}', i, timeout=None)
+            with patch('app.core.cache.time.time', return_value=2000.0):
+                cache.get('k0')  # refreshes k0's access time
+                cache.set('k10', 10, timeout=None)
+        remaining = cache.get_many([f'k{i}' for i in range(11)])
+        self.assertLessEqual(len(remaining), 6)
+        self.assertIn('k0', remaining)
+        self.assertIn('k10', remaining)
+        self.assertNotIn('k1', remaining)
+
+
+class TieredCacheTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.shared = SQLiteCache(os.path.join(tmp.name, 'shared.sqlite3'), {'TIMEOUT': 60})
+        self.a = self._tier()
+        self.b = self._tier()
+
+    def _tier(self):
+        from app.core.cache import TieredCache
+        tier = TieredCache(None, {'OPTIONS': {'LOCAL_TIMEOUT': 60, 'CHECK_INTERVAL': 0}})
+        tier._shared = self.shared
+        return tier
+
+    def test_hot_reads_served_from_process_memory(self):
+        self.a.set('featured', [1, 2, 3])
+        real_get = self.shared.get
+        requested = []
+        with patch.object(self.shared, 'get', side_effect=lambda key, *a, **kw: requested.append(key) or real_get(key, *a, **kw)):
+            self.assertEqual(self.a.get('featured'), [1, 2, 3])
+        self.assertNotIn('featured', requested)  # only the invalidation counter is read
+
+    def test_local_values_are_copies(self):
+        self.a.set('regions', {'items': []})
+        self.a.get('regions')['items'].append('mutated')
+        self.assertEqual(self.a.get('regions'), {'items': []})
+
+    def test_writes_in_one_process_invalidate_the_others(self):
+        self.a.set('list', 'v1')
+        self.assertEqual(self.b.get('list'), 'v1')   # now cached in b's memory
+        self.a.set('list', 'v2')
+        self.assertEqual(self.b.get('list'), 'v2')
+        self.a.delete('list')
+        self.assertIsNone(self.b.get('list'))
+
+    def test_falling_behind_the_log_flushes_local_tier(self):
+        self.a.set('k', 'old')
+        self.b.get('k')
+        self.a._log_size = self.b._log_size = 4
+        for i in range(6):
+            self.a.set(f'other{i}', i)
+        self.shared.set('k', 'new')  # written behind the tier's back
+        self.assertEqual(self.b.get('k'), 'new')
+
+    def test_add_is_shared(self):
+        self.assertTrue(self.a.add('lock', 1))
+        self.assertFalse(self.b.add('lock', 1))
+
+
+class SnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        settings_override = override_settings(SNAPSHOT_ROOT=self.tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client = APIClient()
+        self.region = Region.objects.create(
+            name='Mara', slug='mara', description='Lake Victoria shore.',
+            latitude='-1.77', longitude='34.15',
+        )
+
+    def _build(self):
+        call_command('build_snapshots', stdout=io.StringIO())
+
+    def test_snapshot_matches_live_response(self):
+        live = self.client.get('/api/v1/regions/mara/')
+        self._build()
+        served = self.client.get('/api/v1/regions/mara/')
+        self.assertTrue(served.streaming)
+        self.assertEqual(b''.join(served.streaming_content), live.content)
+
+    def test_gzip_variant_served_when_accepted(self):
+        self._build()
+        response = self.client.get('/api/v1/regions/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = json.loads(gzip.decompress(b''.join(response.streaming_content)))
+        self.assertEqual([region['slug'] for region in body], ['mara'])
+
+    def test_stale_snapshot_falls_back_to_live(self):
+        self._build()
+        self.region.description = 'Serengeti western corridor.'
+        self.region.save()
+        response = self.client.get('/api/v1/regions/mara/')
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.data['description'], 'Serengeti western corridor.')
+
+    def test_query_parameters_bypass_snapshot(self):
+        self._build()
+        response = self.client.get('/api/v1/regions/?format=json')
+        self.assertFalse(response.streaming)
+
+    def test_rebuild_keeps_previous_version_only(self):
+        self._build()
+        self._build()
+        self._build()
+        versions = [entry for entry in os.listdir(self.tmp.name) if entry != 'manifest.json']
+        self.assertEqual(len(versions), 2)
+
+
+class FastJSONRendererTest(SimpleTestCase):
+    def test_matches_stdlib_renderer(self):
+        data = [{
+            'name': 'Ngorongoro \u2014 crater', 'note': 'line\u2028break',
+            'price': Decimal('12.50'), 'day': date(2024, 1, 2),
+            'at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'rating': 4.5, 'tags': ['a', None, True], 'huge': 2 ** 70,
+        }]
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back_to_stdlib(self):
+        context = {'indent': 2}
+        self.assertEqual(
+            FastJSONRenderer().render({'a': [1]}, renderer_context=context),
+            JSONRenderer().render({'a': [1]}, renderer_context=context),
+        )
+
+
+class StreamingListTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        Citation.objects.bulk_create(
+            Citation(title=f'Survey {n}', citation_type='research_paper', year=2000 + n) for n in range(7)
+        )
+
+    def test_streamed_array_across_chunks(self):
+        with patch('app.core.renderers.STREAM_CHUNK_SIZE', 3):
+            response = APIClient().get('/api/v1/attractions/citations/')
+            self.assertTrue(response.streaming)
+            body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(sorted(item['title'] for item in body), [f'Survey {n}' for n in range(7)])
+
+    def test_indented_request_gets_plain_response(self):
+        response = APIClient().get('/api/v1/attractions/citations/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertFalse(response.streaming)
+        self.assertEqual(len(response.data), 7)
+
+
+class SitemapTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Region.objects.create(
+            name='Mara', slug='mara', description='Lake Victoria shore.',
+            latitude='-1.77', longitude='34.15', sitemap_priority=Decimal('0.9'), sitemap_changefreq='weekly',
+        )
+        Region.objects.create(
+            name='Hidden', slug='hidden', description='Not for crawlers.',
+            latitude='-1.5', longitude='34.5', no_index=True,
+        )
+
+    def _body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_index_lists_sections(self):
+        body = self._body(self.client.get('/sitemap.xml')).decode()
+        self.assertIn('<sitemapindex', body)
+        self.assertIn(f'{SITE_URL}/sitemap-pages-1.xml', body)
+        self.assertIn(f'{SITE_URL}/sitemap-regions-1.xml', body)
+
+    def test_section_respects_seo_fields(self):
+        body = self._body(self.client.get('/sitemap-regions-1.xml')).decode()
+        self.assertIn(f'<loc>{SITE_URL}/api/v1/regions/mara/</loc>', body)
+        self.assertIn('<changefreq>weekly</changefreq><priority>0.9</priority>', body)
+        self.assertNotIn('hidden', body)
+
+    def test_section_split_by_limit(self):
+        Region.objects.create(name='Arusha', slug='arusha', description='North.', latitude='-3.3', longitude='36.6')
+        with patch('app.core.sitemaps.SITEMAP_LIMIT', 1):
+            index = self._body(self.client.get('/sitemap.xml')).decode()
+            self.assertIn('/sitemap-regions-2.xml', index)
+            self.assertNotIn('/sitemap-regions-3.xml', index)
+            second = self._body(self.client.get('/sitemap-regions-2.xml')).decode()
+            self.assertEqual(second.count('<url>'), 1)
+            self.assertEqual(self.client.get('/sitemap-regions-3.xml').status_code, 404)
+
+    def test_conditional_get_and_cached_body(self):
+        first = self.client.get('/sitemap-regions-1.xml')
+        self.assertTrue(first.streaming)
+        body = self._body(first)
+        with self.assertNumQueries(0):
+            again = self.client.get('/sitemap-regions-1.xml', HTTP_CACHE_CONTROL='no-cache')
+            not_modified = self.client.get('/sitemap-regions-1.xml', HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(self._body(again), body)
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_change_invalidates_section(self):
+        etag = self.client.get('/sitemap-regions-1.xml')['ETag']
+        Region.objects.get(slug='mara').save()
+        response = self.client.get('/sitemap-regions-1.xml', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(DB_ENCRYPTION_KEY='testkey')
+class SQLCipherKeyTest(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'test.db')
+        derive_raw_key.cache_clear()
+
+    def _wrapper(self):
+        settings_dict = dict(connections.settings['default'], NAME=self.path)
+        return DatabaseWrapper(settings_dict, alias='keytest')
+
+    def _create(self, *pragmas):
+        conn = Database.connect(self.path)
+        conn.execute('PRAGMA key="testkey";')
+        for pragma in pragmas:
+            conn.execute(pragma)
+        conn.execute('CREATE TABLE t (x INTEGER)')
+        conn.execute('INSERT INTO t VALUES (1)')
+        conn.commit()
+        conn.close()
+
+    def test_existing_file_opened_with_cached_raw_key(self):
+        self._create()
+        wrapper = self._wrapper()
+        params = wrapper.get_connection_params()
+        self.assertTrue(wrapper._raw_key(self.path, 'testkey').startswith("x'"))
+        for _ in range(3):
+            conn = wrapper.get_new_connection(params)
+            self.assertEqual(conn.execute('SELECT x FROM t').fetchone(), (1,))
+            conn.close()
+        self.assertEqual(derive_raw_key.cache_info().misses, 1)
+
+    def test_new_file_uses_passphrase(self):
+        wrapper = self._wrapper()
+        self.assertIsNone(wrapper._raw_key(self.path, 'testkey'))
+        wrapper.get_new_connection(wrapper.get_connection_params()).close()
+        self.assertIsNotNone(wrapper._raw_key(self.path, 'testkey'))
+
+    def test_bad_raw_key_falls_back_to_passphrase(self):
+        self._create()
+        wrapper = self._wrapper()
+        with patch('app.core.db_backends.sqlcipher.base.derive_raw_key') as derive:
+            derive.return_value = "x'%s'" % ('00' * 32)
+            conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        self.assertEqual(conn.execute('SELECT x FROM t').fetchone(), (1,))
+        conn.close()
+
+    def test_read_only_option(self):
+        self._create()
+        settings_dict = dict(connections.settings['default'], NAME=self.path, OPTIONS={'read_only': True})
+        wrapper = DatabaseWrapper(settings_dict, alias='keytest')
+        params = wrapper.get_connection_params()
+        self.assertTrue(params['database'].endswith('?mode=ro'))
+        conn = wrapper.get_new_connection(params)
+        self.assertEqual(conn.execute('SELECT x FROM t').fetchone(), (1,))
+        with self.assertRaises(Database.DatabaseError):
+            conn.execute('INSERT INTO t VALUES (2)')
+        conn.close()
+
+    def test_pragma_profile_applied(self):
+        self._create()
+        options = {'pragma_profile': 'small', 'pragmas': {'cache_size': -4000}}
+        settings_dict = dict(connections.settings['default'], NAME=self.path, OPTIONS=options)
+        wrapper = DatabaseWrapper(settings_dict, alias='keytest')
+        conn = wrapper.get_new_connection(wrapper.get_connection_params())
+        self.assertEqual(conn.execute('PRAGMA cache_size').fetchone(), (-4000,))
+        self.assertEqual(conn.execute('PRAGMA mmap_size').fetchone(), (0,))
+        conn.close()
+
+    def test_wrong_key_raises(self):
+        self._create()
+        wrapper = self._wrapper()
+        with override_settings(DB_ENCRYPTION_KEY='wrong'), self.assertRaises(RuntimeError):
+            wrapper.get_new_connection(wrapper.get_connection_params())
+
+
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        available = patch.object(ReplicaRouter, '_replica_available', return_value=True)
+        available.start()
+        self.addCleanup(available.stop)
+
+    def _middleware_alias(self, request):
+        return ReplicaMiddleware(lambda request: self.router.db_for_read(Region))(request)
+
+    def test_reads_routed_inside_replica_context(self):
+        self.assertEqual(self.router.db_for_read(Region), 'default')
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Region), 'replica')
+            self.assertEqual(self.router.db_for_write(Region), 'default')
+
+    def test_atomic_block_keeps_reads_on_writer(self):
+        with replica_reads(), patch.object(connections['default'], 'in_atomic_block', True):
+            self.assertEqual(self.router.db_for_read(Region), 'default')
+
+    def test_middleware_routes_safe_methods_only(self):
+        factory = RequestFactory()
+        self.assertEqual(self._middleware_alias(factory.get('/api/v1/regions/')), 'replica')
+        self.assertEqual(self._middleware_alias(factory.post('/api/v1/regions/')), 'default')
+        self.assertEqual(self._middleware_alias(factory.get('/admin/regions/region/')), 'default')
+
+    def test_replica_never_migrated(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'regions'))
+        self.assertIsNone(self.router.allow_migrate('default', 'regions'))
+
+
+class PragmaProfileTest(SimpleTestCase):
+    def test_overrides_and_read_only(self):
+        pragmas = pragma_settings({'pragma_profile': 'large', 'pragmas': {'synchronous': 'FULL'}})
+        self.assertEqual(pragmas['synchronous'], 'FULL')
+        self.assertEqual(pragmas['cache_size'], -131072)
+        self.assertNotIn('wal_autocheckpoint', pragma_settings({'read_only': True}))
+
+    def test_invalid_settings_rejected(self):
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_settings({'pragma_profile': 'huge'})
+        with self.assertRaises(ImproperlyConfigured):
+            pragma_settings({'pragmas': {'cache_size': '1; DROP TABLE x'}})
+
+
+class QueryPlanTest(TestCase):
+    def test_full_scans_flagged(self):
+        with capture() as queries:
+            list(Region.objects.all())
+            list(Region.objects.filter(slug='mara'))
+        self.assertEqual(full_scans(explain(queries[0])), ['regions_region'])
+        self.assertEqual(full_scans(explain(queries[1])), [])
+
+    def test_command_reports_scans(self):
+        out = io.StringIO()
+        call_command('explain_queries', '--url', '/api/v1/regions/', stdout=out)
+        self.assertIn('full scan of regions_region', out.getvalue())
+
+    def test_proposal_matches_shipped_index(self):
+        with capture() as queries:
+            list(Attraction.objects.filter(is_active=True).order_by('-is_featured', '-created_at', 'id'))
+        index = propose_index(queries[0])
+        self.assertEqual(index.fields, ['-is_featured', '-created_at', 'id'])
+        self.assertEqual(index.condition, Q(is_active=True))
+        plan = explain(queries[0])
+        self.assertNotIn('sort', plan_costs(plan, 'attractions_attraction'))
+        self.assertTrue(any('attraction_active_order_idx' in step for step in plan))
+
+    def test_index_evidence_rolls_back(self):
+        with capture() as queries:
+            list(Citation.objects.all())
+        index = propose_index(queries[0])
+        self.assertEqual(index.fields, ['-year', 'title'])
+        before, after = index_evidence(queries[0], index)
+        self.assertIn('sort', plan_costs(before, 'attractions_citation'))
+        self.assertNotIn('sort', plan_costs(after, 'attractions_citation'))
+        self.assertEqual(explain(queries[0]), before)
+
+    def test_advise_command(self):
+        out = io.StringIO()
+        call_command('advise_indexes', '--no-admin', '--url', '/api/v1/attractions/citations/', stdout=out)
+        self.assertIn("models.Index(fields=['-year', 'title']", out.getvalue())
+        self.assertIn('1 index proposal(s)', out.getvalue())
@@ -1,8 +1,8 @@
 from django.http import HttpResponse, JsonResponse
 from django.utils import timezone
-from app.attractions.models import Attraction
-from app.regions.models import Region
-from app.blog.models import Article
+from django.views.decorators.http import require_safe
+from app.core.cache_tags import revalidate
+from app.core.sitemaps import sitemap
 
 
 def robots_txt(request):
@@ -17,54 +17,18 @@ def robots_txt(request):
     return HttpResponse("\n".join(lines), content_type="text/plain")
 
 
+@require_safe
+@revalidate
 def sitemap_xml(request):
-    base_url = "https://xenohuru.onrender.com"
-    urls = []
+    etag, last_modified, chunks = sitemap.index()
+    return sitemap.response(request, 'sitemap:index', etag, last_modified, chunks)
 
-    # Static pages
-    urls.append(f'<url><loc>{base_url}/api/docs/</loc><changefreq>weekly</changefreq><priority>0.8</priority></url>')
-    urls.append(f'<url><loc>{base_url}/api/v1/attractions/</loc><changefreq>daily</changefreq><priority>1.0</priority></url>')
-    urls.append(f'<url><loc>{base_url}/api/v1/regions/</loc><changefreq>weekly</changefreq><priority>0.9</priority></url>')
-    urls.append(f'<url><loc>{base_url}/api/v1/blog/</loc><changefreq>daily</changefreq><priority>0.8</priority></url>')
 
-    # Attractions
-    for attraction in Attraction.objects.filter(is_active=True).values('slug', 'updated_at'):
-        urls.append(
-            f'<url>'
-            f'<loc>{base_url}/api/v1/attractions/{attraction["slug"]}/</loc>'
-            f'<lastmod>{attraction["updated_at"].strftime("%Y-%m-%d")}</lastmod>'
-            f'<changefreq>weekly</changefreq>'
-            f'<priority>0.9</priority>'
-            f'</url>'
-        )
-
-    # Regions
-    for region in Region.objects.all().values('slug', 'updated_at'):
-        urls.append(
-            f'<url>'
-            f'<loc>{base_url}/api/v1/regions/{region["slug"]}/</loc>'
-            f'<lastmod>{region["updated_at"].strftime("%Y-%m-%d")}</lastmod>'
-            f'<changefreq>monthly</changefreq>'
-            f'<priority>0.7</priority>'
-            f'</url>'
-        )
-
-    # Blog articles
-    for article in Article.objects.filter(is_published=True).values('slug', 'updated_at'):
-        urls.append(
-            f'<url>'
-            f'<loc>{base_url}/api/v1/blog/{article["slug"]}/</loc>'
-            f'<lastmod>{article["updated_at"].strftime("%Y-%m-%d")}</lastmod>'
-            f'<changefreq>monthly</changefreq>'
-            f'<priority>0.6</priority>'
-            f'</url>'
-        )
-
-    xml = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    xml += '\n'.join(urls)
-    xml += '\n</urlset>'
-    return HttpResponse(xml, content_type='application/xml')
+@require_safe
+@revalidate
+def sitemap_section(request, section, page):
+    etag, last_modified, chunks = sitemap.section(section, page)
+    return sitemap.response(request, f'sitemap:{section}:{page}', etag, last_modified, chunks)
 
 
 def health_check(request):
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.28 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['attraction', '-created_at'], name='review_approved_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userfeedback',
+            index=models.Index(fields=['-created_at'], name='userfeedback_created_idx'),
+        ),
+    ]
@@ -65,6 +65,9 @@ class UserFeedback(models.Model):
     class Meta:
         verbose_name_plural = 'User Feedback'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='userfeedback_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_feedback_type_display()}: {self.subject}"
@@ -119,6 +122,11 @@ class Review(models.Model):
     class Meta:
         unique_together = ('user', 'attraction')
         ordering = ['-created_at']
+        indexes = [
+            # An attraction's approved reviews, newest first
+            models.Index(fields=['attraction', '-created_at'],
+                         condition=models.Q(is_approved=True), name='review_approved_idx'),
+        ]
 
     def __str__(self):
         return f"Review by {self.user.username} for {self.attraction.name}"
@@ -1,4 +1,6 @@
+from django.db.models import Count
 from rest_framework import serializers
+from app.core.serializers import AggregateField, AggregateSerializerMixin
 from .models import Itinerary, ItineraryDay, ItineraryActivity
 from app.attractions.serializers import AttractionListSerializer
 
@@ -21,9 +23,9 @@ class ItineraryDaySerializer(serializers.ModelSerializer):
         fields = ['id', 'day_number', 'title', 'description', 'accommodation_notes', 'meals_notes', 'activities']
 
 
-class ItineraryListSerializer(serializers.ModelSerializer):
+class ItineraryListSerializer(AggregateSerializerMixin, serializers.ModelSerializer):
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
-    attraction_count = serializers.SerializerMethodField()
+    attraction_count = AggregateField(Count('featured_attractions'))
     difficulty_display = serializers.CharField(source='get_difficulty_level_display', read_only=True)
 
     class Meta:
@@ -32,9 +34,6 @@ class ItineraryListSerializer(serializers.ModelSerializer):
                   'difficulty_level', 'difficulty_display', 'is_public', 'attraction_count',
                   'created_by_username', 'created_at']
 
-    def get_attraction_count(self, obj):
-        return obj.featured_attractions.count()
-
 
 class ItineraryDetailSerializer(serializers.ModelSerializer):
     created_by_username = serializers.CharField(source='created_by.username', read_only=True)
@@ -17,7 +17,7 @@ from .serializers import (
 @permission_classes([IsAuthenticatedOrReadOnly])
 def itinerary_list_create(request):
     if request.method == 'GET':
-        qs = Itinerary.objects.filter(is_public=True).prefetch_related('featured_attractions', 'days')
+        qs = Itinerary.objects.filter(is_public=True).select_related('created_by')
         difficulty = request.query_params.get('difficulty')
         days = request.query_params.get('days')
         if difficulty:
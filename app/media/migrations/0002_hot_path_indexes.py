@@ -0,0 +1,17 @@
+# Generated by Django 4.2.28 on 2026-10-18 08:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('media', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='media',
+            index=models.Index(condition=models.Q(('is_approved', True)), fields=['sort_order', '-created_at'], name='media_approved_order_idx'),
+        ),
+    ]
@@ -63,6 +63,8 @@ class Media(models.Model):
         ordering = ['sort_order', '-created_at']
         indexes = [
             models.Index(fields=['content_type', 'object_id']),
+            models.Index(fields=['sort_order', '-created_at'],
+                         condition=models.Q(is_approved=True), name='media_approved_order_idx'),
         ]
 
     def __str__(self):
@@ -4,6 +4,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from django.shortcuts import get_object_or_404
 from drf_spectacular.utils import extend_schema, OpenApiResponse
+from app.core.renderers import streaming_list
 from .models import Media
 from .serializers import MediaSerializer
 
@@ -20,9 +21,8 @@ from .serializers import MediaSerializer
 @permission_classes([IsAuthenticatedOrReadOnly])
 def media_list_create(request):
     if request.method == 'GET':
-        media = Media.objects.filter(is_approved=True)
-        serializer = MediaSerializer(media, many=True)
-        return Response(serializer.data)
+        media = Media.objects.filter(is_approved=True).select_related('uploaded_by')
+        return streaming_list(request, media, MediaSerializer)
         
     elif request.method == 'POST':
         serializer = MediaSerializer(data=request.data)
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class OperatorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.operators'
+
+    def ready(self):
+        from app.core.cache_tags import cache_tags
+        from app.core.search import search_index
+        from .models import TourOperator
+
+        search_index.register(TourOperator, 'operator', title='name', summary='short_description', body=('description',))
+        cache_tags.register(TourOperator)
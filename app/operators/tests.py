@@ -48,6 +48,12 @@ class OperatorsAPITest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data), 1)
 
+    def test_search_operators(self):
+        make_operator(name='Coastal Dhow Tours', slug='coastal-dhow-tours')
+        response = self.client.get(f'{self.list_url}?search=dhow')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([o['slug'] for o in response.data], ['coastal-dhow-tours'])
+
     def test_by_attraction_missing_param(self):
         response = self.client.get(f'{self.list_url}by_attraction/')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -3,6 +3,11 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from app.attractions.models import Attraction
+from app.core.cache_tags import revalidate, tag_for
+from app.core.conditional import conditional
+from app.core.search import search_index
+from app.core.snapshots import snapshots
 from .models import TourOperator
 from .serializers import (
     TourOperatorListSerializer,
@@ -10,7 +15,9 @@ from .serializers import (
     TourOperatorCreateUpdateSerializer,
 )
 
-BASE_QUERYSET = TourOperator.objects.filter(is_active=True).prefetch_related('attractions')
+ACTIVE_OPERATORS = TourOperator.objects.filter(is_active=True)
+BASE_QUERYSET = ACTIVE_OPERATORS.prefetch_related('attractions')
+CACHE_TAGS = (tag_for(TourOperator), tag_for(Attraction))
 
 
 @extend_schema(
@@ -20,7 +27,7 @@ BASE_QUERYSET = TourOperator.objects.filter(is_active=True).prefetch_related('at
         '**GET** — Returns all active tour operators. Supports optional query parameters:\n\n'
         '| Parameter | Type | Description |\n'
         '|-----------|------|-------------|\n'
-        '| `search` | string | Filter by name or description |\n'
+        '| `search` | string | Full-text search over name and descriptions. Words match as prefixes; results are ranked by relevance |\n'
         '| `tier` | string | Filter by tier: `budget`, `mid`, `luxury` |\n\n'
         '**POST** — Submit a new tour operator. Requires authentication.\n\n'
         '**curl GET example:**\n'
@@ -29,7 +36,7 @@ BASE_QUERYSET = TourOperator.objects.filter(is_active=True).prefetch_related('at
         '```'
     ),
     parameters=[
-        OpenApiParameter('search', description='Filter by name or description', required=False, type=str),
+        OpenApiParameter('search', description='Full-text search over name and descriptions (prefix match, ranked by relevance)', required=False, type=str),
         OpenApiParameter('tier', description='Filter by tier: `budget`, `mid`, `luxury`', required=False, type=str,
                          enum=['budget', 'mid', 'luxury']),
     ],
@@ -43,13 +50,20 @@ BASE_QUERYSET = TourOperator.objects.filter(is_active=True).prefetch_related('at
 )
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(ACTIVE_OPERATORS, tags=CACHE_TAGS)
+@snapshots.serve('operator-list', BASE_QUERYSET, TourOperatorListSerializer, tags=CACHE_TAGS)
 def operator_list_create(request):
     if request.method == 'GET':
         operators = BASE_QUERYSET
         search = request.query_params.get('search')
         if search:
-            operators = operators.filter(name__icontains=search) | \
-                        operators.filter(description__icontains=search)
+            ranked = search_index.filter(operators, search)
+            if ranked is not None:
+                operators = ranked.order_by('search_rank')
+            else:
+                operators = operators.filter(name__icontains=search) | \
+                            operators.filter(description__icontains=search)
         tier = request.query_params.get('tier')
         if tier:
             operators = operators.filter(tier=tier)
@@ -84,6 +98,9 @@ def operator_list_create(request):
 )
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(lambda request, slug: ACTIVE_OPERATORS.filter(slug=slug), tags=CACHE_TAGS)
+@snapshots.serve('operator-detail', BASE_QUERYSET, TourOperatorDetailSerializer, tags=CACHE_TAGS, detail=True)
 def operator_detail(request, slug):
     try:
         operator = BASE_QUERYSET.get(slug=slug)
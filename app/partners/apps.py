@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class PartnersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'app.partners'
+
+    def ready(self):
+        from app.core.cache_tags import cache_tags
+        from .models import Partner
+
+        cache_tags.register(Partner)
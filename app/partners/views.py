@@ -3,6 +3,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
+from app.core.cache_tags import tag_for
+from app.core.snapshots import snapshots
 from .models import Partner
 from .serializers import PartnerSerializer
 
@@ -37,6 +39,7 @@ BASE_QUERYSET = Partner.objects.filter(is_active=True)
 )
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@snapshots.serve('partner-list', BASE_QUERYSET, PartnerSerializer, tags=[tag_for(Partner)])
 def partner_list_create(request):
     if request.method == 'GET':
         partners = BASE_QUERYSET
@@ -74,6 +77,7 @@ def partner_list_create(request):
 )
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@snapshots.serve('partner-detail', BASE_QUERYSET, PartnerSerializer, tags=[tag_for(Partner)], detail=True)
 def partner_detail(request, slug):
     try:
         partner = BASE_QUERYSET.get(slug=slug)
@@ -3,3 +3,11 @@ from django.apps import AppConfig
 
 class RegionsConfig(AppConfig):
     name = 'app.regions'
+
+    def ready(self):
+        from app.core.cache_tags import cache_tags, tag_for
+        from app.core.sitemaps import sitemap
+        from .models import Region
+
+        cache_tags.register(Region)
+        sitemap.register('regions', Region.objects.all(), '/api/v1/regions/{slug}/', tags=[tag_for(Region)])
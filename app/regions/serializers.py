@@ -1,14 +1,13 @@
+from django.db.models import Count
 from rest_framework import serializers
+from app.core.serializers import AggregateField, AggregateSerializerMixin
 from .models import Region
 
 
-class RegionSerializer(serializers.ModelSerializer):
-    attraction_count = serializers.SerializerMethodField()
+class RegionSerializer(AggregateSerializerMixin, serializers.ModelSerializer):
+    attraction_count = AggregateField(Count('attractions'))
 
     class Meta:
         model = Region
         fields = ['id', 'name', 'slug', 'description', 'image', 'latitude', 'longitude', 'attraction_count', 'created_at']
         read_only_fields = ['id', 'created_at']
-
-    def get_attraction_count(self, obj):
-        return obj.attractions.count()
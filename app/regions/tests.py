@@ -2,7 +2,11 @@ from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from app.attractions.models import Attraction
+from app.core.query_budget import enforce_query_budgets
 from .models import Region
+from .serializers import RegionSerializer
 
 User = get_user_model()
 
@@ -50,3 +54,40 @@ class RegionsAPITest(TestCase):
         self.client.force_authenticate(user=self.user)
         response = self.client.delete(f'{self.list_url}kilimanjaro/')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class RegionAttractionCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='countuser', email='count@example.com', password='Pass1234!')
+        self.regions = [
+            Region.objects.create(
+                name=f'Region {i}', slug=f'region-{i}', description='...',
+                latitude='-6.0', longitude='35.0',
+            )
+            for i in range(5)
+        ]
+        for i, region in enumerate(self.regions):
+            for j in range(i):
+                Attraction.objects.create(
+                    name=f'Site {i}-{j}', slug=f'site-{i}-{j}', region=region, category='beach',
+                    description='...', short_description='...', latitude='-6.0', longitude='35.0',
+                    difficulty_level='easy', access_info='Road.', best_time_to_visit='June',
+                    seasonal_availability='Year-round', estimated_duration='1 day', created_by=self.user,
+                )
+
+    def test_list_counts_in_one_query(self):
+        with enforce_query_budgets():
+            response = self.client.get('/api/v1/regions/')
+        self.assertEqual(
+            {region['slug']: region['attraction_count'] for region in response.data},
+            {f'region-{i}': i for i in range(5)},
+        )
+
+    def test_unannotated_instance_falls_back_to_query(self):
+        region = Region.objects.get(slug='region-3')
+        self.assertEqual(RegionSerializer(region).data['attraction_count'], 3)
+        with self.assertNumQueries(0):
+            annotated = RegionSerializer.annotate(Region.objects.filter(slug='region-3'))
+        self.assertEqual(RegionSerializer(annotated.get()).data['attraction_count'], 3)
@@ -2,10 +2,19 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from django.core.cache import cache
 from drf_spectacular.utils import extend_schema, OpenApiExample, OpenApiResponse
+from app.core.cache_tags import cache_tags, jittered, revalidate, tag_for
+from app.core.conditional import conditional
+from app.core.query_budget import query_budget
+from app.core.snapshots import snapshots
 from .models import Region
 from .serializers import RegionSerializer
 
+CACHE_TIMEOUT = 6 * 3600
+# attraction_count comes from one grouped COUNT instead of a query per region
+REGION_QUERYSET = RegionSerializer.annotate(Region.objects.all())
+
 _REGION_EXAMPLE = {
     'id': 1,
     'name': 'Arusha',
@@ -70,10 +79,18 @@ _REGION_EXAMPLE = {
 )
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(Region.objects.all(), tags=[tag_for(Region)])
+@snapshots.serve('region-list', REGION_QUERYSET, RegionSerializer, tags=[tag_for(Region)])
+@query_budget(1)
 def region_list_create(request):
     if request.method == 'GET':
-        regions = Region.objects.all()
-        serializer = RegionSerializer(regions, many=True)
+        cache_key = cache_tags.key('regions_list', (tag_for(Region),))
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return Response(cached)
+        serializer = RegionSerializer(REGION_QUERYSET.all(), many=True)
+        cache.set(cache_key, serializer.data, jittered(CACHE_TIMEOUT))
         return Response(serializer.data)
     serializer = RegionSerializer(data=request.data)
     if serializer.is_valid():
@@ -127,14 +144,23 @@ def region_list_create(request):
 )
 @api_view(['GET', 'PUT', 'PATCH', 'DELETE'])
 @permission_classes([IsAuthenticatedOrReadOnly])
+@revalidate
+@conditional(lambda request, slug: Region.objects.filter(slug=slug), tags=[tag_for(Region)])
+@snapshots.serve('region-detail', REGION_QUERYSET, RegionSerializer, tags=[tag_for(Region)], detail=True)
+@query_budget(1)
 def region_detail(request, slug):
     try:
-        region = Region.objects.get(slug=slug)
+        region = REGION_QUERYSET.get(slug=slug)
     except Region.DoesNotExist:
         return Response({'error': 'Not found'}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
+        cache_key = cache_tags.key(f'region_detail_{slug}', (tag_for(region),))
+        cached = cache.get(cache_key)
+        if cached:
+            return Response(cached)
         serializer = RegionSerializer(region)
+        cache.set(cache_key, serializer.data, jittered(CACHE_TIMEOUT))
         return Response(serializer.data)
     elif request.method in ['PUT', 'PATCH']:
         serializer = RegionSerializer(region, data=request.data, partial=request.method == 'PATCH')
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import WeatherCache, SeasonalWeatherPattern
+from .models import WeatherCache, SeasonalWeatherPattern, WeatherObservation
 
 
 @admin.register(WeatherCache)
@@ -14,3 +14,10 @@ class SeasonalWeatherPatternAdmin(admin.ModelAdmin):
     list_display = ['attraction', 'season_type', 'start_month', 'end_month', 'avg_temperature', 'avg_rainfall']
     list_filter = ['season_type']
     search_fields = ['attraction__name']
+
+
+@admin.register(WeatherObservation)
+class WeatherObservationAdmin(admin.ModelAdmin):
+    list_display = ['date', 'latitude', 'longitude', 'temperature_mean', 'precipitation_sum', 'fetched_at']
+    list_filter = ['date']
+    readonly_fields = ['fetched_at']
@@ -0,0 +1,211 @@
+"""
+Outbound HTTP for the weather service.
+
+Every call goes through one pooled ``requests.Session`` per process, so
+keep-alive connections to api.open-meteo.com / archive-api.open-meteo.com
+are reused instead of paying TCP+TLS on each request. Connection failures
+and 429/5xx responses are retried a bounded number of times with jittered
+exponential backoff. Read timeouts are deliberately *not* retried: a slow
+upstream is exactly what ties up the sync workers.
+
+``aget_json`` is the asyncio counterpart used by the async views, with the
+same circuit breakers and httpx errors re-raised as the matching
+``requests`` exceptions so callers handle both paths alike. Under WSGI every
+async view runs in a fresh event loop, so an ``httpx.AsyncClient`` can't
+outlive the request: ``async with async_client():`` opens one for the
+request and the calls inside it (e.g. the overview's concurrent fetches)
+share its connections; it is closed on exit. Outside such a block each call
+opens and closes its own client.
+
+A per-host circuit breaker sits in front of both clients. After
+``WEATHER_BREAKER_FAILURES`` consecutive failures the host is skipped for
+``WEATHER_BREAKER_RESET`` seconds and calls raise ``CircuitOpenError``
+immediately; the first call after that window is let through as a trial.
+"""
+
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+POOL_SIZE = getattr(settings, 'WEATHER_HTTP_POOL_SIZE', 10)
+RETRIES = getattr(settings, 'WEATHER_HTTP_RETRIES', 2)
+CONNECT_TIMEOUT = getattr(settings, 'WEATHER_HTTP_CONNECT_TIMEOUT', 3.05)
+BREAKER_FAILURES = getattr(settings, 'WEATHER_BREAKER_FAILURES', 5)
+BREAKER_RESET = getattr(settings, 'WEATHER_BREAKER_RESET', 60)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def retry_in(self):
+        if self.opened_at is None:
+            return 0
+        return max(0.0, self.opened_at + self.reset_timeout - self.clock())
+
+    def allow(self):
+        """True if a call may go out. Once the reset window passes one trial call is allowed."""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.clock() - self.opened_at >= self.reset_timeout:
+                # Half-open: re-arm the window so concurrent callers keep failing fast
+                self.opened_at = self.clock()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+_breakers = {}
+_async_client = ContextVar('weather_async_client', default=None)
+
+
+def build_session():
+    retry = Retry(
+        total=RETRIES,
+        connect=RETRIES,
+        read=0,
+        status=RETRIES,
+        backoff_factor=0.3,
+        backoff_jitter=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = 'xenohuru-weather/1.0'
+    return session
+
+
+def get_session():
+    """The process-wide session; rebuilt after a fork so workers never share sockets."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session, _session_pid = build_session(), pid
+                _breakers.clear()
+    return _session
+
+
+def get_breaker(host):
+    breaker = _breakers.get(host)
+    if breaker is None:
+        breaker = _breakers.setdefault(host, CircuitBreaker())
+    return breaker
+
+
+def get(url, params=None, timeout=10):
+    """GET through the pooled session. ``timeout`` is the read timeout in seconds."""
+    session = get_session()
+    host = urlsplit(url).netloc
+    breaker = get_breaker(host)
+    if not breaker.allow():
+        raise CircuitOpenError(f'{host} is unavailable; retrying in {breaker.retry_in():.0f}s')
+
+    try:
+        response = session.get(url, params=params, timeout=(CONNECT_TIMEOUT, timeout))
+    except (requests.ConnectionError, requests.Timeout):
+        breaker.record_failure()
+        raise
+    if response.status_code >= 500 or response.status_code == 429:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def get_json(url, params=None, timeout=10):
+    response = get(url, params=params, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+def build_async_client():
+    import httpx
+    transport = httpx.AsyncHTTPTransport(
+        retries=RETRIES,  # connect failures only
+        limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+    )
+    return httpx.AsyncClient(transport=transport, headers={'User-Agent': 'xenohuru-weather/1.0'})
+
+
+@asynccontextmanager
+async def async_client():
+    """The ``httpx.AsyncClient`` of the enclosing block, or a new one closed when this block exits."""
+    client = _async_client.get()
+    if client is not None:
+        yield client
+        return
+    async with build_async_client() as client:
+        token = _async_client.set(client)
+        try:
+            yield client
+        finally:
+            _async_client.reset(token)
+
+
+async def aget_json(url, params=None, timeout=10):
+    import httpx
+    host = urlsplit(url).netloc
+    breaker = get_breaker(host)
+    if not breaker.allow():
+        raise CircuitOpenError(f'{host} is unavailable; retrying in {breaker.retry_in():.0f}s')
+
+    try:
+        async with async_client() as client:
+            response = await client.get(
+                url, params=params, timeout=httpx.Timeout(timeout, connect=CONNECT_TIMEOUT),
+            )
+    except httpx.TimeoutException as e:
+        breaker.record_failure()
+        raise requests.Timeout(str(e)) from e
+    except httpx.TransportError as e:
+        breaker.record_failure()
+        raise requests.ConnectionError(str(e)) from e
+    if response.status_code >= 500 or response.status_code == 429:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if response.is_error:
+        raise requests.HTTPError(f'{response.status_code} Error: {response.reason_phrase} for url: {response.url}')
+    return response.json()
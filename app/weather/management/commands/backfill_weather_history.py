@@ -0,0 +1,45 @@
+"""
+Management command: backfill_weather_history
+
+Fills the local daily weather store (WeatherObservation) for every active
+attraction's grid cell from the Open-Meteo Archive API, then refreshes the
+monthly climate aggregates in WeatherCache. Only days not stored yet are
+downloaded, so re-running it is cheap.
+
+Usage:
+    python manage.py backfill_weather_history            # last 365 days
+    python manage.py backfill_weather_history --days 1095
+"""
+
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+
+from app.attractions.models import Attraction
+from app.weather.services import WeatherService
+
+
+class Command(BaseCommand):
+    help = 'Download missing daily weather history for all active attractions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='How many past days to cover (default 365)')
+
+    def handle(self, *args, **options):
+        end_date = date.today() - timedelta(days=1)
+        start_date = end_date - timedelta(days=max(options['days'], 1) - 1)
+
+        cells = {
+            WeatherService.quantize(lat, lon)
+            for lat, lon in Attraction.objects.filter(is_active=True).values_list('latitude', 'longitude')
+        }
+        failed = 0
+        for lat, lon in sorted(cells):
+            error = WeatherService.ensure_observations(lat, lon, start_date, end_date)
+            if error is not None:
+                failed += 1
+                self.stderr.write(f'  {lat}, {lon}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {len(cells)} grid cells from {start_date} to {end_date} ({failed} failed).'
+        ))
@@ -0,0 +1,34 @@
+"""
+Management command: refresh_weather_cache
+
+Fetches current weather for every active attraction in a few multi-location
+Open-Meteo requests and upserts all WeatherCache rows in one transaction, so
+GET /api/v1/weather/ serves fresh data straight from the database. Safe to
+run from cron (e.g. every 15 minutes); the in-app cache warmer calls the same
+service method on Render.
+
+Usage:
+    python manage.py refresh_weather_cache
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.weather.services import WeatherService
+
+
+class Command(BaseCommand):
+    help = 'Refresh WeatherCache rows for all active attractions with one bulk fetch and one bulk write'
+
+    def handle(self, *args, **options):
+        timings = {}
+        started = time.perf_counter()
+        written, failed = WeatherService.refresh_weather_cache(timings=timings)
+        total = time.perf_counter() - started
+
+        for phase in ('load', 'fetch', 'write'):
+            self.stdout.write(f'  {phase:<6} {timings.get(phase, 0) * 1000:8.1f} ms')
+        self.stdout.write(self.style.SUCCESS(
+            f'Updated {written} weather records ({failed} skipped) in {total * 1000:.1f} ms.'
+        ))
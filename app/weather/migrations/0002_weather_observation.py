@@ -0,0 +1,39 @@
+# Generated by Django 4.2.28 on 2026-10-18 08:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('weather', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherObservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('latitude', models.DecimalField(decimal_places=4, max_digits=8)),
+                ('longitude', models.DecimalField(decimal_places=4, max_digits=8)),
+                ('date', models.DateField()),
+                ('temperature_max', models.FloatField(null=True)),
+                ('temperature_min', models.FloatField(null=True)),
+                ('temperature_mean', models.FloatField(null=True)),
+                ('precipitation_sum', models.FloatField(null=True)),
+                ('rain_sum', models.FloatField(null=True)),
+                ('humidity_max', models.FloatField(null=True)),
+                ('humidity_min', models.FloatField(null=True)),
+                ('wind_speed_max', models.FloatField(null=True)),
+                ('weather_code', models.IntegerField(null=True)),
+                ('fetched_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['latitude', 'longitude', 'date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weatherobservation',
+            constraint=models.UniqueConstraint(fields=('latitude', 'longitude', 'date'), name='weather_observation_cell_date'),
+        ),
+    ]
@@ -49,3 +49,37 @@ class SeasonalWeatherPattern(models.Model):
 
     def __str__(self):
         return f"{self.attraction.name} - {self.get_season_type_display()}"
+
+
+class WeatherObservation(models.Model):
+    """
+    One day of archived weather for a grid cell (see ``WeatherService.quantize``).
+
+    Past weather never changes, so rows are written once and every
+    ``days`` window of the historical endpoint is answered from here; only
+    dates with no row yet are requested from the archive API.
+    """
+    latitude = models.DecimalField(max_digits=8, decimal_places=4)
+    longitude = models.DecimalField(max_digits=8, decimal_places=4)
+    date = models.DateField()
+
+    temperature_max = models.FloatField(null=True)
+    temperature_min = models.FloatField(null=True)
+    temperature_mean = models.FloatField(null=True)
+    precipitation_sum = models.FloatField(null=True)
+    rain_sum = models.FloatField(null=True)
+    humidity_max = models.FloatField(null=True)
+    humidity_min = models.FloatField(null=True)
+    wind_speed_max = models.FloatField(null=True)
+    weather_code = models.IntegerField(null=True)
+
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['latitude', 'longitude', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['latitude', 'longitude', 'date'], name='weather_observation_cell_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.latitude}, {self.longitude} on {self.date}"
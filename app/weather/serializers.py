@@ -41,3 +41,12 @@ class CurrentWeatherSerializer(serializers.Serializer):
     cloud_cover = serializers.IntegerField()
     wind_speed = serializers.FloatField()
     timestamp = serializers.CharField()
+    stale = serializers.BooleanField(required=False)
+
+
+class MonthlyClimateSerializer(serializers.ModelSerializer):
+    attraction = serializers.CharField(source='attraction.slug', read_only=True)
+
+    class Meta:
+        model = WeatherCache
+        fields = ['attraction', 'monthly_temperature', 'monthly_precipitation', 'last_updated']
@@ -1,13 +1,44 @@
+import asyncio
+import threading
+import time
+from calendar import monthrange
+from datetime import date, timedelta
+from functools import partial
+
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.cache import cache
-from decimal import Decimal
-from .models import WeatherCache
+from django.db import transaction
+from django.db.models import Avg
+from django.db.models.functions import ExtractMonth
+from decimal import ROUND_HALF_EVEN, Decimal
+from . import http
+from .models import WeatherCache, WeatherObservation
+
+
+def _run_in_background(func, *args):
+    threading.Thread(target=func, args=args, daemon=True).start()
+
+
+def _nth(values, i):
+    return values[i] if values and i < len(values) else None
+
+
+def _date_range(start, end):
+    for offset in range((end - start).days + 1):
+        yield start + timedelta(days=offset)
 
 
 class WeatherService:
     BASE_URL = settings.WEATHER_API_BASE_URL
     CACHE_TIMEOUT = settings.WEATHER_CACHE_TIMEOUT
+    STALE_TIMEOUT = getattr(settings, 'WEATHER_STALE_TIMEOUT', 6 * 3600)
+    LAST_KNOWN_TIMEOUT = getattr(settings, 'WEATHER_LAST_KNOWN_TIMEOUT', 7 * 24 * 3600)
+    REFRESH_LOCK_TIMEOUT = 30
+    MISS_WAIT = 3  # seconds a worker waits for another worker's fetch on a hard miss
+    HISTORICAL_URL = 'https://archive-api.open-meteo.com/v1/archive'
+    GRID_DEGREES = getattr(settings, 'WEATHER_GRID_DEGREES', 0.05)
 
     @classmethod
     def get_weather_code_description(cls, code):
@@ -39,168 +70,563 @@ class WeatherService:
         }
         return weather_codes.get(code, 'Unknown')
 
+    CURRENT_FIELDS = 'temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,rain,weather_code,cloud_cover,wind_speed_10m,wind_direction_10m,surface_pressure,visibility'
+    BULK_CHUNK_SIZE = 50  # locations per multi-location request
+
+    # ── stale-while-revalidate cache ───────────────────────────────────────
+    #
+    # Entries are stored as {'data': ..., 'fresh_until': ts}. Until
+    # ``fresh_until`` (the soft expiry) they are served as-is. Between the soft
+    # and hard expiry (``STALE_TIMEOUT`` later) they are served immediately,
+    # flagged ``stale``, while one worker — whoever wins ``cache.add`` on the
+    # lock key — refreshes them in a background thread. On a hard miss the
+    # same lock lets one worker fetch while the others briefly wait for its
+    # result. A copy of every good value is also kept under ``<key>:last`` for
+    # ``LAST_KNOWN_TIMEOUT`` and is served when upstream fails after the hard
+    # expiry.
+
     @classmethod
-    def fetch_current_weather(cls, latitude, longitude):
-        cache_key = f'weather_current_{latitude}_{longitude}'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
+    def _store(cls, key, data, fresh_for):
+        cache.set(key, {'data': data, 'fresh_until': time.time() + fresh_for}, fresh_for + cls.STALE_TIMEOUT)
+        cache.set(f'{key}:last', data, cls.LAST_KNOWN_TIMEOUT)
+
+    @classmethod
+    def _refresh(cls, key, fresh_for, fetch):
+        try:
+            cls._store(key, fetch(), fresh_for)
+        except requests.RequestException:
+            pass
+        finally:
+            cache.delete(f'{key}:lock')
+
+    @classmethod
+    def _last_known(cls, key, fallback=None):
+        data = cache.get(f'{key}:last')
+        if data is None and fallback is not None:
+            data = fallback()
+        return None if data is None else {**data, 'stale': True}
+
+    @classmethod
+    def _fetch(cls, url, params, timeout, parse):
+        return parse(http.get_json(url, params=params, timeout=timeout))
+
+    @classmethod
+    def _get_or_fetch(cls, key, fresh_for, url, params, timeout, parse, error_label='Weather API error', fallback=None):
+        fetch = partial(cls._fetch, url, params, timeout, parse)
+        entry = cache.get(key)
+        if entry is not None:
+            if entry['fresh_until'] > time.time():
+                return entry['data']
+            if cache.add(f'{key}:lock', 1, cls.REFRESH_LOCK_TIMEOUT):
+                _run_in_background(cls._refresh, key, fresh_for, fetch)
+            return {**entry['data'], 'stale': True}
+
+        locked = cache.add(f'{key}:lock', 1, cls.REFRESH_LOCK_TIMEOUT)
+        if not locked:
+            deadline = time.time() + cls.MISS_WAIT
+            while time.time() < deadline:
+                time.sleep(0.1)
+                entry = cache.get(key)
+                if entry is not None:
+                    return entry['data']
+        try:
+            data = fetch()
+        except requests.RequestException as e:
+            return cls._last_known(key, fallback) or {'error': f'{error_label}: {str(e)}'}
+        finally:
+            if locked:
+                cache.delete(f'{key}:lock')
+        cls._store(key, data, fresh_for)
+        return data
+
+    @classmethod
+    async def _aget_or_fetch(cls, key, fresh_for, url, params, timeout, parse, error_label='Weather API error', fallback=None):
+        """Async twin of ``_get_or_fetch``; background refreshes still run on a thread."""
+        entry = await cache.aget(key)
+        if entry is not None:
+            if entry['fresh_until'] > time.time():
+                return entry['data']
+            if await cache.aadd(f'{key}:lock', 1, cls.REFRESH_LOCK_TIMEOUT):
+                _run_in_background(cls._refresh, key, fresh_for, partial(cls._fetch, url, params, timeout, parse))
+            return {**entry['data'], 'stale': True}
+
+        locked = await cache.aadd(f'{key}:lock', 1, cls.REFRESH_LOCK_TIMEOUT)
+        if not locked:
+            deadline = time.time() + cls.MISS_WAIT
+            while time.time() < deadline:
+                await asyncio.sleep(0.1)
+                entry = await cache.aget(key)
+                if entry is not None:
+                    return entry['data']
+        try:
+            data = parse(await http.aget_json(url, params=params, timeout=timeout))
+        except requests.RequestException as e:
+            return await sync_to_async(cls._last_known)(key, fallback) or {'error': f'{error_label}: {str(e)}'}
+        finally:
+            if locked:
+                await cache.adelete(f'{key}:lock')
+        await sync_to_async(cls._store)(key, data, fresh_for)
+        return data
+
+    @classmethod
+    def quantize(cls, latitude, longitude):
+        """
+        Snap a coordinate to the ``WEATHER_GRID_DEGREES`` grid, so
+        ``-3.0674``, ``'-3.067400'`` and a point a few hundred metres away
+        share one cache entry and one upstream query. Open-Meteo's own model
+        grid is 1-11 km, so a 0.05° (~5.5 km) cell loses nothing. A grid of
+        ``0`` only normalizes the representation.
+        """
+        grid = Decimal(str(cls.GRID_DEGREES or 0))
+
+        def snap(value):
+            value = Decimal(str(value))
+            if grid > 0:
+                value = (value / grid).to_integral_value(ROUND_HALF_EVEN) * grid
+            return float(value)
+
+        return snap(latitude), snap(longitude)
+
+    @classmethod
+    def _current_cache_key(cls, latitude, longitude):
+        return f'weather_current_{latitude}_{longitude}'
 
-        params = {
-            'latitude': float(latitude),
-            'longitude': float(longitude),
-            'current': 'temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,rain,weather_code,cloud_cover,wind_speed_10m,wind_direction_10m,surface_pressure,visibility',
+    @classmethod
+    def _current_params(cls, latitude, longitude):
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            'current': cls.CURRENT_FIELDS,
             'hourly': 'precipitation_probability,uv_index',
             'forecast_days': 1,
             'timezone': 'Africa/Dar_es_Salaam',
         }
 
+    @classmethod
+    def _parse_current(cls, data):
+        current = data.get('current', {})
+        return {
+            'temperature': current.get('temperature_2m'),
+            'apparent_temperature': current.get('apparent_temperature'),
+            'humidity': current.get('relative_humidity_2m'),
+            'precipitation': current.get('precipitation'),
+            'rain': current.get('rain'),
+            'weather_code': current.get('weather_code'),
+            'weather_description': cls.get_weather_code_description(current.get('weather_code', 0)),
+            'cloud_cover': current.get('cloud_cover'),
+            'wind_speed': current.get('wind_speed_10m'),
+            'wind_direction': current.get('wind_direction_10m'),
+            'surface_pressure': current.get('surface_pressure'),
+            'visibility': current.get('visibility'),
+            'precipitation_probability': data.get('hourly', {}).get('precipitation_probability', [None])[0],
+            'uv_index': data.get('hourly', {}).get('uv_index', [None])[0],
+            'timestamp': current.get('time'),
+        }
+
+    @classmethod
+    def _stored_current(cls, latitude, longitude):
+        """The last ``WeatherCache`` row for an attraction at these coordinates, as current-weather data."""
         try:
-            response = requests.get(cls.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            current = data.get('current', {})
-            weather_data = {
-                'temperature': current.get('temperature_2m'),
-                'apparent_temperature': current.get('apparent_temperature'),
-                'humidity': current.get('relative_humidity_2m'),
-                'precipitation': current.get('precipitation'),
-                'rain': current.get('rain'),
-                'weather_code': current.get('weather_code'),
-                'weather_description': cls.get_weather_code_description(current.get('weather_code', 0)),
-                'cloud_cover': current.get('cloud_cover'),
-                'wind_speed': current.get('wind_speed_10m'),
-                'wind_direction': current.get('wind_direction_10m'),
-                'surface_pressure': current.get('surface_pressure'),
-                'visibility': current.get('visibility'),
-                'precipitation_probability': data.get('hourly', {}).get('precipitation_probability', [None])[0],
-                'uv_index': data.get('hourly', {}).get('uv_index', [None])[0],
-                'timestamp': current.get('time'),
-            }
-            
-            cache.set(cache_key, weather_data, cls.CACHE_TIMEOUT)
-            return weather_data
+            row = WeatherCache.objects.filter(
+                attraction__latitude=latitude, attraction__longitude=longitude,
+            ).order_by('-last_updated').first()
+        except Exception:
+            return None
+        if row is None or row.temperature is None:
+            return None
 
-        except requests.RequestException as e:
-            return {'error': f'Weather API error: {str(e)}'}
+        def num(value):
+            return None if value is None else float(value)
+
+        return {
+            'temperature': num(row.temperature),
+            'apparent_temperature': num(row.apparent_temperature),
+            'humidity': row.humidity,
+            'precipitation': num(row.precipitation),
+            'rain': num(row.rain),
+            'weather_code': row.weather_code,
+            'weather_description': cls.get_weather_code_description(row.weather_code),
+            'cloud_cover': row.cloud_cover,
+            'wind_speed': num(row.wind_speed),
+            'timestamp': row.last_updated.isoformat(),
+        }
 
     @classmethod
-    def fetch_forecast(cls, latitude, longitude, days=7):
-        cache_key = f'weather_forecast_{latitude}_{longitude}_{days}'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            return cached_data
+    def _current_request(cls, latitude, longitude):
+        lat, lon = cls.quantize(latitude, longitude)
+        return {
+            'key': cls._current_cache_key(lat, lon),
+            'fresh_for': cls.CACHE_TIMEOUT,
+            'url': cls.BASE_URL,
+            'params': cls._current_params(lat, lon),
+            'timeout': 10,
+            'parse': cls._parse_current,
+            'fallback': lambda: cls._stored_current(latitude, longitude),
+        }
 
-        params = {
-            'latitude': float(latitude),
-            'longitude': float(longitude),
-            'daily': 'temperature_2m_max,temperature_2m_min,precipitation_sum,rain_sum,weather_code,precipitation_probability_max,wind_speed_10m_max,uv_index_max,relative_humidity_2m_max,relative_humidity_2m_min',
-            'timezone': 'Africa/Dar_es_Salaam',
-            'forecast_days': days,
+    @classmethod
+    def fetch_current_weather(cls, latitude, longitude):
+        return cls._get_or_fetch(**cls._current_request(latitude, longitude))
+
+    @classmethod
+    async def afetch_current_weather(cls, latitude, longitude):
+        return await cls._aget_or_fetch(**cls._current_request(latitude, longitude))
+
+    @classmethod
+    def fetch_current_weather_bulk(cls, coords, chunk_size=None):
+        """
+        Current weather for many ``(latitude, longitude)`` pairs at once.
+
+        Fresh cache entries are read with one ``get_many``; stale and missing
+        ones are fetched from Open-Meteo in multi-location requests of
+        ``chunk_size`` coordinates (comma-separated lists) and fanned out into
+        the same per-coordinate cache keys ``fetch_current_weather`` uses.
+        Coordinates are quantized first, so pairs in the same grid cell cost
+        one lookup. Returns a dict keyed by the input pairs. If a chunk
+        fails, its pairs get the stale or last known value, else an
+        ``{'error': ...}`` dict.
+        """
+        chunk_size = chunk_size or cls.BULK_CHUNK_SIZE
+        cells = {(lat, lon): cls.quantize(lat, lon) for lat, lon in coords}
+        coords = list(dict.fromkeys(cells.values()))
+        keys = {coord: cls._current_cache_key(*coord) for coord in coords}
+
+        cached = cache.get_many(keys.values())
+        now = time.time()
+        results = {}
+        for coord, key in keys.items():
+            entry = cached.get(key)
+            if entry is not None and entry['fresh_until'] > now:
+                results[coord] = entry['data']
+        missing = [coord for coord in coords if coord not in results]
+
+        for start in range(0, len(missing), chunk_size):
+            chunk = missing[start:start + chunk_size]
+            params = cls._current_params(
+                ','.join(str(lat) for lat, _ in chunk),
+                ','.join(str(lon) for _, lon in chunk),
+            )
+            try:
+                response = http.get(cls.BASE_URL, params=params, timeout=15)
+                response.raise_for_status()
+                payload = response.json()
+                # A single location comes back as an object, several as a list in request order
+                locations = payload if isinstance(payload, list) else [payload]
+                if len(locations) != len(chunk):
+                    raise requests.RequestException(
+                        f'expected {len(chunk)} locations, got {len(locations)}'
+                    )
+            except requests.RequestException as e:
+                for coord in chunk:
+                    entry = cached.get(keys[coord])
+                    if entry is not None:
+                        results[coord] = {**entry['data'], 'stale': True}
+                    else:
+                        results[coord] = cls._last_known(keys[coord]) or {'error': f'Weather API error: {str(e)}'}
+                continue
+
+            for coord, data in zip(chunk, locations):
+                results[coord] = cls._parse_current(data)
+                cls._store(keys[coord], results[coord], cls.CACHE_TIMEOUT)
+
+        return {coord: results[cell] for coord, cell in cells.items()}
+
+    @classmethod
+    def _parse_forecast(cls, data):
+        daily = data.get('daily', {})
+        return {
+            'dates': daily.get('time', []),
+            'temperature_max': daily.get('temperature_2m_max', []),
+            'temperature_min': daily.get('temperature_2m_min', []),
+            'precipitation': daily.get('precipitation_sum', []),
+            'rain': daily.get('rain_sum', []),
+            'weather_codes': daily.get('weather_code', []),
+            'weather_descriptions': [cls.get_weather_code_description(c) for c in daily.get('weather_code', [])],
+            'precipitation_probability': daily.get('precipitation_probability_max', []),
+            'wind_speed_max': daily.get('wind_speed_10m_max', []),
+            'uv_index_max': daily.get('uv_index_max', []),
+            'humidity_max': daily.get('relative_humidity_2m_max', []),
+            'humidity_min': daily.get('relative_humidity_2m_min', []),
         }
 
-        try:
-            response = requests.get(cls.BASE_URL, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            daily = data.get('daily', {})
-            forecast_data = {
-                'dates': daily.get('time', []),
-                'temperature_max': daily.get('temperature_2m_max', []),
-                'temperature_min': daily.get('temperature_2m_min', []),
-                'precipitation': daily.get('precipitation_sum', []),
-                'rain': daily.get('rain_sum', []),
-                'weather_codes': daily.get('weather_code', []),
-                'weather_descriptions': [cls.get_weather_code_description(c) for c in daily.get('weather_code', [])],
-                'precipitation_probability': daily.get('precipitation_probability_max', []),
-                'wind_speed_max': daily.get('wind_speed_10m_max', []),
-                'uv_index_max': daily.get('uv_index_max', []),
-                'humidity_max': daily.get('relative_humidity_2m_max', []),
-                'humidity_min': daily.get('relative_humidity_2m_min', []),
-            }
-            
-            cache.set(cache_key, forecast_data, cls.CACHE_TIMEOUT)
-            return forecast_data
+    @classmethod
+    def _forecast_request(cls, latitude, longitude, days):
+        lat, lon = cls.quantize(latitude, longitude)
+        return {
+            'key': f'weather_forecast_{lat}_{lon}_{days}',
+            'fresh_for': cls.CACHE_TIMEOUT,
+            'url': cls.BASE_URL,
+            'params': {
+                'latitude': lat,
+                'longitude': lon,
+                'daily': 'temperature_2m_max,temperature_2m_min,precipitation_sum,rain_sum,weather_code,precipitation_probability_max,wind_speed_10m_max,uv_index_max,relative_humidity_2m_max,relative_humidity_2m_min',
+                'timezone': 'Africa/Dar_es_Salaam',
+                'forecast_days': days,
+            },
+            'timeout': 10,
+            'parse': cls._parse_forecast,
+        }
 
-        except requests.RequestException as e:
-            return {'error': f'Weather API error: {str(e)}'}
+    @classmethod
+    def fetch_forecast(cls, latitude, longitude, days=7):
+        return cls._get_or_fetch(**cls._forecast_request(latitude, longitude, days))
 
     @classmethod
-    def fetch_historical_weather(cls, latitude, longitude, days=7):
-        """Fetch historical weather from Open-Meteo Archive API. Max 90 days."""
-        from datetime import date, timedelta
+    async def afetch_forecast(cls, latitude, longitude, days=7):
+        return await cls._aget_or_fetch(**cls._forecast_request(latitude, longitude, days))
+
+    # ── historical: local daily store ──────────────────────────────────────
+    #
+    # Archived days are kept in WeatherObservation, one row per grid cell and
+    # date. A request only asks the archive API for the span of dates it has
+    # no rows for, so days=30 and days=90 share data and a repeat request
+    # costs a single indexed query. The archive lags a few days behind; days
+    # it can't provide yet are not stored, and the same gap isn't re-requested
+    # for ARCHIVE_RETRY seconds.
+
+    ARCHIVE_RETRY = 3600
+    _ARCHIVE_FIELDS = {
+        'temperature_2m_max': 'temperature_max',
+        'temperature_2m_min': 'temperature_min',
+        'temperature_2m_mean': 'temperature_mean',
+        'precipitation_sum': 'precipitation_sum',
+        'rain_sum': 'rain_sum',
+        'relative_humidity_2m_max': 'humidity_max',
+        'relative_humidity_2m_min': 'humidity_min',
+        'wind_speed_10m_max': 'wind_speed_max',
+        'weather_code': 'weather_code',
+    }
+
+    @classmethod
+    def _historical_window(cls, days):
         days = min(int(days), 90)
         end_date = date.today() - timedelta(days=1)
         start_date = end_date - timedelta(days=days - 1)
+        return days, start_date, end_date
+
+    @classmethod
+    def _observations(cls, lat, lon):
+        return WeatherObservation.objects.filter(latitude=Decimal(str(lat)), longitude=Decimal(str(lon)))
+
+    @classmethod
+    def _gap_marker(cls, lat, lon, first, last):
+        return f'weather_archive_gap_{lat}_{lon}_{first}_{last}'
 
-        cache_key = f'weather_historical_{latitude}_{longitude}_{days}'
-        cached = cache.get(cache_key)
-        if cached:
-            return cached
-
-        params = {
-            'latitude': float(latitude),
-            'longitude': float(longitude),
-            'start_date': start_date.isoformat(),
-            'end_date': end_date.isoformat(),
-            'daily': 'temperature_2m_max,temperature_2m_min,temperature_2m_mean,precipitation_sum,rain_sum,relative_humidity_2m_max,relative_humidity_2m_min,wind_speed_10m_max,weather_code',
+    @classmethod
+    def _missing_range(cls, lat, lon, start_date, end_date):
+        """``(first, last)`` span of unstored dates in the window, or None if there is nothing to fetch."""
+        stored = set(cls._observations(lat, lon).filter(date__range=(start_date, end_date)).values_list('date', flat=True))
+        missing = [d for d in _date_range(start_date, end_date) if d not in stored]
+        if not missing or cache.get(cls._gap_marker(lat, lon, missing[0], missing[-1])):
+            return None
+        return missing[0], missing[-1]
+
+    @classmethod
+    def _archive_params(cls, lat, lon, first, last):
+        return {
+            'latitude': lat,
+            'longitude': lon,
+            'start_date': first.isoformat(),
+            'end_date': last.isoformat(),
+            'daily': ','.join(cls._ARCHIVE_FIELDS),
             'timezone': 'Africa/Dar_es_Salaam',
         }
 
-        try:
-            response = requests.get(
-                'https://archive-api.open-meteo.com/v1/archive',
-                params=params, timeout=15
+    @classmethod
+    def _store_observations(cls, lat, lon, first, last, data):
+        daily = data.get('daily', {})
+        rows = []
+        for i, day in enumerate(daily.get('time', [])):
+            values = {field: _nth(daily.get(source), i) for source, field in cls._ARCHIVE_FIELDS.items()}
+            if values['temperature_max'] is None and values['precipitation_sum'] is None:
+                continue  # not in the archive yet
+            rows.append(WeatherObservation(
+                latitude=Decimal(str(lat)), longitude=Decimal(str(lon)), date=date.fromisoformat(day), **values,
+            ))
+        if rows:
+            WeatherObservation.objects.bulk_create(
+                rows, update_conflicts=True,
+                unique_fields=['latitude', 'longitude', 'date'],
+                update_fields=[*cls._ARCHIVE_FIELDS.values(), 'fetched_at'],
             )
-            response.raise_for_status()
-            data = response.json()
-            daily = data.get('daily', {})
-            weather_codes = daily.get('weather_code', [])
-
-            result = {
-                'period': {
-                    'start': start_date.isoformat(),
-                    'end': end_date.isoformat(),
-                    'days': days,
-                },
-                'dates': daily.get('time', []),
-                'temperature_max': daily.get('temperature_2m_max', []),
-                'temperature_min': daily.get('temperature_2m_min', []),
-                'temperature_mean': daily.get('temperature_2m_mean', []),
-                'precipitation_sum': daily.get('precipitation_sum', []),
-                'rain_sum': daily.get('rain_sum', []),
-                'humidity_max': daily.get('relative_humidity_2m_max', []),
-                'humidity_min': daily.get('relative_humidity_2m_min', []),
-                'wind_speed_max': daily.get('wind_speed_10m_max', []),
-                'weather_codes': weather_codes,
-                'weather_descriptions': [cls.get_weather_code_description(c) for c in weather_codes],
-            }
-            cache.set(cache_key, result, 3600 * 6)  # 6-hour cache
-            return result
+            cls.refresh_monthly_aggregates(lat, lon)
+
+        stored = {row.date for row in rows}
+        still_missing = [d for d in _date_range(first, last) if d not in stored]
+        if still_missing:
+            cache.set(cls._gap_marker(lat, lon, still_missing[0], still_missing[-1]), 1, cls.ARCHIVE_RETRY)
+        return len(rows)
 
+    @classmethod
+    def ensure_observations(cls, lat, lon, start_date, end_date):
+        """
+        Store every available day in ``[start_date, end_date]`` for a
+        quantized cell. Returns the upstream exception, or None.
+        """
+        missing = cls._missing_range(lat, lon, start_date, end_date)
+        if missing is None:
+            return None
+        try:
+            data = http.get_json(cls.HISTORICAL_URL, params=cls._archive_params(lat, lon, *missing), timeout=15)
         except requests.RequestException as e:
-            return {'error': f'Historical weather API error: {str(e)}'}
+            return e
+        cls._store_observations(lat, lon, *missing, data)
+        return None
+
+    @classmethod
+    def _historical_result(cls, lat, lon, days, start_date, end_date, error=None):
+        rows = {o.date: o for o in cls._observations(lat, lon).filter(date__range=(start_date, end_date))}
+        if error is not None and not rows:
+            return {'error': f'Historical weather API error: {str(error)}'}
+
+        dates = list(_date_range(start_date, end_date))
+
+        def series(field):
+            return [getattr(rows[d], field) if d in rows else None for d in dates]
+
+        weather_codes = series('weather_code')
+        result = {
+            'period': {
+                'start': start_date.isoformat(),
+                'end': end_date.isoformat(),
+                'days': days,
+            },
+            'dates': [d.isoformat() for d in dates],
+            'temperature_max': series('temperature_max'),
+            'temperature_min': series('temperature_min'),
+            'temperature_mean': series('temperature_mean'),
+            'precipitation_sum': series('precipitation_sum'),
+            'rain_sum': series('rain_sum'),
+            'humidity_max': series('humidity_max'),
+            'humidity_min': series('humidity_min'),
+            'wind_speed_max': series('wind_speed_max'),
+            'weather_codes': weather_codes,
+            'weather_descriptions': [cls.get_weather_code_description(c) if c is not None else None for c in weather_codes],
+        }
+        if error is not None:
+            result['stale'] = True  # some days could not be fetched
+        return result
+
+    @classmethod
+    def fetch_historical_weather(cls, latitude, longitude, days=7):
+        """Historical weather from the local store, topped up from the Open-Meteo Archive API. Max 90 days."""
+        days, start_date, end_date = cls._historical_window(days)
+        lat, lon = cls.quantize(latitude, longitude)
+        error = cls.ensure_observations(lat, lon, start_date, end_date)
+        return cls._historical_result(lat, lon, days, start_date, end_date, error)
+
+    @classmethod
+    async def afetch_historical_weather(cls, latitude, longitude, days=7):
+        days, start_date, end_date = cls._historical_window(days)
+        lat, lon = cls.quantize(latitude, longitude)
+        error = None
+        missing = await sync_to_async(cls._missing_range)(lat, lon, start_date, end_date)
+        if missing is not None:
+            try:
+                data = await http.aget_json(cls.HISTORICAL_URL, params=cls._archive_params(lat, lon, *missing), timeout=15)
+            except requests.RequestException as e:
+                error = e
+            else:
+                await sync_to_async(cls._store_observations)(lat, lon, *missing, data)
+        return await sync_to_async(cls._historical_result)(lat, lon, days, start_date, end_date, error)
+
+    # ── monthly climate aggregates ─────────────────────────────────────────
+
+    @classmethod
+    def monthly_climate(cls, lat, lon):
+        """``(monthly_temperature, monthly_precipitation)`` for a cell, keyed by month number as a string."""
+        months = (
+            cls._observations(lat, lon)
+            .annotate(month=ExtractMonth('date'))
+            .values('month')
+            .annotate(temperature=Avg('temperature_mean'), precipitation=Avg('precipitation_sum'))
+            .order_by('month')
+        )
+        temperature, precipitation = {}, {}
+        for row in months:
+            key = str(row['month'])
+            if row['temperature'] is not None:
+                temperature[key] = round(row['temperature'], 1)
+            if row['precipitation'] is not None:
+                # Mean daily total scaled to the month, so partly observed months still compare
+                precipitation[key] = round(row['precipitation'] * monthrange(2001, row['month'])[1], 1)
+        return temperature, precipitation
+
+    @classmethod
+    def refresh_monthly_aggregates(cls, lat, lon):
+        """
+        Write the cell's monthly climate into the existing ``WeatherCache``
+        rows of the attractions in it. A queryset ``update()`` leaves the
+        current conditions and their ``last_updated`` alone and creates no
+        rows; attractions without one get the climate from ``monthly_climate()``.
+        """
+        from app.attractions.models import Attraction
+        temperature, precipitation = cls.monthly_climate(lat, lon)
+        margin = Decimal(str(cls.GRID_DEGREES or 0)) / 2 + Decimal('0.0001')
+        candidates = Attraction.objects.filter(
+            latitude__gte=Decimal(str(lat)) - margin, latitude__lte=Decimal(str(lat)) + margin,
+            longitude__gte=Decimal(str(lon)) - margin, longitude__lte=Decimal(str(lon)) + margin,
+        ).values_list('pk', 'latitude', 'longitude')
+        in_cell = [pk for pk, latitude, longitude in candidates if cls.quantize(latitude, longitude) == (lat, lon)]
+        WeatherCache.objects.filter(attraction__in=in_cell).update(
+            monthly_temperature=temperature, monthly_precipitation=precipitation,
+        )
+
+    CURRENT_CACHE_FIELDS = (
+        'temperature', 'apparent_temperature', 'precipitation', 'rain',
+        'weather_code', 'cloud_cover', 'wind_speed', 'humidity',
+    )
 
     @classmethod
     def update_attraction_weather_cache(cls, attraction):
         weather_data = cls.fetch_current_weather(attraction.latitude, attraction.longitude)
         
-        if 'error' not in weather_data:
-            cache_obj, created = WeatherCache.objects.get_or_create(attraction=attraction)
-            cache_obj.temperature = weather_data.get('temperature')
-            cache_obj.apparent_temperature = weather_data.get('apparent_temperature')
-            cache_obj.precipitation = weather_data.get('precipitation')
-            cache_obj.rain = weather_data.get('rain')
-            cache_obj.weather_code = weather_data.get('weather_code')
-            cache_obj.cloud_cover = weather_data.get('cloud_cover')
-            cache_obj.wind_speed = weather_data.get('wind_speed')
-            cache_obj.humidity = weather_data.get('humidity')
-            cache_obj.save()
-            
+        if 'error' not in weather_data and not weather_data.get('stale'):
+            cache_obj, created = WeatherCache.objects.update_or_create(
+                attraction=attraction,
+                defaults={field: weather_data.get(field) for field in cls.CURRENT_CACHE_FIELDS},
+            )
             return cache_obj
         
         return None
+
+    @classmethod
+    def refresh_weather_cache(cls, attractions=None, timings=None):
+        """
+        Refresh ``WeatherCache`` for many attractions: one bulk upstream
+        fetch, then one multi-row upsert inside a transaction (instead of a
+        ``get_or_create`` + ``save()`` per row). Defaults to every active
+        attraction. Returns ``(written, failed)``; pass a dict as
+        ``timings`` to collect seconds per phase.
+        """
+        from app.attractions.models import Attraction
+        timings = {} if timings is None else timings
+
+        started = time.perf_counter()
+        if attractions is None:
+            attractions = Attraction.objects.filter(is_active=True)
+        rows = list(attractions.values_list('id', 'latitude', 'longitude'))
+        timings['load'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        weather = cls.fetch_current_weather_bulk((lat, lon) for _, lat, lon in rows)
+        timings['fetch'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        objs = []
+        for attraction_id, lat, lon in rows:
+            data = weather.get((lat, lon), {})
+            if 'error' in data or data.get('stale') or not data:
+                continue
+            objs.append(WeatherCache(
+                attraction_id=attraction_id,
+                **{field: data.get(field) for field in cls.CURRENT_CACHE_FIELDS},
+            ))
+        with transaction.atomic():
+            WeatherCache.objects.bulk_create(
+                objs, batch_size=500, update_conflicts=True,
+                unique_fields=['attraction'],
+                update_fields=[*cls.CURRENT_CACHE_FIELDS, 'last_updated'],
+            )
+        timings['write'] = time.perf_counter() - started
+        return len(objs), len(rows) - len(objs)
@@ -1,11 +1,15 @@
+import json
+from django.core.cache import cache
 from django.test import TestCase
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
-from unittest.mock import patch
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
 from app.regions.models import Region
 from app.attractions.models import Attraction
-from .models import WeatherCache, SeasonalWeatherPattern
+from .models import WeatherCache, SeasonalWeatherPattern, WeatherObservation
+from .services import WeatherService
 
 User = get_user_model()
 
@@ -74,3 +78,413 @@ class WeatherAPITest(TestCase):
         response = self.client.get('/api/v1/weather/seasonal/?attraction=kilimanjaro')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 1)
+
+
+def _open_meteo_location(temperature):
+    return {
+        'current': {'temperature_2m': temperature, 'weather_code': 1, 'time': '2026-01-01T12:00'},
+        'hourly': {'precipitation_probability': [10], 'uv_index': [7.5]},
+    }
+
+
+class WeatherBulkFetchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _response(self, payload):
+        response = MagicMock()
+        response.json.return_value = payload
+        return response
+
+    def test_bulk_fetch_chunks_requests_and_fills_cache(self):
+        coords = [(-3.1, 37.1), (-3.2, 37.2), (-3.3, 37.3)]
+        payloads = [
+            [_open_meteo_location(20.0), _open_meteo_location(21.0)],
+            _open_meteo_location(22.0),  # single location comes back as an object
+        ]
+        with patch('app.weather.services.http.get', side_effect=[self._response(p) for p in payloads]) as get:
+            results = WeatherService.fetch_current_weather_bulk(coords, chunk_size=2)
+
+        self.assertEqual(get.call_count, 2)
+        self.assertEqual(get.call_args_list[0].kwargs['params']['latitude'], '-3.1,-3.2')
+        self.assertEqual([results[c]['temperature'] for c in coords], [20.0, 21.0, 22.0])
+        self.assertEqual(results[coords[1]]['weather_description'], 'Mainly clear')
+
+        # Per-coordinate entries are shared with the single-location call
+        with patch('app.weather.services.http.get') as get:
+            single = WeatherService.fetch_current_weather(-3.2, 37.2)
+        get.assert_not_called()
+        self.assertEqual(single['temperature'], 21.0)
+
+    def test_bulk_fetch_skips_cached_and_reports_errors(self):
+        import requests
+        WeatherService._store(WeatherService._current_cache_key(-3.1, 37.1), {'temperature': 19.0}, 60)
+        with patch('app.weather.services.http.get', side_effect=requests.ConnectionError('down')) as get:
+            results = WeatherService.fetch_current_weather_bulk([(-3.1, 37.1), (-3.2, 37.2)])
+
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args.kwargs['params']['latitude'], '-3.2')
+        self.assertEqual(results[(-3.1, 37.1)]['temperature'], 19.0)
+        self.assertIn('error', results[(-3.2, 37.2)])
+
+    def test_bulk_fetch_short_payload_falls_back(self):
+        coords = [(-3.1, 37.1), (-3.2, 37.2)]
+        with patch('app.weather.services.http.get', return_value=self._response([_open_meteo_location(20.0)])):
+            results = WeatherService.fetch_current_weather_bulk(coords)
+        self.assertEqual(set(results), set(coords))
+        self.assertTrue(all('error' in results[c] for c in coords))
+
+
+class WeatherHTTPTest(TestCase):
+    def setUp(self):
+        from . import http
+        self.http = http
+        self.now = [1000.0]
+        self.breaker = http.CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: self.now[0])
+
+    def test_breaker_opens_after_threshold_and_half_opens(self):
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+
+        self.now[0] += 31
+        self.assertTrue(self.breaker.allow())   # one trial call
+        self.assertFalse(self.breaker.allow())  # others still fail fast
+        self.breaker.record_success()
+        self.assertTrue(self.breaker.allow())
+
+    def test_get_fails_fast_when_circuit_open(self):
+        import requests
+        session = MagicMock()
+        session.get.side_effect = requests.ConnectTimeout('slow')
+        with patch.object(self.http, 'get_session', return_value=session), \
+                patch.object(self.http, 'get_breaker', return_value=self.breaker):
+            for _ in range(2):
+                with self.assertRaises(requests.ConnectTimeout):
+                    self.http.get('https://api.open-meteo.com/v1/forecast')
+            with self.assertRaises(self.http.CircuitOpenError):
+                self.http.get('https://api.open-meteo.com/v1/forecast')
+        self.assertEqual(session.get.call_count, 2)
+
+    def test_open_circuit_surfaces_as_service_error(self):
+        cache.clear()
+        with patch('app.weather.services.http.get', side_effect=self.http.CircuitOpenError('open')):
+            data = WeatherService.fetch_current_weather(-3.5, 37.5)
+        self.assertIn('error', data)
+
+    def test_session_is_pooled_per_process(self):
+        self.assertIs(self.http.get_session(), self.http.get_session())
+        adapter = self.http.get_session().get_adapter('https://api.open-meteo.com')
+        self.assertEqual(adapter.max_retries.read, 0)
+
+
+class WeatherStaleWhileRevalidateTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.key = WeatherService._current_cache_key(-3.6, 37.6)
+
+    def _response(self, temperature):
+        response = MagicMock()
+        response.json.return_value = _open_meteo_location(temperature)
+        return response
+
+    def test_stale_entry_served_while_one_refresh_runs(self):
+        cache.set(self.key, {'data': {'temperature': 15.0}, 'fresh_until': 0}, 600)
+        background = []
+        with patch('app.weather.services._run_in_background', side_effect=lambda f, *a: background.append((f, a))), \
+                patch('app.weather.services.http.get', return_value=self._response(25.0)) as get:
+            first = WeatherService.fetch_current_weather(-3.6, 37.6)
+            second = WeatherService.fetch_current_weather(-3.6, 37.6)
+            self.assertEqual(first, {'temperature': 15.0, 'stale': True})
+            self.assertTrue(second['stale'])
+            self.assertEqual(len(background), 1)  # the lock lets only one refresh through
+            get.assert_not_called()
+
+            func, args = background[0]
+            func(*args)
+            self.assertEqual(WeatherService.fetch_current_weather(-3.6, 37.6)['temperature'], 25.0)
+        self.assertIsNone(cache.get(f'{self.key}:lock'))
+
+    def test_upstream_error_falls_back_to_last_known_value(self):
+        import requests
+        cache.set(f'{self.key}:last', {'temperature': 17.0}, 600)
+        with patch('app.weather.services.http.get', side_effect=requests.ConnectionError('down')):
+            data = WeatherService.fetch_current_weather(-3.6, 37.6)
+        self.assertEqual(data, {'temperature': 17.0, 'stale': True})
+
+    def test_upstream_error_falls_back_to_weather_cache_row(self):
+        import requests
+        user = User.objects.create_user(username='swruser', email='swr@example.com', password='Pass1234!')
+        region = Region.objects.create(
+            name='Kilimanjaro Region', slug='kilimanjaro-region', description='Mountain region.',
+            latitude='-3.0674', longitude='37.3556',
+        )
+        attraction = make_attraction(region, user)
+        WeatherCache.objects.create(attraction=attraction, temperature=Decimal('21.50'), weather_code=2, humidity=55)
+
+        client = APIClient()
+        with patch('app.weather.services.http.get', side_effect=requests.ConnectionError('down')):
+            response = client.get(f'/api/v1/weather/current/?lat={attraction.latitude}&lon={attraction.longitude}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['temperature'], 21.5)
+        self.assertTrue(response.data['stale'])
+
+
+class WeatherQuantizationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_quantize_snaps_to_grid(self):
+        self.assertEqual(WeatherService.quantize('-3.0674', '37.3556'), (-3.05, 37.35))
+        self.assertEqual(WeatherService.quantize(Decimal('-3.067400'), 37.3556), (-3.05, 37.35))
+        with patch.object(WeatherService, 'GRID_DEGREES', 0):
+            self.assertEqual(WeatherService.quantize('-3.067400', '37.3556'), (-3.0674, 37.3556))
+
+    def test_nearby_points_share_cache_entry_and_query_grid(self):
+        response = MagicMock()
+        response.json.return_value = _open_meteo_location(23.0)
+        with patch('app.weather.services.http.get', return_value=response) as get:
+            first = WeatherService.fetch_current_weather('-3.0674', '37.3556')
+            second = WeatherService.fetch_current_weather('-3.0601', '37.3620')
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args.kwargs['params']['latitude'], -3.05)
+        self.assertEqual(first, second)
+
+    def test_bulk_fetch_dedupes_grid_cells(self):
+        response = MagicMock()
+        response.json.return_value = _open_meteo_location(24.0)
+        with patch('app.weather.services.http.get', return_value=response) as get:
+            results = WeatherService.fetch_current_weather_bulk([(-3.0674, 37.3556), (-3.0601, 37.3620)])
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(get.call_args.kwargs['params']['latitude'], '-3.05')
+        self.assertEqual(len(results), 2)
+
+
+class WeatherAsyncViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def _fake_upstream(self, url, params=None, timeout=10):
+        if 'archive' in url:
+            return {'daily': {'time': ['2026-01-01'], 'weather_code': [3]}}
+        if 'forecast_days' in params and 'daily' in params:
+            return {'daily': {'time': ['2026-01-02', '2026-01-03'], 'weather_code': [61, 0]}}
+        return _open_meteo_location(26.0)
+
+    def test_overview_fetches_all_sections_concurrently(self):
+        from unittest.mock import AsyncMock
+        with patch('app.weather.services.http.aget_json', new=AsyncMock(side_effect=self._fake_upstream)) as aget:
+            response = self.client.get('/api/v1/weather/overview/?lat=-3.41&lon=36.71&history_days=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(aget.await_count, 3)
+        body = response.json()
+        self.assertEqual(body['current']['temperature'], 26.0)
+        self.assertEqual(body['forecast']['weather_descriptions'], ['Slight rain', 'Clear sky'])
+        self.assertEqual(body['historical']['period']['days'], 1)
+
+    def test_overview_503_only_when_every_section_fails(self):
+        import requests
+        from unittest.mock import AsyncMock
+        with patch('app.weather.services.http.aget_json', new=AsyncMock(side_effect=requests.ConnectionError('down'))):
+            response = self.client.get('/api/v1/weather/overview/?lat=-3.42&lon=36.72')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertIn('error', response.json()['forecast'])
+
+    def test_async_views_are_documented(self):
+        from drf_spectacular.generators import SchemaGenerator
+        paths = SchemaGenerator().get_schema(request=None, public=True)['paths']
+        for path in ('current/async/', 'forecast/async/', 'historical/async/', 'overview/'):
+            self.assertEqual(list(paths[f'/api/v1/weather/{path}']), ['get'])
+        overview = paths['/api/v1/weather/overview/']['get']
+        self.assertTrue({'forecast_days', 'history_days'} <= {p['name'] for p in overview['parameters']})
+        self.assertIn('503', overview['responses'])
+
+    def test_async_current_missing_params_and_method(self):
+        self.assertEqual(self.client.get('/api/v1/weather/current/async/').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post('/api/v1/weather/current/async/').status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_aget_json_translates_httpx_errors(self):
+        import asyncio
+        import httpx
+        import requests
+        from . import http
+
+        def handler(request):
+            return httpx.Response(502, request=request)
+
+        async def call():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch.object(http, 'build_async_client', return_value=client), \
+                    patch.object(http, 'get_breaker', return_value=http.CircuitBreaker()):
+                await http.aget_json('https://api.open-meteo.com/v1/forecast')
+
+        with self.assertRaises(requests.HTTPError):
+            asyncio.run(call())
+
+    def test_async_client_scoped_to_block(self):
+        import asyncio
+        from . import http
+
+        async def call():
+            async with http.async_client() as outer:
+                async with http.async_client() as inner:
+                    self.assertIs(inner, outer)
+            return outer
+
+        client = asyncio.run(call())
+        self.assertTrue(client.is_closed)
+
+
+class WeatherObservationStoreTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='obsuser', email='obs@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Kilimanjaro Region', slug='kilimanjaro-region', description='Mountain region.',
+            latitude='-3.0674', longitude='37.3556',
+        )
+        self.attraction = make_attraction(self.region, self.user)
+
+    def _archive(self, url, params=None, timeout=10):
+        from datetime import date, timedelta
+        start, end = date.fromisoformat(params['start_date']), date.fromisoformat(params['end_date'])
+        days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        response = MagicMock()
+        response.json.return_value = {'daily': {
+            'time': days,
+            'temperature_2m_max': [25.0] * len(days),
+            'temperature_2m_mean': [20.0] * len(days),
+            'precipitation_sum': [2.0] * len(days),
+            'weather_code': [3] * len(days),
+        }}
+        return response
+
+    def test_windows_share_stored_days_and_fetch_only_missing(self):
+        with patch('app.weather.services.http.get', side_effect=self._archive) as get:
+            short = WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=5)
+            self.assertEqual(get.call_count, 1)
+            longer = WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=30)
+            self.assertEqual(get.call_count, 2)
+            # Only the 25 days before the stored five were requested
+            params = get.call_args.kwargs['params']
+            self.assertEqual(params['start_date'], longer['period']['start'])
+            self.assertEqual(params['end_date'], longer['dates'][24])
+            again = WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=30)
+            self.assertEqual(get.call_count, 2)
+
+        self.assertEqual(short['temperature_mean'], [20.0] * 5)
+        self.assertEqual(again, longer)
+        self.assertEqual(WeatherObservation.objects.count(), 30)
+
+    def test_archive_lag_days_not_refetched_immediately(self):
+        def lagging(url, params=None, timeout=10):
+            response = self._archive(url, params)
+            daily = response.json.return_value['daily']
+            daily['temperature_2m_max'][-2:] = [None, None]
+            daily['precipitation_sum'][-2:] = [None, None]
+            return response
+
+        with patch('app.weather.services.http.get', side_effect=lagging) as get:
+            data = WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=7)
+            WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=7)
+        self.assertEqual(get.call_count, 1)
+        self.assertEqual(data['temperature_max'][-2:], [None, None])
+        self.assertEqual(WeatherObservation.objects.count(), 5)
+
+    def test_upstream_error_serves_stored_days(self):
+        import requests
+        with patch('app.weather.services.http.get', side_effect=self._archive):
+            WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=5)
+        with patch('app.weather.services.http.get', side_effect=requests.ConnectionError('down')):
+            data = WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=10)
+        self.assertTrue(data['stale'])
+        self.assertEqual(data['temperature_mean'][-5:], [20.0] * 5)
+
+    def test_monthly_aggregates_feed_climate_endpoint(self):
+        with patch('app.weather.services.http.get', side_effect=self._archive):
+            WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=10)
+
+        response = APIClient().get('/api/v1/weather/climate/?attraction=kilimanjaro')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['monthly_temperature'])
+        self.assertEqual(set(response.data['monthly_temperature'].values()), {20.0})
+        month, total = next(iter(response.data['monthly_precipitation'].items()))
+        from calendar import monthrange
+        self.assertEqual(total, 2.0 * monthrange(2001, int(month))[1])
+
+    def test_historical_fetch_leaves_current_conditions_alone(self):
+        client = APIClient()
+
+        def weather_list():
+            return json.loads(b''.join(client.get('/api/v1/weather/').streaming_content))
+
+        before = weather_list()
+        with patch('app.weather.services.http.get', side_effect=self._archive):
+            WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=10)
+        self.assertFalse(WeatherCache.objects.exists())
+        cache.clear()
+        self.assertEqual(weather_list(), before)
+
+        row = WeatherCache.objects.create(attraction=self.attraction, temperature=Decimal('18.00'))
+        stamped = row.last_updated
+        with patch('app.weather.services.http.get', side_effect=self._archive):
+            WeatherService.fetch_historical_weather('-3.0674', '37.3556', days=20)
+        row.refresh_from_db()
+        self.assertEqual(row.last_updated, stamped)
+        self.assertEqual(row.temperature, Decimal('18.00'))
+        self.assertEqual(set(row.monthly_temperature.values()), {20.0})
+
+
+class WeatherCacheRefreshTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='refuser', email='ref@example.com', password='Pass1234!')
+        self.region = Region.objects.create(
+            name='Kilimanjaro Region', slug='kilimanjaro-region', description='Mountain region.',
+            latitude='-3.0674', longitude='37.3556',
+        )
+        self.first = make_attraction(self.region, self.user)
+        self.second = Attraction.objects.create(
+            name='Ngorongoro', slug='ngorongoro', region=self.region, category='wildlife',
+            description='Crater.', short_description='Crater.', latitude='-3.2400', longitude='35.4875',
+            difficulty_level='easy', access_info='Via Karatu.', best_time_to_visit='Jun-Oct',
+            seasonal_availability='Year-round', estimated_duration='1 day', created_by=self.user, is_active=True,
+        )
+
+    def _upstream(self, temperature):
+        response = MagicMock()
+        response.json.return_value = [_open_meteo_location(temperature), _open_meteo_location(temperature + 1)]
+        return response
+
+    def test_command_upserts_all_rows_in_one_write(self):
+        from io import StringIO
+        from django.core.management import call_command
+
+        WeatherCache.objects.create(attraction=self.first, temperature=Decimal('10.00'))
+        out = StringIO()
+        with patch('app.weather.services.http.get', return_value=self._upstream(20.0)) as get:
+            call_command('refresh_weather_cache', stdout=out)
+        self.assertEqual(get.call_count, 1)
+        self.assertIn('Updated 2 weather records', out.getvalue())
+        self.assertEqual(WeatherCache.objects.count(), 2)
+        self.assertEqual(
+            set(WeatherCache.objects.values_list('temperature', flat=True)), {Decimal('20.00'), Decimal('21.00')},
+        )
+
+    def test_failed_fetch_keeps_existing_rows(self):
+        import requests
+        WeatherCache.objects.create(attraction=self.first, temperature=Decimal('10.00'))
+        with patch('app.weather.services.http.get', side_effect=requests.ConnectionError('down')):
+            written, failed = WeatherService.refresh_weather_cache()
+        self.assertEqual((written, failed), (0, 2))
+        self.assertEqual(WeatherCache.objects.get(attraction=self.first).temperature, Decimal('10.00'))
+
+    def test_weather_list_does_not_query_per_row(self):
+        WeatherCache.objects.create(attraction=self.first, temperature=Decimal('10.00'))
+        WeatherCache.objects.create(attraction=self.second, temperature=Decimal('12.00'))
+        with self.assertNumQueries(1):
+            response = APIClient().get('/api/v1/weather/?refresh-test')
+            body = json.loads(b''.join(response.streaming_content))
+        self.assertEqual(len(body), 2)
@@ -1,5 +1,8 @@
 from django.urls import path
-from .views import weather_list, weather_detail, current_weather, forecast_weather, seasonal_weather, historical_weather
+from .views import (
+    weather_list, weather_detail, current_weather, forecast_weather, seasonal_weather, historical_weather, climate_weather,
+    current_weather_async, forecast_weather_async, historical_weather_async, weather_overview,
+)
 
 urlpatterns = [
     path('', weather_list, name='weather-list'),
@@ -8,4 +11,9 @@ urlpatterns = [
     path('forecast/', forecast_weather, name='weather-forecast'),
     path('seasonal/', seasonal_weather, name='weather-seasonal'),
     path('historical/', historical_weather, name='weather-historical'),
+    path('climate/', climate_weather, name='weather-climate'),
+    path('current/async/', current_weather_async, name='weather-current-async'),
+    path('forecast/async/', forecast_weather_async, name='weather-forecast-async'),
+    path('historical/async/', historical_weather_async, name='weather-historical-async'),
+    path('overview/', weather_overview, name='weather-overview'),
 ]
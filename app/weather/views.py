@@ -1,11 +1,18 @@
+import asyncio
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample, OpenApiResponse
 from app.attractions.models import Attraction
+from app.core.renderers import streaming_list
 from .models import WeatherCache, SeasonalWeatherPattern
-from .serializers import WeatherCacheSerializer, SeasonalWeatherPatternSerializer, CurrentWeatherSerializer
+from .serializers import WeatherCacheSerializer, SeasonalWeatherPatternSerializer, CurrentWeatherSerializer, MonthlyClimateSerializer
+from . import http
 from .services import WeatherService
 
 _CURRENT_WEATHER_EXAMPLE = {
@@ -36,7 +43,7 @@ _FORECAST_EXAMPLE = {
     summary='List all cached weather records',
     description=(
         'Returns all weather records stored in the database. Each record is tied to one attraction '
-        'and was last populated by the `update_attraction_weather_cache` service method.\n\n'
+        'and is refreshed in bulk by `manage.py refresh_weather_cache` (and by the cache warmer).\n\n'
         'For live weather data use `GET /api/v1/weather/current/` instead.\n\n'
         '**curl example:**\n'
         '```bash\n'
@@ -59,9 +66,8 @@ _FORECAST_EXAMPLE = {
 @api_view(['GET'])
 @permission_classes([IsAuthenticatedOrReadOnly])
 def weather_list(request):
-    weather_caches = WeatherCache.objects.all()
-    serializer = WeatherCacheSerializer(weather_caches, many=True)
-    return Response(serializer.data)
+    weather_caches = WeatherCache.objects.select_related('attraction')
+    return streaming_list(request, weather_caches, WeatherCacheSerializer)
 
 
 @extend_schema(
@@ -107,7 +113,10 @@ def weather_detail(request, pk):
     tags=['Weather'],
     summary='Current weather for a location',
     description=(
-        'Fetch **live** current weather from Open-Meteo. Results are cached in memory for **30 minutes**.\n\n'
+        'Fetch **live** current weather from Open-Meteo. Results are cached for **30 minutes**; after that the '
+        'previous value is returned immediately with `"stale": true` while it is refreshed in the background. '
+        'If Open-Meteo is down, the last known value (or the stored `WeatherCache` record) is returned the same way. '
+        'Coordinates are snapped to a ~5.5 km grid (`WEATHER_GRID_DEGREES`), close to Open-Meteo\'s own model resolution.\n\n'
         'Provide the location using **one** of these two options:\n\n'
         '| Option | Parameters | Example |\n'
         '|--------|------------|---------|\n'
@@ -144,7 +153,7 @@ def weather_detail(request, pk):
             examples=[OpenApiExample('Not found', value={'error': 'Attraction not found'})],
         ),
         503: OpenApiResponse(
-            description='Open-Meteo API is unreachable or returned an error.',
+            description='Open-Meteo API is unreachable and there is no previously fetched value to fall back on.',
             examples=[OpenApiExample('API error', value={'error': 'Weather API error: Connection timeout'})],
         ),
     },
@@ -223,7 +232,7 @@ def current_weather(request):
             examples=[OpenApiExample('Not found', value={'error': 'Attraction not found'})],
         ),
         503: OpenApiResponse(
-            description='Open-Meteo API is unreachable or returned an error.',
+            description='Open-Meteo API is unreachable and there is no previously fetched value to fall back on.',
             examples=[OpenApiExample('API error', value={'error': 'Weather API error: Connection timeout'})],
         ),
     },
@@ -342,10 +351,69 @@ def seasonal_weather(request):
         return Response({'error': 'Attraction not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@extend_schema(
+    tags=['Weather'],
+    summary='Observed monthly climate for an attraction',
+    description=(
+        'Monthly averages computed from the daily observations stored by the historical endpoint '
+        '(and `manage.py backfill_weather_history`). Complements the contributor-entered seasonal patterns.\n\n'
+        '- `monthly_temperature`: mean daily temperature per month, °C\n'
+        '- `monthly_precipitation`: expected monthly total, mm\n\n'
+        'Keys are month numbers (`"1"` = January). Months without observations are omitted.'
+    ),
+    parameters=[
+        OpenApiParameter('attraction', str, description='Attraction slug', required=True),
+    ],
+    responses={
+        200: OpenApiResponse(
+            response=MonthlyClimateSerializer,
+            examples=[OpenApiExample('Climate', value={
+                'attraction': 'mount-kilimanjaro',
+                'monthly_temperature': {'1': 21.3, '7': 17.8},
+                'monthly_precipitation': {'1': 62.0, '7': 8.4},
+                'last_updated': '2026-02-26T09:00:00Z',
+            })],
+        ),
+        400: OpenApiResponse(description='`attraction` query parameter is required.'),
+        404: OpenApiResponse(description='No attraction found with the given slug.'),
+    },
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def climate_weather(request):
+    attraction_slug = request.query_params.get('attraction')
+    if not attraction_slug:
+        return Response({'error': 'Attraction slug required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        attraction = Attraction.objects.get(slug=attraction_slug, is_active=True)
+    except Attraction.DoesNotExist:
+        return Response({'error': 'Attraction not found'}, status=status.HTTP_404_NOT_FOUND)
+
+    weather_cache = WeatherCache.objects.filter(attraction=attraction).select_related('attraction').first()
+    if weather_cache is None or not weather_cache.monthly_temperature:
+        # No current-conditions row to carry the aggregates yet: compute them from the observations
+        temperature, precipitation = WeatherService.monthly_climate(
+            *WeatherService.quantize(attraction.latitude, attraction.longitude)
+        )
+        return Response({
+            'attraction': attraction.slug, 'monthly_temperature': temperature,
+            'monthly_precipitation': precipitation,
+            'last_updated': weather_cache.last_updated if weather_cache else None,
+        })
+    return Response(MonthlyClimateSerializer(weather_cache).data)
+
+
 @extend_schema(
     tags=['Weather'],
     summary='Historical weather data',
-    description='Get historical weather data for a location. Supports last 5, 7, 30, or 90 days. Uses Open-Meteo Archive API (free). Returns daily temperature, precipitation, rainfall, humidity, wind speed.',
+    description=(
+        'Get historical weather data for a location. Supports last 5, 7, 30, or 90 days. Returns daily temperature, '
+        'precipitation, rainfall, humidity, wind speed.\n\n'
+        'Days are served from a local store and only days not stored yet are requested from the Open-Meteo '
+        'Archive API. The archive lags a few days behind, so the most recent days may be `null`. '
+        'If the archive is unreachable, stored days are returned with `"stale": true`.'
+    ),
     parameters=[
         OpenApiParameter('lat', float, description='Latitude'),
         OpenApiParameter('lon', float, description='Longitude'),
@@ -384,3 +452,285 @@ def historical_weather(request):
     if 'error' in data:
         return Response(data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     return Response(data)
+
+
+# ── Async variants ─────────────────────────────────────────────────────────
+#
+# Plain Django async views (DRF's @api_view is sync-only). Under an ASGI
+# server they hold no worker thread while Open-Meteo responds; under WSGI
+# they still let the overview run its three upstream calls concurrently.
+# Read-only and public, so they skip DRF authentication entirely.
+
+async def _aresolve_location(request):
+    """``(lat, lon, error_response)`` from ``lat``+``lon`` or an ``attraction`` slug."""
+    lat = request.GET.get('lat')
+    lon = request.GET.get('lon')
+    attraction_slug = request.GET.get('attraction')
+
+    if attraction_slug:
+        try:
+            attraction = await Attraction.objects.aget(slug=attraction_slug, is_active=True)
+        except Attraction.DoesNotExist:
+            return None, None, JsonResponse({'error': 'Attraction not found'}, status=status.HTTP_404_NOT_FOUND)
+        lat, lon = attraction.latitude, attraction.longitude
+
+    if not lat or not lon:
+        return None, None, JsonResponse(
+            {'error': 'Latitude and longitude or attraction slug required'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    return lat, lon, None
+
+
+def _int_param(request, name, default):
+    try:
+        return int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+_safe_methods_only = require_safe(lambda request: None)
+
+_ASYNC_LOCATION_PARAMETERS = [
+    OpenApiParameter('lat', description='Latitude (decimal degrees). Required if `attraction` is not provided.', required=False, type=float),
+    OpenApiParameter('lon', description='Longitude (decimal degrees). Required if `attraction` is not provided.', required=False, type=float),
+    OpenApiParameter('attraction', description='Attraction slug. Auto-resolves coordinates. See `GET /api/v1/attractions/` for slugs.', required=False, type=str),
+]
+_ASYNC_ERROR_RESPONSES = {
+    400: OpenApiResponse(
+        description='Neither `lat`+`lon` nor `attraction` was provided.',
+        examples=[OpenApiExample('Missing params', value={'error': 'Latitude and longitude or attraction slug required'})],
+    ),
+    404: OpenApiResponse(
+        description='No active attraction found with the given slug.',
+        examples=[OpenApiExample('Not found', value={'error': 'Attraction not found'})],
+    ),
+    405: OpenApiResponse(description='Only GET and HEAD are allowed.'),
+}
+
+
+def async_schema(**schema):
+    """
+    ``@extend_schema`` for a plain async view. drf-spectacular only
+    enumerates DRF views (callables with a ``cls``), so the view borrows
+    the ``cls`` of a schema-only, unauthenticated ``@api_view`` stub.
+    """
+    def decorator(view):
+        def stub(request):
+            raise NotImplementedError  # never routed; documents ``view``
+        stub.__name__ = view.__name__
+        documented = extend_schema(**schema)(
+            api_view(['GET'])(authentication_classes([])(permission_classes([AllowAny])(stub)))
+        )
+        view.cls, view.initkwargs = documented.cls, documented.initkwargs
+        return view
+    return decorator
+
+
+def async_weather_view(view):
+    """
+    GET/HEAD only (``require_safe``, which isn't async-aware before Django
+    5.0), with one upstream HTTP client shared by the view's calls.
+    """
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        not_allowed = _safe_methods_only(request)
+        if not_allowed is not None:
+            return not_allowed
+        async with http.async_client():
+            return await view(request, *args, **kwargs)
+    return wrapped
+
+
+def _current_payload(data):
+    serializer = CurrentWeatherSerializer(data=data)
+    serializer.is_valid()
+    return serializer.data
+
+
+@async_schema(
+    tags=['Weather'],
+    summary='Current weather for a location (async)',
+    description=(
+        'Async variant of `GET /api/v1/weather/current/`: same caching, stale fallback and response body. '
+        'Under an ASGI server it holds no worker while Open-Meteo responds.\n\n'
+        '**curl example:**\n'
+        '```bash\n'
+        'curl "https://159.65.119.182:8000/api/v1/weather/current/async/?attraction=mount-kilimanjaro"\n'
+        '```'
+    ),
+    parameters=_ASYNC_LOCATION_PARAMETERS,
+    responses={
+        200: OpenApiResponse(
+            response=CurrentWeatherSerializer,
+            description='Current weather data. Temperatures in °C, wind speed in km/h, precipitation in mm.',
+            examples=[OpenApiExample('Current weather', value=_CURRENT_WEATHER_EXAMPLE)],
+        ),
+        **_ASYNC_ERROR_RESPONSES,
+        503: OpenApiResponse(
+            description='Open-Meteo API is unreachable and there is no previously fetched value to fall back on.',
+            examples=[OpenApiExample('API error', value={'error': 'Weather API error: Connection timeout'})],
+        ),
+    },
+)
+@async_weather_view
+async def current_weather_async(request):
+    """Async ``GET /weather/current/async/`` — same parameters and responses as ``current_weather``."""
+    lat, lon, error = await _aresolve_location(request)
+    if error:
+        return error
+
+    data = await WeatherService.afetch_current_weather(lat, lon)
+    if 'error' in data:
+        return JsonResponse(data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return JsonResponse(_current_payload(data))
+
+
+@async_schema(
+    tags=['Weather'],
+    summary='Multi-day weather forecast for a location (async)',
+    description=(
+        'Async variant of `GET /api/v1/weather/forecast/`: same caching and response body.\n\n'
+        '**curl example:**\n'
+        '```bash\n'
+        'curl "https://159.65.119.182:8000/api/v1/weather/forecast/async/?lat=-3.0674&lon=37.3556&days=3"\n'
+        '```'
+    ),
+    parameters=[
+        *_ASYNC_LOCATION_PARAMETERS,
+        OpenApiParameter('days', description='Number of forecast days (default: `7`, max: `16`).', required=False, type=int),
+    ],
+    responses={
+        200: OpenApiResponse(
+            description='Forecast data. Arrays are aligned by index — `dates[0]` corresponds to `temperature_max[0]`, etc.',
+            examples=[OpenApiExample('3-day forecast', value=_FORECAST_EXAMPLE)],
+        ),
+        **_ASYNC_ERROR_RESPONSES,
+        503: OpenApiResponse(
+            description='Open-Meteo API is unreachable and there is no previously fetched value to fall back on.',
+            examples=[OpenApiExample('API error', value={'error': 'Weather API error: Connection timeout'})],
+        ),
+    },
+)
+@async_weather_view
+async def forecast_weather_async(request):
+    """Async ``GET /weather/forecast/async/`` — same parameters and responses as ``forecast_weather``."""
+    lat, lon, error = await _aresolve_location(request)
+    if error:
+        return error
+
+    data = await WeatherService.afetch_forecast(lat, lon, _int_param(request, 'days', 7))
+    if 'error' in data:
+        return JsonResponse(data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return JsonResponse(data)
+
+
+@async_schema(
+    tags=['Weather'],
+    summary='Historical weather data (async)',
+    description=(
+        'Async variant of `GET /api/v1/weather/historical/`: stored days are served locally and only missing '
+        'days are requested from the Open-Meteo Archive API. The most recent days may be `null`; if the '
+        'archive is unreachable, stored days are returned with `"stale": true`.\n\n'
+        '**curl example:**\n'
+        '```bash\n'
+        'curl "https://159.65.119.182:8000/api/v1/weather/historical/async/?attraction=mount-kilimanjaro&days=30"\n'
+        '```'
+    ),
+    parameters=[
+        *_ASYNC_LOCATION_PARAMETERS,
+        OpenApiParameter('days', description='Number of past days (default: `7`, max: `90`).', required=False, type=int),
+    ],
+    responses={
+        200: OpenApiResponse(description='Daily temperature, precipitation, rainfall, humidity and wind speed, aligned by index with `dates`.'),
+        **_ASYNC_ERROR_RESPONSES,
+        503: OpenApiResponse(
+            description='The archive is unreachable and no days are stored for this location.',
+            examples=[OpenApiExample('API error', value={'error': 'Weather API error: Connection timeout'})],
+        ),
+    },
+)
+@async_weather_view
+async def historical_weather_async(request):
+    """Async ``GET /weather/historical/async/`` — same parameters and responses as ``historical_weather``."""
+    lat, lon, error = await _aresolve_location(request)
+    if error:
+        return error
+
+    data = await WeatherService.afetch_historical_weather(lat, lon, _int_param(request, 'days', 7))
+    if 'error' in data:
+        return JsonResponse(data, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    return JsonResponse(data)
+
+
+@async_schema(
+    tags=['Weather'],
+    summary='Current, forecast and historical weather in one response',
+    description=(
+        'Runs the current, forecast and historical lookups concurrently, so the page costs one upstream '
+        'round-trip instead of three. Each section has the body of its own endpoint.\n\n'
+        '**Partial failures:** a section whose upstream call fails carries its own `{"error": ...}` and the '
+        'response is still `200`. The status is `503` only when all three sections fail.\n\n'
+        '**curl example:**\n'
+        '```bash\n'
+        'curl "https://159.65.119.182:8000/api/v1/weather/overview/?attraction=mount-kilimanjaro&forecast_days=3&history_days=30"\n'
+        '```'
+    ),
+    parameters=[
+        *_ASYNC_LOCATION_PARAMETERS,
+        OpenApiParameter('forecast_days', description='Number of forecast days (default: `7`, max: `16`).', required=False, type=int),
+        OpenApiParameter('history_days', description='Number of past days (default: `7`, max: `90`).', required=False, type=int),
+    ],
+    responses={
+        200: OpenApiResponse(
+            description='All three sections; any of them may be an `{"error": ...}` object.',
+            examples=[
+                OpenApiExample('Overview', value={
+                    'current': _CURRENT_WEATHER_EXAMPLE, 'forecast': _FORECAST_EXAMPLE,
+                    'historical': {'dates': ['2026-02-24', '2026-02-25'], 'temperature_mean': [22.1, 21.7]},
+                }),
+                OpenApiExample('Forecast unavailable', value={
+                    'current': _CURRENT_WEATHER_EXAMPLE,
+                    'forecast': {'error': 'Weather API error: Connection timeout'},
+                    'historical': {'dates': ['2026-02-24', '2026-02-25'], 'temperature_mean': [22.1, 21.7]},
+                }),
+            ],
+        ),
+        **_ASYNC_ERROR_RESPONSES,
+        503: OpenApiResponse(
+            description='All three sections failed; each carries its `error`.',
+            examples=[OpenApiExample('All failed', value={
+                'current': {'error': 'Weather API error: Connection timeout'},
+                'forecast': {'error': 'Weather API error: Connection timeout'},
+                'historical': {'error': 'Weather API error: Connection timeout'},
+            })],
+        ),
+    },
+)
+@async_weather_view
+async def weather_overview(request):
+    """
+    ``GET /weather/overview/`` — current, forecast and historical weather in one response.
+
+    Takes ``lat``+``lon`` or ``attraction``, plus optional ``forecast_days``
+    (default 7) and ``history_days`` (default 7, max 90). The three upstream
+    calls run concurrently, so the page costs one round-trip instead of
+    three. A section that fails carries its own ``{"error": ...}``; the
+    response is 503 only when all three fail.
+    """
+    lat, lon, error = await _aresolve_location(request)
+    if error:
+        return error
+
+    current, forecast, historical = await asyncio.gather(
+        WeatherService.afetch_current_weather(lat, lon),
+        WeatherService.afetch_forecast(lat, lon, _int_param(request, 'forecast_days', 7)),
+        WeatherService.afetch_historical_weather(lat, lon, _int_param(request, 'history_days', 7)),
+    )
+    payload = {
+        'current': current if 'error' in current else _current_payload(current),
+        'forecast': forecast,
+        'historical': historical,
+    }
+    all_failed = all('error' in section for section in (current, forecast, historical))
+    return JsonResponse(payload, status=status.HTTP_503_SERVICE_UNAVAILABLE if all_failed else status.HTTP_200_OK)
@@ -72,6 +72,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.gzip.GZipMiddleware',
+    'app.core.routers.ReplicaMiddleware',                   # GET/HEAD reads go to the replica
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.cache.UpdateCacheMiddleware',       # must be before CommonMiddleware
     'django.middleware.common.CommonMiddleware',
@@ -109,6 +110,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'app.core.db_backends.sqlcipher',
         'NAME': BASE_DIR / 'chui.db',
+        # Reuse connections across requests: opening one costs the SQLCipher
+        # key setup and PRAGMAs, reusing one costs a health-check SELECT 1
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Memory budget per connection: small / default / large
+        # (app/core/db_backends/sqlcipher/base.py PRAGMA_PROFILES)
+        'OPTIONS': {'pragma_profile': config('DB_PRAGMA_PROFILE', default='default')},
     }
 }
 
@@ -163,6 +171,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_RENDERER_CLASSES': (
+        'app.core.renderers.FastJSONRenderer',            # orjson when installed, stdlib json otherwise
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -193,27 +205,71 @@ CORS_ALLOW_ALL_ORIGINS = not bool(_FRONTEND_URL)
 
 CORS_ALLOW_CREDENTIALS = True
 
-# Cache — file-based (multi-process safe, survives restarts, works on PA free tier)
-# LocMemCache is per-process; FileBasedCache is shared across all WSGI workers.
-CACHES = {
-    'default': {
+# Cache — SQLite WAL database shared by all WSGI workers (app/core/cache.py):
+# one indexed lookup per get and LRU culling without directory scans.
+# Set CACHE_BACKEND=file to fall back to the previous FileBasedCache.
+# Compare both with `python manage.py benchmark_cache`.
+CACHE_BACKEND = config('CACHE_BACKEND', default='sqlite')
+_CACHE_OPTIONS = {
+    'MAX_ENTRIES': 10000,
+    'CULL_FREQUENCY': 3,   # cull 1/3 of entries when MAX_ENTRIES hit
+}
+if CACHE_BACKEND == 'file':
+    _SHARED_CACHE = {
         'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
         'LOCATION': '/tmp/xenohuru-cache',
         'TIMEOUT': 300,
-        'OPTIONS': {
-            'MAX_ENTRIES': 10000,
-            'CULL_FREQUENCY': 3,   # cull 1/3 of entries when MAX_ENTRIES hit
-        }
+        'OPTIONS': _CACHE_OPTIONS,
+    }
+else:
+    _SHARED_CACHE = {
+        'BACKEND': 'app.core.cache.SQLiteCache',
+        'LOCATION': config('CACHE_LOCATION', default='/tmp/xenohuru-cache.sqlite3'),
+        'TIMEOUT': 300,
+        'OPTIONS': _CACHE_OPTIONS,
     }
-}
+
+# 'default' keeps hot keys in a small per-process LRU for a few seconds in
+# front of the shared cache; writes propagate to other workers within
+# CHECK_INTERVAL. CACHE_TIERED=False uses the shared cache directly.
+CACHE_TIERED = config('CACHE_TIERED', default=True, cast=bool)
+SHARED_CACHE_ALIAS = 'shared' if CACHE_TIERED else 'default'
+if CACHE_TIERED:
+    CACHES = {
+        'default': {
+            'BACKEND': 'app.core.cache.TieredCache',
+            'OPTIONS': {
+                'SHARED_ALIAS': SHARED_CACHE_ALIAS,
+                'LOCAL_MAX_ENTRIES': 1000,
+                'LOCAL_TIMEOUT': 5,      # seconds a value may be served from process memory
+                'CHECK_INTERVAL': 1,     # seconds between invalidation-log checks
+            },
+        },
+        SHARED_CACHE_ALIAS: _SHARED_CACHE,
+    }
+else:
+    CACHES = {SHARED_CACHE_ALIAS: _SHARED_CACHE}
 
 # Full-page cache timeout for anonymous GET requests (via cache middleware)
 CACHE_MIDDLEWARE_SECONDS = 60          # 1 minute for list/public endpoints
 CACHE_MIDDLEWARE_KEY_PREFIX = 'xeno'
 
+# Pre-rendered catalog JSON served from disk (python manage.py build_snapshots).
+# Leave SNAPSHOT_ROOT empty to always render live.
+SNAPSHOT_ROOT = config('SNAPSHOT_ROOT', default=str(BASE_DIR / 'snapshots'))
+SNAPSHOT_AUTO_REBUILD = config('SNAPSHOT_AUTO_REBUILD', default=True, cast=bool)
+
 # Weather API Configuration
 WEATHER_API_BASE_URL = 'https://api.open-meteo.com/v1/forecast'
 WEATHER_CACHE_TIMEOUT = 1800  # 30 minutes
+WEATHER_STALE_TIMEOUT = 6 * 3600  # serve stale (while refreshing) this long past WEATHER_CACHE_TIMEOUT
+WEATHER_LAST_KNOWN_TIMEOUT = 7 * 24 * 3600  # last good value kept for upstream outages
+WEATHER_GRID_DEGREES = config('WEATHER_GRID_DEGREES', default=0.05, cast=float)  # cache/query grid (~5.5 km); 0 disables
+WEATHER_HTTP_POOL_SIZE = config('WEATHER_HTTP_POOL_SIZE', default=10, cast=int)
+WEATHER_HTTP_RETRIES = config('WEATHER_HTTP_RETRIES', default=2, cast=int)
+WEATHER_HTTP_CONNECT_TIMEOUT = 3.05
+WEATHER_BREAKER_FAILURES = 5  # consecutive failures before the circuit opens
+WEATHER_BREAKER_RESET = 60  # seconds before a trial request is let through
 
 # OpenAPI / Swagger UI Configuration
 SPECTACULAR_SETTINGS = {
@@ -268,6 +324,7 @@ if config('ON_BACK4APP', default=False, cast=bool):
     STATIC_ROOT = BASE_DIR / 'staticfiles'
     # Use the committed chui.db baked into the Docker image — no volume needed
     DATABASES['default']['NAME'] = BASE_DIR / 'chui.db'
+    DATABASES['default']['OPTIONS']['pragma_profile'] = config('DB_PRAGMA_PROFILE', default='large')
 
 # These activate when ON_PYTHONANYWHERE=True is set in the server .env
 if config('ON_PYTHONANYWHERE', default=False, cast=bool):
@@ -285,7 +342,27 @@ if config('ON_PYTHONANYWHERE', default=False, cast=bool):
     STATIC_ROOT = BASE_DIR / 'staticfiles'
     MEDIA_ROOT = Path(f'/home/{PA_USERNAME}/main/media')
     DATABASES['default']['NAME'] = Path(f'/home/{PA_USERNAME}/main/chui.db')
-
-    # Tighter cache on PA: use /home dir so it persists across reloads
-    CACHES['default']['LOCATION'] = f'/home/{PA_USERNAME}/main/.cache'
-
+    DATABASES['default']['OPTIONS']['pragma_profile'] = config('DB_PRAGMA_PROFILE', default='small')
+
+    # Shared cache under /home on PA so it persists across reloads (the tiered
+    # 'default' only holds per-process memory): a database file for
+    # SQLiteCache, a directory for the FileBasedCache fallback
+    CACHES[SHARED_CACHE_ALIAS]['LOCATION'] = f'/home/{PA_USERNAME}/main/' + (
+        '.cache' if CACHE_BACKEND == 'file' else '.cache.sqlite3'
+    )
+
+
+# Read replica: a read-only connection to the same encrypted file that
+# GET/HEAD requests read through (app.core.routers). Defined last so it
+# follows the platform-specific default NAME above.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'OPTIONS': {
+        'read_only': True,
+        'pragma_profile': config(
+            'DB_REPLICA_PRAGMA_PROFILE', default=DATABASES['default']['OPTIONS']['pragma_profile'],
+        ),
+    },
+    'TEST': {'MIRROR': 'default'},
+}
+DATABASE_ROUTERS = ['app.core.routers.ReplicaRouter']
@@ -20,11 +20,12 @@ from rest_framework import permissions
 from django.conf import settings
 from django.conf.urls.static import static
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from app.core.views import robots_txt, sitemap_xml, health_check
+from app.core.views import robots_txt, sitemap_xml, sitemap_section, health_check
 
 urlpatterns = [
     path('robots.txt', robots_txt, name='robots-txt'),
     path('sitemap.xml', sitemap_xml, name='sitemap'),
+    path('sitemap-<slug:section>-<int:page>.xml', sitemap_section, name='sitemap-section'),
     path('api/health/', health_check, name='health-check'),
     path('admin/', admin.site.urls),
     path('', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),